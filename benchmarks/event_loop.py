@@ -0,0 +1,109 @@
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from contextlib import aclosing
+from types import SimpleNamespace
+from typing import Callable
+
+from web3mt.evm.standin import StandInNode
+from web3mt.evm.transport import session_pool
+from web3mt.utils import logger, ProfileSession
+
+RESULTS_DIR = Path(__file__).parent / 'results'
+BLOCK_NUMBER = {'jsonrpc': '2.0', 'id': 1, 'method': 'eth_blockNumber', 'params': []}
+
+
+def loop_factories() -> dict[str, Callable[[], asyncio.AbstractEventLoop]]:
+    factories = {'asyncio': asyncio.new_event_loop}
+    try:
+        import uvloop
+        factories['uvloop'] = uvloop.new_event_loop
+    except ImportError:
+        pass
+    return factories
+
+
+async def session_burst(node: StandInNode, sessions: int, requests: int) -> int:
+    """Each session POSTs `requests` JSON-RPC calls back to back, like a profile polling an API"""
+
+    async def run(index: int) -> int:
+        profile = SimpleNamespace(id=index, proxy=None)
+        async with ProfileSession(profile, sleep_echo=False, requests_echo=False) as session:
+            for _ in range(requests):
+                await session.post(node.url, json=BLOCK_NUMBER)
+        return requests
+
+    return sum(await asyncio.gather(*[run(i) for i in range(sessions)]))
+
+
+async def rpc_burst(node: StandInNode, clients: int, requests: int) -> int:
+    """Each Client makes `requests` balance calls through its web3 provider and middlewares"""
+
+    async def run(index: int) -> int:
+        async with aclosing(node.client(index)) as client:
+            for _ in range(requests):
+                await client.w3.eth.get_balance(client.account.address)
+        return requests
+
+    done = sum(await asyncio.gather(*[run(i) for i in range(clients)]))
+    await session_pool.close_all()
+    return done
+
+
+FLOWS = {'profile_session': session_burst, 'client_rpc': rpc_burst}
+
+
+def measure(factory: Callable, flow: Callable, node: StandInNode, concurrency: int, requests: int) -> float:
+    with asyncio.Runner(loop_factory=factory) as runner:
+        start = time.perf_counter()
+        done = runner.run(flow(node, concurrency, requests))
+        return done / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ProfileSession and Client request bursts under each event loop')
+    parser.add_argument('--concurrency', type=int, default=50, help='sessions or clients running at once')
+    parser.add_argument('--requests', type=int, default=20, help='requests per session or client')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--loops', nargs='*', default=None, help='loops to compare, all available by default')
+    parser.add_argument('--output', type=Path, default=None)
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level='WARNING')
+    factories = loop_factories()
+    loops = args.loops or list(factories)
+    results = {}
+    with StandInNode(accounts=args.concurrency) as node:
+        for name in loops:
+            if name not in factories:
+                print(f'{name} is not installed, skipping')
+                continue
+            results[name] = {}
+            for flow_name, flow in FLOWS.items():
+                measure(factories[name], flow, node, args.concurrency, 1)  # warm-up
+                rates = [
+                    measure(factories[name], flow, node, args.concurrency, args.requests) for _ in range(args.repeat)
+                ]
+                results[name][flow_name] = {'median_rps': statistics.median(rates), 'max_rps': max(rates)}
+    result = {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': sys.version.split()[0],
+        'concurrency': args.concurrency,
+        'requests': args.requests,
+        'loops': results,
+    }
+    output = args.output or RESULTS_DIR / f'event_loop-{args.concurrency}x{args.requests}.json'
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2))
+    print(json.dumps(result, indent=2))
+    print(f'Saved to {output}')
+
+
+if __name__ == '__main__':
+    main()
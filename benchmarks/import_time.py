@@ -0,0 +1,90 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+RESULTS_DIR = Path(__file__).parent / 'results'
+ROOT = Path(__file__).parent.parent
+TARGETS = (
+    'from web3mt.utils import read_json',
+    'from web3mt.utils import logger',
+    'from web3mt.evm.models import TokenAmount',
+    'from web3mt.evm import Client',
+    'from web3mt.aptos import Client',
+    'import web3mt.utils.fleet',
+)
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True, cwd=ROOT).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def import_once(statement: str) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', statement], cwd=ROOT, check=True, capture_output=True)
+    return time.perf_counter() - start
+
+
+def slowest_modules(statement: str, top: int) -> list[dict]:
+    """Top modules by cumulative import time from `python -X importtime`"""
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement], cwd=ROOT, check=True, capture_output=True, text=True
+    )
+    modules = []
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.removeprefix('import time:').split('|')
+        modules.append({'module': name.strip(), 'cumulative_ms': int(cumulative) / 1000})
+    return sorted(modules, key=lambda module: module['cumulative_ms'], reverse=True)[:top]
+
+
+def benchmark(targets: list[str], repeat: int, top: int) -> dict:
+    results = {}
+    for statement in targets:
+        try:
+            import_once(statement)  # warm the bytecode cache
+        except subprocess.CalledProcessError as e:
+            results[statement] = {'error': e.stderr.decode().strip().splitlines()[-1]}
+            continue
+        samples = [import_once(statement) for _ in range(repeat)]
+        results[statement] = {
+            'median_s': statistics.median(samples),
+            'min_s': min(samples),
+            **({'slowest_modules': slowest_modules(statement, top)} if top else {}),
+        }
+    return {
+        'revision': git_revision(),
+        'date': datetime.now(timezone.utc).isoformat(),
+        'python': sys.version.split()[0],
+        'repeat': repeat,
+        'baseline_s': statistics.median(import_once('pass') for _ in range(repeat)),
+        'targets': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cold import time of web3mt entry points, each in a fresh interpreter')
+    parser.add_argument('targets', nargs='*', default=list(TARGETS), help='import statements to time')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=0, help='also list the N slowest modules (-X importtime)')
+    parser.add_argument('--output', type=Path, default=None)
+    args = parser.parse_args()
+
+    result = benchmark(args.targets, args.repeat, args.top)
+    output = args.output or RESULTS_DIR / f'import_time-{result["revision"]}.json'
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2))
+    print(json.dumps(result, indent=2))
+    print(f'Saved to {output}')
+
+
+if __name__ == '__main__':
+    main()
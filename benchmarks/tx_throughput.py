@@ -0,0 +1,175 @@
+import argparse
+import asyncio
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Optional
+
+from web3mt.evm.client import Client
+from web3mt.evm.models import TokenAmount, DefaultABIs
+from web3mt.evm.metrics import RPCMetrics
+from web3mt.evm.standin import StandInNode
+from web3mt.evm.transport import session_pool
+from web3mt.utils import logger, VirtualClock, get_clock, SamplingProfiler
+from web3mt.utils.profiler import log_top, profile_path
+
+RESULTS_DIR = Path(__file__).parent / 'results'
+MINT_DATA = '0x1249c58b'
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(q / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def timed(client: Client, name: str, samples: dict[str, list[float]]) -> None:
+    method = getattr(client, name)
+
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            samples[name].append(time.perf_counter() - start)
+
+    setattr(client, name, wrapper)
+
+
+async def run_wallet(
+        node: StandInNode, index: int, kind: str, txs: int, samples: dict[str, list[float]], metrics: RPCMetrics,
+        delay: float = 0
+) -> int:
+    client = node.client(index, rpc_metrics=metrics, delay_between_requests=delay)
+    for name in ('send_transaction', 'verify_transaction', 'tx'):
+        timed(client, name, samples)
+    done = 0
+    try:
+        for _ in range(txs):
+            if kind == 'native':
+                ok = await client.tx(node.accounts[(index + 1) % len(node.accounts)].address, 'Transfer', value=1)
+            elif kind == 'erc20':
+                data = client.w3.eth.contract(address=node.token.address, abi=DefaultABIs.Token).encodeABI(
+                    'transfer', args=[node.accounts[(index + 1) % len(node.accounts)].address, TokenAmount(1).Wei]
+                )
+                ok = await client.tx(node.token.address, 'Transfer SIT', data=data)
+            else:
+                ok = await client.tx(node.nft.address, 'Mint SIN', data=MINT_DATA)
+            done += bool(ok)
+    finally:
+        await client.close()
+    return done
+
+
+async def profiled(profile: Optional[Path], run: Awaitable[dict]) -> dict:
+    if not profile:
+        return await run
+    profiler = SamplingProfiler().start()
+    try:
+        return await run
+    finally:
+        profiler.stop()
+        log_top(profiler)
+        print(f'Profile saved to {profiler.write(profile_path(profile, "tx_throughput"))}')
+
+
+async def benchmark(wallets: int, txs: int, kind: str, trace_memory: bool = False, delay: float = 0) -> dict:
+    samples: dict[str, list[float]] = defaultdict(list)
+    metrics = RPCMetrics()
+    peak = None
+    with StandInNode(accounts=wallets) as node:
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        clock_start = get_clock().time()
+        confirmed = sum(await asyncio.gather(*[
+            run_wallet(node, i, kind, txs, samples, metrics, delay) for i in range(wallets)
+        ]))
+        await session_pool.close_all()
+        elapsed = time.perf_counter() - start
+        clock_elapsed = get_clock().time() - clock_start
+        if trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        rpc_calls = dict(node.chain.calls)
+    total_calls = sum(rpc_calls.values())
+    return {
+        'revision': git_revision(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': sys.version.split()[0],
+        'kind': kind,
+        'wallets': wallets,
+        'txs_per_wallet': txs,
+        'confirmed': confirmed,
+        'delay_between_requests': delay,
+        'elapsed_s': elapsed,
+        'clock_elapsed_s': clock_elapsed,
+        'tps': confirmed / elapsed if elapsed else 0.0,
+        'stages': {
+            name: {
+                'count': len(values),
+                'mean_ms': statistics.fmean(values) * 1000 if values else 0.0,
+                'p50_ms': percentile(values, 50) * 1000,
+                'p99_ms': percentile(values, 99) * 1000,
+            } for name, values in samples.items()
+        },
+        'rpc_calls': rpc_calls,
+        'rpc_calls_per_tx': total_calls / confirmed if confirmed else 0.0,
+        'rpc_latency': {
+            entry['method']: {'p50_ms': entry['latency']['p50'] * 1000, 'p99_ms': entry['latency']['p99'] * 1000}
+            for entry in metrics.snapshot()['series']
+        },
+        'peak_traced_memory_mb': peak / 2 ** 20 if peak is not None else None,
+        'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2 ** 10,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Client.tx -> send_transaction -> verify_transaction throughput')
+    parser.add_argument('--wallets', type=int, default=100)
+    parser.add_argument('--txs', type=int, default=1, help='transactions per wallet')
+    parser.add_argument('--kind', choices=('native', 'erc20', 'nft'), default='erc20')
+    parser.add_argument('--output', type=Path, default=None)
+    parser.add_argument(
+        '--trace-memory', action='store_true',
+        help='track Python allocations with tracemalloc (slows the run down several times)'
+    )
+    parser.add_argument('--delay', type=float, default=0, help='Client.delay_between_requests, seconds')
+    parser.add_argument(
+        '--virtual-time', action='store_true', help='run on a VirtualClock, so --delay sleeps cost no real time'
+    )
+    parser.add_argument(
+        '--profile', type=Path, default=None, metavar='DIR',
+        help='sample the run with SamplingProfiler and write folded stacks and CPU attribution to DIR'
+    )
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level='WARNING')
+    run = VirtualClock().run if args.virtual_time else asyncio.run
+    result = run(profiled(args.profile, benchmark(args.wallets, args.txs, args.kind, args.trace_memory, args.delay)))
+    output = args.output or RESULTS_DIR / f'tx_throughput-{result["revision"]}-{args.kind}-{args.wallets}.json'
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2))
+    print(json.dumps(result, indent=2))
+    print(f'Saved to {output}')
+
+
+if __name__ == '__main__':
+    main()
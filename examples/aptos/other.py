@@ -9,7 +9,7 @@ from dotenv import load_dotenv
 
 from config import *
 from web3mt.aptos.bluemove import BlueMove
-from web3mt.utils import logger, read_json, Z8
+from web3mt.utils import logger, read_json, Z8, sessions
 from web3mt.aptos.client import Client
 
 load_dotenv()
@@ -119,7 +119,11 @@ async def main():
     profiles: list[Profile] = await db.get_rows_by_id([102], Profile)
     for profile in profiles:
         tasks.append(asyncio.create_task(verify(profile)))
-    await asyncio.gather(*tasks)
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        # v1/v2_token_data borrow their sessions from the registry, nothing else closes them outside a Fleet
+        await sessions.close_all()
 
 
 if __name__ == '__main__':
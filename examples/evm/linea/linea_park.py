@@ -14,17 +14,21 @@ from curl_cffi.requests import RequestsError
 from nltk.corpus import words
 from web3db import DBHelper, Profile
 
+from db import create_table, get_task_status
 from web3mt.evm.client import Client
 from web3mt.evm.models import Linea, TokenAmount
-from web3mt.utils import logger, ProfileSession, sleep
-from db import task_done, get_task_status, select_profile, insert_record
+from web3mt.evm.transport import session_pool
+from web3mt.utils import logger, ProfileSession, sleep, Fleet, JobQueue, JobState, set_pacing, MinInterval, \
+    sessions, TokenStore, proxy_manager, DelayPlanner, pause, budget, LoopWatchdog, set_uvloop_event_loop_policy
 
 load_dotenv()
 
 
 class LineaPark(Client):
-    def __init__(self, profile: Profile):
+    def __init__(self, profile: Profile, jobs: JobQueue, token_store: TokenStore):
         super().__init__(Linea, profile, do_no_matter_what=True)
+        self.jobs = jobs
+        self.token_store = token_store
         self.tasks = [
             {
                 'gamerboom': self.gamerboom,
@@ -72,7 +76,7 @@ class LineaPark(Client):
 
     async def arena_games(self):
         headers = {'Origin': 'https://linea.arenavs.com', 'Referer': 'https://linea.arenavs.com/'}
-        async with ProfileSession(self.profile, headers=headers) as session:
+        async with sessions.session(self.profile, headers=headers) as session:
             password = self.profile.email.password
             try:
                 response, data = await session.post(
@@ -878,28 +882,33 @@ class LineaPark(Client):
                 "type": "function"
             }
         ]
-        random_bytes = secrets.token_bytes(32)
-        hex_string = random_bytes.hex()
-        current_time_utc = datetime.now(timezone.utc)
-        message = (
-            f"Login with this account\n\ntime: {current_time_utc.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'}\n"
-            f"{hex_string}"
-        )
-        signature = self.sign(message)
         headers = {
             'Origin': 'https://socialscan.io',
             'Referer': 'https://socialscan.io/campaign/linea-park'
         }
-        async with ProfileSession(self.profile, headers=headers) as session:
-            response, data = await session.post(
-                url='https://api.w3w.ai/v1/socialscan/user/login',
-                json={'wallet_address': self.account.address.lower(), 'message': message, 'signature': signature}
-            )
-            auth = data['auth']
-            session.headers.update({'Authorization': auth})
+        async with sessions.session(self.profile, headers=headers) as session:
+            async def login() -> str:
+                random_bytes = secrets.token_bytes(32)
+                hex_string = random_bytes.hex()
+                current_time_utc = datetime.now(timezone.utc)
+                message = (
+                    f"Login with this account\n\n"
+                    f"time: {current_time_utc.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'}\n{hex_string}"
+                )
+                signature = self.sign(message)
+                response, data = await session.post(
+                    url='https://api.w3w.ai/v1/socialscan/user/login',
+                    json={'wallet_address': self.account.address.lower(), 'message': message, 'signature': signature}
+                )
+                return data['auth']
+
+            async def get_badges(auth: str) -> list[str]:
+                session.headers.update({'Authorization': auth})
+                response, data = await session.get(url='https://api.w3w.ai/v1/socialscan/user/badges')
+                return [badge['id'] for badge in data['badges']]
+
+            badges = await self.token_store.call(self.profile.id, 'socialscan', login, get_badges)
 
-            response, data = await session.get(url='https://api.w3w.ai/v1/socialscan/user/badges')
-            badges = [badge['id'] for badge in data['badges']]
             if 'linea_data_scanner' not in badges:
                 response, data = await session.post(
                     url='https://api.w3w.ai/v1/socialscan/user/task/sign_mint_badge',
@@ -1356,29 +1365,53 @@ class LineaPark(Client):
     async def start(self):
         for week in random.sample(self.tasks, len(self.tasks)):
             for task_name, task in random.sample(sorted(week.items()), len(week)):
-                if not await get_task_status(self.profile.evm_address, task_name):
-                    if await task():
-                        await task_done(self.profile.evm_address, task_name)
-                        await sleep(30, 60)
-                else:
+                state = self.jobs.state(self.profile.id, task_name)
+                # Runs before the job queue recorded completed tasks in linea_park.db only
+                if state is None and await get_task_status(self.profile.evm_address, task_name):
+                    self.jobs.add(self.profile.id, task_name)
+                    self.jobs.mark(self.profile.id, task_name, JobState.CONFIRMED)
+                    state = JobState.CONFIRMED
+                if state == JobState.CONFIRMED:
                     logger.success(f'{self.profile.id} | {self.account.address} | {task_name} already done')
-                    await task_done(self.profile.evm_address, task_name)
+                    continue
+                if await self.jobs.run(
+                        self.profile.id, task_name, task,
+                        verify=lambda tx_hash, name=task_name: self.verify_transaction(tx_hash, name)
+                ):
+                    await pause(30, 60, profile_id=self.profile.id)
         logger.success(f'{self.profile.id} | {self.account.address} | All tasks done')
 
 
-async def start(profile: Profile):
-    if not await select_profile(profile.id):
-        await insert_record(profile.evm_address, profile.id)
-    park = LineaPark(profile)
-    await park.start()
+async def start(profile: Profile, jobs: JobQueue, token_store: TokenStore):
+    async with LineaPark(profile, jobs, token_store) as park:
+        await park.start()
 
 
 async def main():
-    await asyncio.gather(
-        asyncio.create_task(start(profile))
-        for profile in await DBHelper(os.getenv('CONNECTION_STRING')).get_all_from_table(Profile)
+    await create_table()
+    jobs = JobQueue('linea_park_jobs.db', 'linea_park')
+    token_store = TokenStore(os.getenv('PASSPHRASE'))
+    profiles = await DBHelper(os.getenv('CONNECTION_STRING')).get_all_from_table(Profile)
+    await proxy_manager.check_all(profiles)
+    proxy_manager.start()
+    # ~10 RPC calls per transaction task, ulti_pilot is the only one calling ultiverse.io (paced below)
+    schedule = DelayPlanner(rates={Linea.rpc: 20}).plan(
+        profiles, tasks=29, requests={Linea.rpc: 10, 'ultiverse.io': 0.15}, concurrency=50
     )
+    async with LoopWatchdog(threshold=0.25) as watchdog:
+        try:
+            await Fleet(concurrency=50, per_proxy=1).run(
+                profiles, lambda profile: start(profile, jobs, token_store), chain=Linea.name, schedule=schedule
+            )
+        finally:
+            await session_pool.close_all()
+    for stall in watchdog.report()[:5]:
+        logger.warning(f'Loop blocked {stall["count"]} times, {stall["total"]:.1f} s in total at {stall["location"]}')
+    logger.info(f'Where the time went:\n{budget.table()}')
+    budget.export('linea_park_budget.json')
 
 
 if __name__ == "__main__":
+    set_pacing('ultiverse.io', MinInterval(2, jitter=2))
+    set_uvloop_event_loop_policy()
     asyncio.run(main())
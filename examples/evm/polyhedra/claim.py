@@ -5,7 +5,7 @@ from web3db import DBHelper, Profile
 from dotenv import load_dotenv
 
 from web3mt.evm.client import Client
-from web3mt.utils import ProfileSession, logger, set_windows_event_loop_policy, read_json
+from web3mt.utils import ProfileSession, logger, set_windows_event_loop_policy, read_json, Fleet
 
 load_dotenv()
 set_windows_event_loop_policy()
@@ -67,11 +67,8 @@ async def send_to_okx(profile: Profile):
 
 
 async def main():
-    tasks = []
     profiles: list[Profile] = await db.get_all_from_table(Profile)
-    for profile in profiles:
-        tasks.append(asyncio.create_task(send_to_okx(profile)))
-    await asyncio.gather(*tasks)
+    await Fleet(concurrency=50, per_proxy=1).run(profiles, send_to_okx)
 
 
 if __name__ == '__main__':
@@ -23,14 +23,17 @@ from db import *
 from config import *
 from onchain import *
 from web3mt.evm import Client, opBNB
-from web3mt.utils import logger, ProfileSession
+from web3mt.evm.transport import session_pool
+from web3mt.utils import logger, ProfileSession, JobQueue, TokenStore
 
 load_dotenv()
 
 
 class Reiki:
-    def __init__(self, profile: Profile):
+    def __init__(self, profile: Profile, jobs: JobQueue, token_store: TokenStore):
         self.profile = profile
+        self.jobs = jobs
+        self.token_store = token_store
         self.session = ProfileSession(profile)
         self.client = Client(opBNB, profile=profile)
 
@@ -43,6 +46,7 @@ class Reiki:
         else:
             logger.success(f'{self.profile.id} | Tasks completed')
         self.session.close()
+        await self.client.close()
 
     async def start_tasks(self, choice: int) -> None:
         if choice == 1:
@@ -81,7 +85,7 @@ class Reiki:
     async def create_bearer_token(self):
         nonce = await self.web3_nonce()
         token = await self.web3_challenge(nonce)
-        await insert_record(self.profile.id, token)
+        self.token_store.set(self.profile.id, 'reiki', token)
         self.session.headers['Authorization'] = f'Bearer {token}'
 
     async def web3_nonce(self) -> str:
@@ -349,13 +353,18 @@ class Reiki:
         await mint_chip(self.profile, nonce, signature)
 
 
-async def start(profile, choice: int) -> None:
-    async with Reiki(profile) as reiki:
-        if not await mint_profile(profile):
+async def start(profile, choice: int, jobs: JobQueue, token_store: TokenStore) -> None:
+    async with Reiki(profile, jobs, token_store) as reiki:
+        if not await reiki.jobs.run(
+                profile.id, 'mint_profile', lambda: mint_profile(profile),
+                verify=lambda tx_hash: verify_mint(profile, tx_hash)
+        ):
             return
-        token = await get_token(reiki.profile.id)
-        if token:
-            reiki.session.headers['Authorization'] = f'Bearer {token}'
+        if await get_token(reiki.profile.id) is None:
+            await insert_record(reiki.profile.id, '')
+        stored = reiki.token_store.get(reiki.profile.id, 'reiki')
+        if stored:
+            reiki.session.headers['Authorization'] = f'Bearer {stored.token}'
         await reiki.me()
         if choice == 3:
             await reiki.claim_chip()
@@ -372,11 +381,16 @@ async def main():
     await create_table()
 
     tasks = []
+    jobs = JobQueue('reiki_jobs.db', 'reiki')
+    token_store = TokenStore(os.getenv('PASSPHRASE'))
     db = DBHelper(os.getenv('CONNECTION_STRING'))
     profiles: list[Profile] = await db.get_all_from_table(Profile)
     for profile in profiles:
-        tasks.append(asyncio.create_task(start(profile, choice)))
-    await asyncio.gather(*tasks)
+        tasks.append(asyncio.create_task(start(profile, choice, jobs, token_store)))
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        await session_pool.close_all()
 
 
 if __name__ == '__main__':
@@ -9,12 +9,14 @@ from eth_account.messages import encode_typed_data, encode_defunct
 
 from web3mt.evm.client import Client
 from web3mt.evm.models import ZetaChain, BNB, TokenAmount, DefaultABIs
-from web3mt.utils import set_windows_event_loop_policy, logger, sleep, ProfileSession
+from web3mt.utils import set_windows_event_loop_policy, logger, sleep, ProfileSession, JobQueue, sessions, \
+    TokenStore, set_pacing, TokenBucket, MinInterval, RetryPolicy, http_cache
 from examples.evm.zetachain.config import *
 from examples.evm.zetachain.db import update_stats, create_table
 
 load_dotenv()
 set_windows_event_loop_policy()
+XP_RETRY_POLICY = RetryPolicy(attempts=10, base_delay=30, max_delay=800)
 
 
 async def zeta_and_bnb_price() -> tuple[float, float]:
@@ -24,18 +26,20 @@ async def zeta_and_bnb_price() -> tuple[float, float]:
 
 class ZetachainHub(Client):
 
-    def __init__(self, profile: Profile):
+    def __init__(self, profile: Profile, jobs: JobQueue, token_store: TokenStore):
         super().__init__(
             network=ZetaChain,
             profile=profile,
             encryption_password=passphrase,
             delay_between_requests=delay_between_rpc_requests
         )
+        self.jobs = jobs
+        self.token_store = token_store
         self.session = ProfileSession(
             profile, headers={
                 'Origin': 'https://hub.zetachain.com',
                 'Referer': 'https://hub.zetachain.com/'
-            }, requests_echo=False, verify=False
+            }, requests_echo=False, retry_policy=XP_RETRY_POLICY, http_cache=http_cache, verify=False
         )
         self.tasks = {
             "SEND_ZETA": self.receive_and_transfer,
@@ -62,6 +66,10 @@ class ZetachainHub(Client):
             "WEAVE_6_BUY_OR_SELL_NFT": None,
             "ULTIVERSE_ULTIPILOT_EXPLORE": self.ultiverse_explore,
         }
+        # Approve first, so after a crash they're re-run to send what's left instead of being reattached
+        self.multi_step_tasks = {
+            'POOL_DEPOSIT_ANY_POOL', 'RANGE_PROTOCOL_VAULT_TRANSACTION', 'ACCUMULATED_FINANCE_DEPOSIT'
+        }
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         await super().__aexit__(exc_type, exc_val, exc_tb)
@@ -105,48 +113,52 @@ class ZetachainHub(Client):
         )
 
     async def enroll_verify(self):
-        while True:
-            try:
-                response, data = await self.session.post(
-                    url="https://xp.cl04.zetachain.com/v1/enroll-in-zeta-xp",
-                    json={"address": self.account.address}
-                )
-                logger.info(f"{self.log_info} | Verify enroll status: {data['isUserVerified']}")
-                return
-            except RequestsError:
-                await sleep(600, 800, profile_id=self.profile.id)
+        response, data = await self.session.post(
+            url="https://xp.cl04.zetachain.com/v1/enroll-in-zeta-xp",
+            json={"address": self.account.address}
+        )
+        logger.info(f"{self.log_info} | Verify enroll status: {data['isUserVerified']}")
 
     async def ultiverse_explore(self):
         name = '"Explore" any ZetaChain network event on Ultiverse'
-        session = ProfileSession(
-            self.profile, headers={
-                'Origin': 'https://pilot-zetachain.ultiverse.io',
-                'Referer': 'https://pilot-zetachain.ultiverse.io/',
-                'Ul-Auth-Api-Key': 'YWktYWdlbnRAZFd4MGFYWmxjbk5s'
-            }, sleep_echo=False, requests_echo=False, verify=False
-        )
-        response, data = await session.post(
-            url=f'https://account-api.ultiverse.io/api/user/signature',
-            json={"address": self.account.address, 'chainId': self.network.chain_id, 'feature': "assets-wallet-login"}
-        )
-        message = data['data']['message']
-        signature = self.w3.eth.account.sign_message(
-            encode_defunct(text=message),
-            private_key=self.account.key.hex()
-        ).signature.hex()
-        response, data = await session.post(
-            url='https://account-api.ultiverse.io/api/wallets/signin',
-            json={"address": self.account.address, 'chainId': self.network.chain_id, 'signature': signature}
-        )
-        auth_token = data['data']['access_token']
-        session.headers.update({'Ul-Auth-Token': auth_token, 'Ul-Auth-Address': self.account.address})
-        session.cookies.update({'Ultiverse_Authorization': auth_token})
-
-        session.headers.pop('Ul-Auth-Api-Key')
-        response, data = await session.post(
-            url='https://pml.ultiverse.io/api/explore/sign',
-            json={'worldIds': ["Terminus"], 'chainId': self.network.chain_id}
-        )
+        api_key = {'Ul-Auth-Api-Key': 'YWktYWdlbnRAZFd4MGFYWmxjbk5s'}
+        async with sessions.session(
+                self.profile, headers={
+                    'Origin': 'https://pilot-zetachain.ultiverse.io',
+                    'Referer': 'https://pilot-zetachain.ultiverse.io/'
+                }, sleep_echo=False, requests_echo=False, verify=False
+        ) as session:
+            async def login() -> str:
+                response, data = await session.post(
+                    url=f'https://account-api.ultiverse.io/api/user/signature',
+                    json={
+                        "address": self.account.address, 'chainId': self.network.chain_id,
+                        'feature': "assets-wallet-login"
+                    },
+                    headers=api_key
+                )
+                message = data['data']['message']
+                signature = self.w3.eth.account.sign_message(
+                    encode_defunct(text=message),
+                    private_key=self.account.key.hex()
+                ).signature.hex()
+                response, data = await session.post(
+                    url='https://account-api.ultiverse.io/api/wallets/signin',
+                    json={"address": self.account.address, 'chainId': self.network.chain_id, 'signature': signature},
+                    headers=api_key
+                )
+                return data['data']['access_token']
+
+            async def explore_sign(auth_token: str) -> dict:
+                session.headers.update({'Ul-Auth-Token': auth_token, 'Ul-Auth-Address': self.account.address})
+                session.cookies.update({'Ultiverse_Authorization': auth_token})
+                response, data = await session.post(
+                    url='https://pml.ultiverse.io/api/explore/sign',
+                    json={'worldIds': ["Terminus"], 'chainId': self.network.chain_id}
+                )
+                return data
+
+            data = await self.token_store.call(self.profile.id, 'ultiverse', login, explore_sign)
         data = data['data']
         contract = self.w3.eth.contract(
             address=self.w3.to_checksum_address(data['contract']),
@@ -161,43 +173,52 @@ class ZetachainHub(Client):
 
     async def ultiverse_badge(self):
         async def get_mint_data():
-            session = ProfileSession(
-                self.profile, headers={
-                    'Origin': 'https://mission.ultiverse.io',
-                    'Referer': 'https://mission.ultiverse.io/',
-                    'Ul-Auth-Api-Key': 'bWlzc2lvbl9ydW5uZXJAZFd4MGFYWmxjbk5s'
-                }, sleep_echo=False, requests_echo=False, verify=False
-            )
-            response, data = await session.post(
-                url=f'https://toolkit.ultiverse.io/api/user/signature',
-                json={
-                    "address": self.account.address, 'chainId': self.network.chain_id, 'feature': "assets-wallet-login"
-                }
-            )
-            message = data['data']['message']
-            signature = self.w3.eth.account.sign_message(
-                encode_defunct(text=message),
-                private_key=self.account.key.hex()
-            ).signature.hex()
-            response, data = await session.post(
-                url='https://toolkit.ultiverse.io/api/wallets/signin',
-                json={"address": self.account.address, 'chainId': self.network.chain_id, 'signature': signature}
-            )
-            auth_token = data['data']['access_token']
-            session.headers.update({'Ul-Auth-Token': auth_token})
-            session.cookies.update({'Ultiverse_Authorization': auth_token})
-            response, data = await session.get(url='https://mission.ultiverse.io/api/tickets/list')
-            while True:
-                for badge in data['data']:
-                    if badge['endAt'] > int(datetime.now().timestamp()) > badge['startAt']:
-                        event_id = badge['eventId']
-                        response, data = await session.post(
-                            url="https://mission.ultiverse.io/api/tickets/mint",
-                            json={"address": self.account.address, 'eventId': event_id}
-                        )
-                        if data['success']:
-                            return data['data']
-                        logger.warning(f'{self.log_info} | {data["err"]} - {badge["name"]}')
+            async with sessions.session(
+                    self.profile, headers={
+                        'Origin': 'https://mission.ultiverse.io',
+                        'Referer': 'https://mission.ultiverse.io/',
+                        'Ul-Auth-Api-Key': 'bWlzc2lvbl9ydW5uZXJAZFd4MGFYWmxjbk5s'
+                    }, sleep_echo=False, requests_echo=False, http_cache=http_cache, verify=False
+            ) as session:
+                async def login() -> str:
+                    response, data = await session.post(
+                        url=f'https://toolkit.ultiverse.io/api/user/signature',
+                        json={
+                            "address": self.account.address, 'chainId': self.network.chain_id,
+                            'feature': "assets-wallet-login"
+                        }
+                    )
+                    message = data['data']['message']
+                    signature = self.w3.eth.account.sign_message(
+                        encode_defunct(text=message),
+                        private_key=self.account.key.hex()
+                    ).signature.hex()
+                    response, data = await session.post(
+                        url='https://toolkit.ultiverse.io/api/wallets/signin',
+                        json={
+                            "address": self.account.address, 'chainId': self.network.chain_id, 'signature': signature
+                        }
+                    )
+                    return data['data']['access_token']
+
+                async def tickets(auth_token: str) -> dict:
+                    session.headers.update({'Ul-Auth-Token': auth_token})
+                    session.cookies.update({'Ultiverse_Authorization': auth_token})
+                    response, data = await session.get(url='https://mission.ultiverse.io/api/tickets/list')
+                    return data
+
+                data = await self.token_store.call(self.profile.id, 'ultiverse_mission', login, tickets)
+                while True:
+                    for badge in data['data']:
+                        if badge['endAt'] > int(datetime.now().timestamp()) > badge['startAt']:
+                            event_id = badge['eventId']
+                            response, data = await session.post(
+                                url="https://mission.ultiverse.io/api/tickets/mint",
+                                json={"address": self.account.address, 'eventId': event_id}
+                            )
+                            if data['success']:
+                                return data['data']
+                            logger.warning(f'{self.log_info} | {data["err"]} - {badge["name"]}')
 
         mint_data = await get_mint_data()
         if not mint_data:
@@ -253,7 +274,6 @@ class ZetachainHub(Client):
     async def nativex(self):
         headers = {
             'Apikey': 'JWL73SF2K899AMPFRHZV',
-            'If-None-Match': 'W/"12bb-HV/fFStOEEJTzXLYMNmpdVK9MjQ"',
             'Origin': 'https://nativex.finance',
             'Referer': 'https://nativex.finance/'
         }
@@ -519,20 +539,14 @@ class ZetachainHub(Client):
                 return
 
     async def check_tasks(self) -> tuple[list[str], list[str]]:
-        while True:
-            try:
-                response, data = await self.session.get(
-                    url="https://xp.cl04.zetachain.com/v1/get-user-has-xp-to-refresh",
-                    params={"address": self.account.address},
-                    headers={
-                        'Origin': 'https://hub.zetachain.com',
-                        'Referer': 'https://hub.zetachain.com/'
-                    },
-                    retry_delay=random.uniform(200, 300)
-                )
-                break
-            except RequestsError:
-                await sleep(600, 800, profile_id=self.profile.id)
+        response, data = await self.session.get(
+            url="https://xp.cl04.zetachain.com/v1/get-user-has-xp-to-refresh",
+            params={"address": self.account.address},
+            headers={
+                'Origin': 'https://hub.zetachain.com',
+                'Referer': 'https://hub.zetachain.com/'
+            }
+        )
 
         tasks_to_refresh = []
         tasks_to_do = []
@@ -553,41 +567,32 @@ class ZetachainHub(Client):
                 "task": task,
                 "signedMessage": self.generate_signature(),
             }
-            while True:
-                try:
-                    await self.session.post(
-                        url="https://xp.cl04.zetachain.com/v1/xp/claim-task",
-                        json=claim_data,
-                        headers={
-                            'Origin': 'https://hub.zetachain.com',
-                            'Referer': 'https://hub.zetachain.com/'
-                        }
-                    )
-                    break
-                except RequestsError:
-                    await sleep(600, 800, profile_id=self.profile.id)
+            await self.session.post(
+                url="https://xp.cl04.zetachain.com/v1/xp/claim-task",
+                json=claim_data,
+                headers={
+                    'Origin': 'https://hub.zetachain.com',
+                    'Referer': 'https://hub.zetachain.com/'
+                }
+            )
 
             logger.success(f"{self.log_info} | Claimed {task} task")
             await sleep(delay_between_http_requests, echo=False)
         return available_tasks
 
     async def get_stats(self) -> dict | None:
-        while True:
-            try:
-                response, data = await self.session.get(
-                    url=f'https://xp.cl04.zetachain.com/v1/get-points?address={self.account.address}',
-                    headers={
-                        'Origin': 'https://hub.zetachain.com',
-                        'Referer': 'https://hub.zetachain.com/'
-                    }
-                )
-                return {'level': data['level'], 'points': data['totalXp'], 'rank': data['rank']}
-            except RequestsError:
-                await sleep(600, 800, profile_id=self.profile.id)
+        response, data = await self.session.get(
+            url=f'https://xp.cl04.zetachain.com/v1/get-points?address={self.account.address}',
+            headers={
+                'Origin': 'https://hub.zetachain.com',
+                'Referer': 'https://hub.zetachain.com/'
+            }
+        )
+        return {'level': data['level'], 'points': data['totalXp'], 'rank': data['rank']}
 
 
-async def process_account(profile: Profile) -> dict | None:
-    async with ZetachainHub(profile) as zh:
+async def process_account(profile: Profile, jobs: JobQueue, token_store: TokenStore) -> dict | None:
+    async with ZetachainHub(profile, jobs, token_store) as zh:
         logger.info(f'{zh.log_info} | Balance {await zh.get_native_balance()} ZETA')
         await zh.enroll()
         await sleep(delay_between_http_requests, echo=False)
@@ -599,7 +604,11 @@ async def process_account(profile: Profile) -> dict | None:
         if choice == 1:
             for task in random.sample(available_quests, len(available_quests)):
                 if zh.tasks[task]:
-                    await zh.tasks[task]()
+                    await zh.jobs.run(
+                        profile.id, task, zh.tasks[task],
+                        verify=lambda tx_hash, name=task: zh.verify_transaction(tx_hash, name),
+                        resumable=task in zh.multi_step_tasks
+                    )
                     await sleep(random.uniform(30, 60))
         await zh.claim_tasks()
         logger.success(f'{zh.log_info} | All tasks claimed')
@@ -618,7 +627,6 @@ async def swap_btc_to_zeta(profile: Profile):
         btc_balance = await client.balance_of(token_address=TOKENS['BTC.BTC'])
         headers = {
             'Apikey': 'JWL73SF2K899AMPFRHZV',
-            'If-None-Match': 'W/"12bb-HV/fFStOEEJTzXLYMNmpdVK9MjQ"',
             'Origin': 'https://nativex.finance',
             'Referer': 'https://nativex.finance/'
         }
@@ -659,6 +667,8 @@ async def swap_btc_to_zeta(profile: Profile):
 async def main():
     await create_table()
     db = DBHelper(os.getenv('CONNECTION_STRING'))
+    jobs = JobQueue('zetachain_jobs.db', 'zetachain')
+    token_store = TokenStore(passphrase)
     profiles: list[Profile] = await db.get_rows_by_id([
         # 1,
         # 99, 100, 101, 102, 103, 104, 105, 106, 107, 108, 110, 111, 112, 113, 114, 115, 116, 118, 119, 120, 121, 122,
@@ -668,7 +678,12 @@ async def main():
         # 315, 318, 319, 320, 322, 325, 326, 329, 330, 331, 337, 338, 340, 341, 345, 346, 347, 348, 350, 351, 352, 354,
         # 355, 356, 357, 358, 359, 360, 362, 363, 364
     ], Profile)
-    stats = await asyncio.gather(*[asyncio.create_task(process_account(profile)) for profile in profiles])
+    try:
+        stats = await asyncio.gather(*[
+            asyncio.create_task(process_account(profile, jobs, token_store)) for profile in profiles
+        ])
+    finally:
+        await sessions.close_all()
     return stats or (await update_stats(**stat) for stat in stats)
 
 
@@ -677,6 +692,8 @@ if __name__ == "__main__":
     okx_api_key = os.getenv('OKX_API_KEY')
     okx_api_secret = os.getenv('OKX_API_SECRET')
     okx_passphrase = os.getenv('OKX_API_PASSPHRASE')
+    set_pacing('xp.cl04.zetachain.com', TokenBucket(rate=1, burst=3))
+    set_pacing('ultiverse.io', MinInterval(2, jitter=2))
     zeta_price, bnb_price = asyncio.run(zeta_and_bnb_price())
     logger.info(f'ZETA: {zeta_price}, BNB: {bnb_price}')
     choice = int(
@@ -7,7 +7,7 @@ from web3db import DBHelper, Profile
 from dotenv import load_dotenv
 
 from web3mt.evm import Client, Zora
-from web3mt.utils import read_json, read_txt
+from web3mt.utils import read_json, read_txt, Fleet
 
 load_dotenv()
 
@@ -42,14 +42,9 @@ async def start(profile: Profile):
 
 
 async def main():
-    tasks = []
     db = DBHelper(os.getenv('CONNECTION_STRING'))
     profiles: list[Profile] = await db.get_all_from_table(Profile)
-
-    for profile in profiles:
-        tasks.append(asyncio.create_task(start(profile)))
-
-    await asyncio.gather(*tasks)
+    await Fleet(concurrency=50, per_proxy=1).run(profiles, start, chain=Zora.name)
 
 
 if __name__ == '__main__':
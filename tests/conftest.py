@@ -0,0 +1,20 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+try:
+    import web3db
+except ImportError:
+    # web3db isn't on PyPI, fall back to the stand-in so the suite collects without it. Inserting into sys.path
+    # rather than sys.modules lets spawned sharding workers import it too
+    sys.path.insert(0, str(Path(__file__).parent / 'stubs'))
+
+from web3mt.evm.standin import StandInNode
+
+
+@pytest.fixture(scope='session')
+def standin_node():
+    """One stand-in node for the whole session, its chain state carries over between tests"""
+    with StandInNode(accounts=10) as node:
+        yield node
@@ -0,0 +1,3 @@
+"""Stand-in for the unpackaged web3db, put on sys.path by conftest.py only when the real one is missing"""
+from .core import DBHelper
+from .models import Profile, Email
@@ -0,0 +1,3 @@
+class DBHelper:
+    def __init__(self, url: str = None):
+        self.url = url
@@ -0,0 +1,13 @@
+class Profile:
+    def __init__(self, id: int = None, proxy=None, evm_address: str = None, evm_private: str = None, **kwargs):
+        self.id = id
+        self.proxy = proxy
+        self.evm_address = evm_address
+        self.evm_private = evm_private
+        self.__dict__.update(kwargs)
+
+
+class Email:
+    def __init__(self, login: str = None, password: str = None):
+        self.login = login
+        self.password = password
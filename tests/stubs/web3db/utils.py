@@ -0,0 +1,9 @@
+DEFAULT_UA = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+
+def decrypt(data: str, password: str) -> str:
+    return data
+
+
+def encrypt(data: str, password: str) -> str:
+    return data
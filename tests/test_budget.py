@@ -0,0 +1,29 @@
+import pytest
+
+from web3mt.utils.budget import GWEI, NO_TASK, OTHER, SLEEP, WaitBudget
+from web3mt.utils.clock import VirtualClock
+
+
+def test_wall_time_is_split_into_waits_and_other():
+    clock = VirtualClock()
+    budget = WaitBudget()
+
+    async def main():
+        with budget.profile(1):
+            with budget.task(1, 'swap'):
+                with budget.measure(GWEI):
+                    with budget.measure(SLEEP):
+                        await clock.sleep(30)
+                with budget.measure(SLEEP):
+                    await clock.sleep(10)
+                await clock.sleep(5)
+            await clock.sleep(20)
+
+    clock.run(main())
+    rows = {row['task']: row for row in budget.breakdown('task')}
+    swap = rows['swap']
+    assert (swap['wall'], swap[GWEI], swap[SLEEP], swap[OTHER]) == pytest.approx((45, 30, 10, 5), abs=0.5)
+    assert (rows[NO_TASK]['wall'], rows[NO_TASK][OTHER]) == pytest.approx((20, 20), abs=0.5)
+    [profile] = budget.breakdown('profile')
+    assert profile['profile'] == 1 and profile['wall'] == pytest.approx(65, abs=0.5)
+    assert budget.table().splitlines()[-1].startswith('total')
@@ -0,0 +1,32 @@
+import asyncio
+from contextlib import aclosing
+
+from web3mt.evm.cache import RPCResponseCache
+from web3mt.evm.transport import session_pool
+
+
+def test_empty_cache_is_filled(standin_node):
+    cache = RPCResponseCache()
+    assert len(cache) == 0
+
+    async def main():
+        try:
+            async with aclosing(standin_node.client(0, rpc_cache=cache)) as client:
+                for _ in range(3):
+                    assert await client.w3.eth.chain_id == standin_node.chain.chain_id
+        finally:
+            await session_pool.close_all()
+
+    calls = standin_node.chain.calls.get('eth_chainId', 0)
+    asyncio.run(main())
+    assert len(cache) == 1
+    assert cache.hits == 2
+    assert standin_node.chain.calls.get('eth_chainId', 0) - calls == 1
+
+
+def test_unpinned_and_block_object_reads_are_not_cached():
+    cache = RPCResponseCache()
+    address = '0x' + '11' * 20
+    assert cache._finality_candidate('eth_getCode', [address, 'latest'], '0x6080') is None
+    assert cache._finality_candidate('eth_getBalance', [address, {'blockHash': '0x' + '22' * 32}], '0x1') is None
+    assert cache._finality_candidate('eth_getCode', [address, '0x10'], '0x6080') == 16
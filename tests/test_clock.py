@@ -0,0 +1,34 @@
+import asyncio
+import time
+
+from web3mt.utils import sleep
+from web3mt.utils.clock import Clock, VirtualClock, get_clock
+
+
+def test_virtual_sleeps_end_in_order_without_waiting():
+    clock = VirtualClock()
+    finished = []
+
+    async def worker(delay: float):
+        await sleep(delay, echo=False)
+        finished.append((delay, round(clock.elapsed)))
+
+    async def main():
+        assert get_clock() is clock
+        await asyncio.gather(*[worker(delay) for delay in (600, 300, 900)])
+
+    start = time.monotonic()
+    clock.run(main())
+    assert time.monotonic() - start < 5
+    assert finished == [(300, 300), (600, 600), (900, 900)]
+    assert type(get_clock()) is Clock
+
+
+def test_skipped_time_does_not_fire_real_timeouts():
+    clock = VirtualClock()
+
+    async def main():
+        await asyncio.wait_for(clock.sleep(3600), timeout=1)
+        return clock.elapsed
+
+    assert clock.run(main()) >= 3600
@@ -0,0 +1,19 @@
+from types import SimpleNamespace
+
+import pytest
+
+from web3mt.utils.decoding import decode
+
+
+def response(content: bytes, content_type: str):
+    return SimpleNamespace(content=content, text=content.decode(), headers={'Content-Type': content_type})
+
+
+@pytest.mark.parametrize('content_type', ['text/plain', 'text/html; charset=utf-8', 'application/json'])
+def test_json_under_any_content_type(content_type):
+    assert decode(response(b'{"total": 5}', content_type)) == {'total': 5}
+
+
+@pytest.mark.parametrize('content_type', ['text/plain', 'text/html', ''])
+def test_text_falls_back_to_str(content_type):
+    assert decode(response(b'<html>ok</html>', content_type)) == '<html>ok</html>'
@@ -0,0 +1,38 @@
+import asyncio
+import builtins
+
+import pytest
+
+from web3mt.utils import set_uvloop_event_loop_policy
+
+
+@pytest.fixture
+def restore_policy():
+    policy = asyncio.get_event_loop_policy()
+    yield
+    asyncio.set_event_loop_policy(policy)
+
+
+def test_uvloop_policy_runs_the_loop(restore_policy):
+    uvloop = pytest.importorskip('uvloop')
+    assert set_uvloop_event_loop_policy()
+
+    async def main():
+        await asyncio.sleep(0)
+        return asyncio.get_running_loop()
+
+    assert isinstance(asyncio.run(main()), uvloop.Loop)
+
+
+def test_falls_back_without_uvloop(restore_policy, monkeypatch):
+    import_module = builtins.__import__
+
+    def without_uvloop(name, *args, **kwargs):
+        if name == 'uvloop':
+            raise ImportError(name)
+        return import_module(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, '__import__', without_uvloop)
+    policy = asyncio.get_event_loop_policy()
+    assert not set_uvloop_event_loop_policy()
+    assert asyncio.get_event_loop_policy() is policy
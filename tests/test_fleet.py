@@ -0,0 +1,18 @@
+import asyncio
+from types import SimpleNamespace
+
+from web3mt.utils import Fleet
+
+
+async def echo(profile) -> int:
+    await asyncio.sleep(0)
+    return profile.id
+
+
+def test_fairness_state_is_dropped_when_groups_finish():
+    fleet = Fleet(concurrency=10)
+    profiles = [SimpleNamespace(id=i, proxy=None) for i in range(500)]
+    assert asyncio.run(fleet.run(profiles, echo)) == list(range(500))
+    assert not fleet.served
+    assert not fleet.queued
+    assert not fleet.active
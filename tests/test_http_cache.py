@@ -0,0 +1,68 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+from web3mt.utils.http_cache import SHARED, HTTPCache
+from web3mt.utils.profile_session import ProfileSession
+
+
+class Handler(BaseHTTPRequestHandler):
+    etag = '"v1"'
+    requests = []
+
+    def do_GET(self):
+        self.requests.append(self.headers.get('If-None-Match'))
+        if self.headers.get('If-None-Match') == self.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = json.dumps({'path': self.path}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', self.etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_revalidated_responses_come_from_cache():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_port}/status'
+    cache = HTTPCache()
+
+    async def main():
+        for profile_id in (1, 1, 2):
+            profile = SimpleNamespace(id=profile_id, proxy=None)
+            async with ProfileSession(profile, http_cache=cache, requests_echo=False) as session:
+                response, data = await session.get(url, cache=SHARED)
+                assert response.status_code == 200 and data == {'path': '/status'}
+
+    try:
+        asyncio.run(main())
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert Handler.requests == [None, '"v1"', '"v1"']
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_profile_scope_and_eviction():
+    cache = HTTPCache(maxsize=2)
+    response = SimpleNamespace(headers={'ETag': '"a"'})
+    first = cache.key('https://example.com', {'b': 2, 'a': 1}, profile_id=1)
+    assert first == cache.key('https://example.com', {'a': 1, 'b': 2}, profile_id=1)
+    assert first != cache.key('https://example.com', {'a': 1, 'b': 2}, profile_id=2)
+    cache.store(first, response, 'first')
+    cache.store(('x', 'https://example.com/no-validators', ''), SimpleNamespace(headers={}), None)
+    assert len(cache.entries) == 1
+    cache.store((1, 'https://example.com/2', ''), response, 'second')
+    cache.get(first)
+    cache.store((1, 'https://example.com/3', ''), response, 'third')
+    assert list(cache.entries) == [first, (1, 'https://example.com/3', '')]
+    assert cache.validators(cache.get(first)) == {'If-None-Match': '"a"'}
@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from web3mt.utils import JobQueue, JobState, checkpoint_tx
+
+
+def test_reverted_transaction_fails_unit(tmp_path):
+    jobs = JobQueue(tmp_path / 'jobs.db')
+
+    async def mint():
+        checkpoint_tx('0xmint')
+        return '0xmint'
+
+    async def verify(tx_hash):
+        return False
+
+    assert asyncio.run(jobs.run(1, 'mint', mint, verify=verify)) is False
+    assert jobs.state(1, 'mint') == JobState.FAILED
+
+
+def test_sent_unit_is_reattached_not_resent(tmp_path):
+    jobs = JobQueue(tmp_path / 'jobs.db')
+    sent = []
+
+    async def transfer():
+        sent.append('0xtransfer')
+        checkpoint_tx('0xtransfer')
+        if len(sent) == 1:
+            raise ConnectionError('crashed after broadcast')
+        return True
+
+    async def verify(tx_hash):
+        return True
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(jobs.run(1, 'transfer', transfer, verify=verify))
+    assert jobs.state(1, 'transfer') == JobState.SENT
+    assert asyncio.run(jobs.run(1, 'transfer', transfer, verify=verify))
+    assert sent == ['0xtransfer']
+    assert jobs.state(1, 'transfer') == JobState.CONFIRMED
+
+
+def test_resumable_unit_is_rerun_after_its_transactions_land(tmp_path):
+    jobs = JobQueue(tmp_path / 'jobs.db')
+    sent, verified = [], []
+
+    async def approve_then_swap():
+        for step in ('0xapprove', '0xswap'):
+            if step not in sent:
+                sent.append(step)
+                checkpoint_tx(step)
+                if step == '0xapprove' and len(sent) == 1:
+                    raise ConnectionError('crashed after approve')
+        return True
+
+    async def verify(tx_hash):
+        verified.append(tx_hash)
+        return True
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(jobs.run(1, 'swap', approve_then_swap, verify=verify, resumable=True))
+    assert jobs.state(1, 'swap') == JobState.SENT
+    assert asyncio.run(jobs.run(1, 'swap', approve_then_swap, verify=verify, resumable=True))
+    assert sent == ['0xapprove', '0xswap']
+    assert verified == ['0xapprove', '0xswap']
+    assert jobs.get(1, 'swap')['state'] == JobState.CONFIRMED
@@ -0,0 +1,31 @@
+import asyncio
+
+from web3mt.evm.client import Client, LightClient, _shared_web3, close_shared_web3
+from web3mt.evm.transport import session_pool
+
+
+def test_light_clients_share_one_web3(standin_node):
+    network = standin_node.network
+    addresses = [account.address for account in standin_node.accounts[5:]]
+
+    async def main():
+        try:
+            lights = [Client.for_address(network, address.lower()) for address in addresses]
+            assert all(isinstance(light, LightClient) for light in lights)
+            assert len({id(light.w3) for light in lights}) == 1
+            assert [light.address for light in lights] == addresses
+            balances = await asyncio.gather(*[light.get_native_balance() for light in lights])
+            tokens = await asyncio.gather(*[
+                light.balance_of(token_address=standin_node.token.address) for light in lights
+            ])
+            [entry] = session_pool.entries.values()
+            assert entry.users == 1
+            for address, balance, token in zip(addresses, balances, tokens):
+                assert balance.Wei == standin_node.chain.balances[address]
+                assert token.Wei == standin_node.token.balances[address]
+            await close_shared_web3()
+            assert not _shared_web3 and entry.users == 0
+        finally:
+            await session_pool.close_all()
+
+    asyncio.run(main())
@@ -0,0 +1,22 @@
+from types import SimpleNamespace
+
+from web3mt.utils.logger import Sampler
+
+
+def record(message: str, level: str = 'DEBUG', no: int = 10) -> dict:
+    return {'level': SimpleNamespace(name=level, no=no), 'message': message, 'extra': {}}
+
+
+def test_every_sink_gets_the_same_decision():
+    sampler = Sampler({'DEBUG': 0.5})
+    records = [record(f'message {i}') for i in range(200)]
+    stderr = [sampler(r) for r in records]
+    general_log = [sampler(r) for r in records]
+    assert stderr == general_log
+    assert 0 < sum(stderr) < len(records)
+
+
+def test_warnings_are_never_sampled_out():
+    sampler = Sampler({'WARNING': 0, '💤 Sleeping for': 0})
+    assert sampler(record('💤 Sleeping for 5 s', 'WARNING', 30))
+    assert not sampler(record('1 | 💤 Sleeping for 5 s'))
@@ -0,0 +1,37 @@
+import asyncio
+from contextlib import aclosing
+
+from web3mt.evm.metrics import Histogram, RPCMetrics
+from web3mt.evm.transport import session_pool
+
+
+def test_calls_are_counted_per_method(standin_node):
+    metrics = RPCMetrics()
+
+    async def main():
+        try:
+            async with aclosing(standin_node.client(1, rpc_metrics=metrics)) as client:
+                for _ in range(3):
+                    await client.w3.eth.chain_id
+                await client.w3.eth.get_balance(client.account.address)
+        finally:
+            await session_pool.close_all()
+
+    asyncio.run(main())
+    totals = metrics.totals()
+    assert totals['eth_chainId']['calls'] == 3
+    assert totals['eth_getBalance']['calls'] == 1
+    assert not any(total['errors'] for total in totals.values())
+    assert totals['eth_getBalance']['request_bytes'] > 0 and totals['eth_getBalance']['response_bytes'] > 0
+    exported = metrics.to_prometheus()
+    assert 'web3mt_rpc_calls_total{method="eth_chainId"' in exported
+    assert exported.count('web3mt_rpc_latency_seconds_count{') == len(metrics.series)
+
+
+def test_histogram_is_cumulative():
+    histogram = Histogram(buckets=(0.1, 1))
+    for value in (0.05, 0.5, 0.5, 5):
+        histogram.observe(value)
+    assert histogram.cumulative() == [('0.1', 1), ('1', 3), ('+Inf', 4)]
+    assert histogram.quantile(0.5) == 1
+    assert histogram.sum == 6.05
@@ -0,0 +1,41 @@
+import pytest
+
+from web3mt.utils.pacing import NO_PACING, MinInterval, PacingRegistry, SharedPacing, TokenBucket
+
+
+def test_min_interval_spaces_requests():
+    policy = MinInterval(1)
+    delays = [policy.reserve() for _ in range(3)]
+    assert delays == pytest.approx([0, 1, 2], abs=0.05)
+
+
+def test_token_bucket_allows_burst_then_rate():
+    policy = TokenBucket(rate=2, burst=3)
+    delays = [policy.reserve() for _ in range(5)]
+    assert delays == pytest.approx([0, 0, 0, 0.5, 1], abs=0.05)
+
+
+def test_registry_matches_subdomains():
+    registry = PacingRegistry()
+    parent, child = MinInterval(1), MinInterval(2)
+    registry.set('Example.com', parent)
+    registry.set('api.example.com', child)
+    assert registry.get('https://www.example.com/path') is parent
+    assert registry.get('https://api.example.com/path') is child
+    assert registry.get('v2.api.example.com') is child
+    assert registry.get('https://example.org') is NO_PACING
+    registry.remove('api.example.com')
+    assert registry.get('https://api.example.com/path') is parent
+
+
+def test_shared_registry_wraps_rated_policies():
+    registry = PacingRegistry()
+    bucket = TokenBucket(rate=5, burst=2)
+    registry.set('example.com', bucket)
+    registry.set('example.org', MinInterval(0))
+    registry.share(lambda key, rate, burst: 0.0)
+    shared = registry.get('https://example.com')
+    assert isinstance(shared, SharedPacing)
+    assert (shared.key, shared.rate, shared.burst) == ('pacing:example.com', 5, 2)
+    assert registry.get('https://example.com') is shared
+    assert isinstance(registry.get('https://example.org'), MinInterval)
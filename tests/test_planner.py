@@ -0,0 +1,40 @@
+from types import SimpleNamespace
+
+import pytest
+
+from web3mt.utils import Fleet
+from web3mt.utils.clock import VirtualClock
+from web3mt.utils.pacing import TokenBucket, pacing
+from web3mt.utils.planner import DelayPlanner, pause
+
+
+def test_plan_keeps_upstreams_under_their_limits():
+    profiles = [SimpleNamespace(id=i, proxy=None) for i in range(4)]
+    pacing.set('api.example.com', TokenBucket(rate=2))
+    try:
+        planner = DelayPlanner(rates={'rpc': 10}, headroom=0.8, jitter=0, min_spacing=30)
+        assert planner.rate_of('https://api.example.com') == 2
+        schedule = planner.plan(profiles, tasks=10, requests={'rpc': 200, 'api.example.com': 1}, concurrency=2)
+    finally:
+        pacing.remove('api.example.com')
+    # rpc needs 10 tasks * 200 requests / (10 rps * 0.8) = 250 s per profile, more than api.example.com (6.25 s)
+    # and min spacing (10 tasks * 30 s / 2 concurrent = 150 s)
+    assert schedule.interval == pytest.approx(250)
+    assert schedule.spacing == pytest.approx(50)
+    assert [schedule.start_of(profile) for profile in profiles] == pytest.approx([0, 250, 500, 750])
+
+
+def test_fleet_starts_profiles_on_schedule():
+    clock = VirtualClock()
+    profiles = [SimpleNamespace(id=i, proxy=None) for i in range(3)]
+    schedule = DelayPlanner(jitter=0, min_spacing=60).plan(profiles, tasks=2, requests={}, concurrency=1)
+    started = {}
+
+    async def job(profile):
+        started[profile.id] = round(clock.elapsed)
+        await pause(1, 2, echo=False)
+        return round(clock.elapsed) - started[profile.id]
+
+    gaps = clock.run(Fleet(concurrency=3).run(profiles, job, schedule=schedule))
+    assert started == {0: 0, 1: 120, 2: 240}
+    assert gaps == [60, 60, 60]
@@ -0,0 +1,33 @@
+import asyncio
+import json
+import time
+
+from web3mt.utils.profiler import SamplingProfiler
+
+
+def burn(seconds: float) -> int:
+    total, end = 0, time.process_time() + seconds
+    while time.process_time() < end:
+        total += 1
+    return total
+
+
+async def job():
+    await asyncio.sleep(0)
+    burn(0.3)
+
+
+def test_cpu_is_attributed_to_task_and_function(tmp_path):
+    async def main():
+        async with SamplingProfiler(interval=0.002, package=__name__) as profiler:
+            await asyncio.create_task(job(), name='profile:12')
+        return profiler
+
+    profiler = asyncio.run(main())
+    assert profiler.samples > 0
+    [top] = [row for row in profiler.top() if row['function'] == f'{__name__}:burn']
+    assert top['share'] > 0.5 and top['self_s'] > 0
+    assert any(stack[0] == 'task:profile:N' and stack[-1].endswith(':burn') for stack in profiler.stacks)
+    folded = profiler.write(tmp_path / 'run')
+    assert folded.read_text().startswith('task:profile:N;')
+    assert json.loads((tmp_path / 'run.json').read_text())['samples'] == profiler.samples
@@ -0,0 +1,54 @@
+import asyncio
+from types import SimpleNamespace
+
+from curl_cffi.requests import RequestsError
+
+from web3mt.utils.clock import VirtualClock
+from web3mt.utils.retry import CircuitBreaker, CircuitState, ErrorKind, RetryPolicy, parse_retry_after
+
+
+def error(status: int = 0, code: int = 0, headers: dict = None) -> RequestsError:
+    return RequestsError('error', code, SimpleNamespace(status_code=status, headers=headers or {}))
+
+
+def test_errors_are_classified():
+    policy = RetryPolicy()
+    assert policy.classify(error(429)) == ErrorKind.RATE_LIMITED
+    assert policy.classify(error(503)) == ErrorKind.TRANSIENT
+    assert policy.classify(error(404)) == ErrorKind.FATAL
+    assert policy.classify(error(code=28)) == ErrorKind.TRANSIENT
+    assert policy.classify(error(code=60)) == ErrorKind.FATAL
+
+
+def test_retry_after_wins_over_backoff():
+    policy = RetryPolicy(base_delay=1, factor=2, max_delay=60)
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0
+    assert parse_retry_after('soon') is None
+    assert policy.delay(3, error(429, headers={'Retry-After': '7'})) == 7
+    assert policy.delay(0, error(429, headers={'Retry-After': '3600'})) == 60
+    assert 4 <= policy.delay(3, error(503)) <= 8
+
+
+def test_breaker_lets_one_probe_through_after_timeout():
+    clock = VirtualClock()
+    breaker = CircuitBreaker('example.com', failure_threshold=2, reset_timeout=30)
+
+    async def main():
+        breaker.failure()
+        assert breaker.state == CircuitState.CLOSED
+        breaker.failure()
+        assert breaker.state == CircuitState.OPEN
+        start = clock.time()
+        done, pending = await asyncio.wait(
+            [asyncio.create_task(breaker.wait()) for _ in range(2)], return_when=asyncio.FIRST_COMPLETED
+        )
+        assert len(done) == 1 and clock.time() - start >= 30
+        assert breaker.state == CircuitState.HALF_OPEN
+        breaker.failure()
+        assert breaker.state == CircuitState.OPEN and breaker.reset_timeout == 60
+        await pending.pop()
+        assert clock.time() - start >= 90
+        breaker.success()
+        assert breaker.state == CircuitState.CLOSED and breaker.reset_timeout == 30
+
+    clock.run(main())
@@ -0,0 +1,26 @@
+import asyncio
+from types import SimpleNamespace
+
+from web3mt.utils.sessions import SessionRegistry
+
+
+def test_sessions_are_shared_and_refcounted():
+    registry = SessionRegistry()
+    profile, other = SimpleNamespace(id=1, proxy=None), SimpleNamespace(id=2, proxy=None)
+
+    async def main():
+        async with registry.session(profile, headers={'Origin': 'https://example.com'}) as first:
+            async with registry.session(profile, headers={'origin': 'https://example.com'}) as second:
+                assert second is first
+                assert registry.refs[registry.key(profile, headers={'Origin': 'https://example.com'})] == 2
+            echo_off = registry.acquire(profile, requests_echo=False)
+            assert echo_off is not first
+        assert registry.acquire(other) is not first
+        assert len(registry) == 3
+        assert registry.refs[registry.key(profile, headers={'Origin': 'https://example.com'})] == 0
+        await registry.close_profile(1)
+        assert len(registry) == 1 and first._closed and echo_off._closed
+        await registry.close_all()
+        assert not registry.sessions and not registry.refs
+
+    asyncio.run(main())
@@ -0,0 +1,39 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from web3mt.utils import TokenBucket, pacing, set_pacing
+from web3mt.utils.sharding import run_sharded
+
+RATE = 20
+REQUESTS = 10
+
+
+async def noop(profile) -> None:
+    pass
+
+
+async def paced_requests(profile) -> list[float]:
+    policy = pacing.get('https://paced.test/api')
+    stamps = []
+    for _ in range(REQUESTS):
+        await policy.wait()
+        stamps.append(time.time())
+    return stamps
+
+
+def test_no_profiles():
+    assert asyncio.run(run_sharded([], noop, processes=2)) == []
+
+
+def test_workers_share_one_rate():
+    set_pacing('paced.test', TokenBucket(rate=RATE, burst=1))
+    try:
+        profiles = [SimpleNamespace(id=i, proxy=None) for i in range(2)]
+        results = asyncio.run(run_sharded(profiles, paced_requests, processes=2))
+    finally:
+        pacing.remove('paced.test')
+    stamps = sorted(stamp for result in results for stamp in result)
+    assert len(stamps) == 2 * REQUESTS
+    # Each worker alone would finish in (REQUESTS - 1) / RATE, half of what the shared budget allows
+    assert stamps[-1] - stamps[0] >= (2 * REQUESTS - 1) / RATE * 0.9
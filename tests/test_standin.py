@@ -0,0 +1,40 @@
+import asyncio
+from contextlib import aclosing
+
+from web3mt.evm.models import TokenAmount
+from web3mt.evm.transport import session_pool
+
+
+def run(coroutine):
+    async def main():
+        try:
+            return await coroutine
+        finally:
+            await session_pool.close_all()
+
+    return asyncio.run(main())
+
+
+def test_send_and_verify(standin_node):
+    recipient = standin_node.accounts[1].address
+
+    async def main():
+        async with aclosing(standin_node.client(0)) as client:
+            before = await client.w3.eth.get_balance(recipient)
+            ok, tx_hash = await client.send_transaction(to=recipient, value=TokenAmount(1).Wei)
+            assert ok
+            assert await client.verify_transaction(tx_hash, 'Transfer')
+            return await client.w3.eth.get_balance(recipient) - before
+
+    assert run(main()) == TokenAmount(1).Wei
+
+
+def test_approve(standin_node):
+    spender = standin_node.accounts[3].address
+
+    async def main():
+        async with aclosing(standin_node.client(2)) as client:
+            assert await client.approve(spender, token_address=standin_node.token.address, amount=TokenAmount(5))
+            return await client.get_allowance(token_address=standin_node.token.address, spender=spender)
+
+    assert run(main()).Wei == TokenAmount(5).Wei
@@ -0,0 +1,47 @@
+import asyncio
+from types import SimpleNamespace
+
+from curl_cffi.requests import RequestsError
+
+from web3mt.utils import TokenStore
+
+
+def test_login_cookies_are_persisted_and_reused(tmp_path):
+    logins = []
+
+    async def login():
+        logins.append(1)
+        return 'token', {'session': 'abc'}
+
+    store = TokenStore('password', tmp_path / 'tokens.db')
+    assert asyncio.run(store.token(1, 'service', login)) == 'token'
+    store.close()
+    reopened = TokenStore('password', tmp_path / 'tokens.db')
+    stored = asyncio.run(reopened.credentials(1, 'service', login))
+    assert stored.token == 'token'
+    assert stored.cookies == {'session': 'abc'}
+    assert len(logins) == 1
+
+
+def test_rejected_token_logs_in_again(tmp_path):
+    store = TokenStore('password', tmp_path / 'tokens.db')
+    store.set(1, 'service', 'stale')
+    used = []
+
+    async def login():
+        return 'fresh'
+
+    async def func(token):
+        used.append(token)
+        if token == 'stale':
+            raise RequestsError('HTTP Error 401', 0, SimpleNamespace(status_code=401))
+        return token
+
+    assert asyncio.run(store.call(1, 'service', login, func)) == 'fresh'
+    assert used == ['stale', 'fresh']
+    assert store.get(1, 'service').token == 'fresh'
+
+
+def test_wrong_password_reads_nothing(tmp_path):
+    TokenStore('password', tmp_path / 'tokens.db').set(1, 'service', 'token')
+    assert TokenStore('other', tmp_path / 'tokens.db').get(1, 'service') is None
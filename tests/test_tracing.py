@@ -0,0 +1,23 @@
+import json
+
+from web3mt.utils import tracer, enable_tracing, disable_tracing
+
+
+def test_disable_while_span_is_open(tmp_path):
+    enable_tracing(tmp_path / 'spans.jsonl')
+    with tracer.span('outer'):
+        disable_tracing()
+    assert not tracer.enabled
+
+
+def test_reenable_flushes_previous_exporter(tmp_path):
+    first, second = tmp_path / 'first.jsonl', tmp_path / 'second.jsonl'
+    enable_tracing(first)
+    with tracer.span('first'):
+        pass
+    enable_tracing(second)
+    with tracer.span('second'):
+        pass
+    disable_tracing()
+    assert [json.loads(line)['name'] for line in first.read_text().splitlines()] == ['first']
+    assert [json.loads(line)['name'] for line in second.read_text().splitlines()] == ['second']
@@ -0,0 +1,71 @@
+import asyncio
+import gc
+
+from web3mt.evm.transport import LeakTracker, SessionPool, leaks
+
+
+def test_idle_sessions_are_trimmed_and_closed_at_shutdown():
+    pool = SessionPool(max_idle=1)
+    sessions = {}
+
+    async def main():
+        sessions['a'] = pool.acquire('http://a')
+        sessions['b'] = pool.acquire('http://b')
+        assert pool.acquire('http://a') is sessions['a']
+        pool.release('http://a')
+        pool.release('http://a')
+        assert len(pool) == 2
+        pool.release('http://b')
+        await asyncio.sleep(0)
+        # b was released last but used less recently than a
+        assert sessions['b'].closed and not sessions['a'].closed
+        assert list(pool.entries) == [('http://a', None)]
+
+    asyncio.run(main())
+    assert sessions['a'].closed
+    assert not pool.entries
+
+
+def test_leak_tracker_reports_unclosed_objects(monkeypatch):
+    class Resource:
+        pass
+
+    tracker = LeakTracker(enabled=True)
+    resource = Resource()
+    tracker.track(resource, 'resource')
+    del resource
+    gc.collect()
+    assert tracker.leaked == 1 and not tracker.open
+    tracker.enabled = False
+
+    monkeypatch.setattr(leaks, 'enabled', True)
+    pool = SessionPool()
+
+    async def main():
+        session = pool.acquire('http://a', 'http://proxy:8080')
+        assert leaks.open[id(session)][0] == 'aiohttp session http://a via http://proxy:8080'
+        pool.release('http://a', 'http://proxy:8080')
+        await pool.close_all()
+        assert id(session) not in leaks.open
+
+    asyncio.run(main())
+
+
+def test_clients_share_and_give_back_sessions(standin_node):
+    pool = SessionPool()
+
+    async def main():
+        try:
+            clients = [standin_node.client(i) for i in range(3)]
+            for client in clients:
+                client.w3.provider.pool = pool
+                await client.w3.eth.chain_id
+            [entry] = pool.entries.values()
+            assert entry.users == 3
+            for client in clients:
+                await client.close()
+            assert entry.users == 0 and not entry.session.closed
+        finally:
+            await pool.close_all()
+
+    asyncio.run(main())
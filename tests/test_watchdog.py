@@ -0,0 +1,31 @@
+import asyncio
+import time
+
+from web3mt.utils.watchdog import LoopWatchdog
+
+
+def block_the_loop():
+    time.sleep(0.3)
+
+
+async def job():
+    await asyncio.sleep(0.05)
+    block_the_loop()
+    await asyncio.sleep(0.05)
+
+
+def test_blocking_call_is_reported_with_its_profile():
+    async def main():
+        async with LoopWatchdog(threshold=0.1) as watchdog:
+            await asyncio.sleep(0.2)
+            assert not watchdog.events
+            await asyncio.create_task(job(), name='profile:3')
+            await asyncio.sleep(0.05)
+        return watchdog
+
+    watchdog = asyncio.run(main())
+    [event] = watchdog.events
+    assert event.profile_id == '3' and event.lag >= 0.2
+    assert 'block_the_loop' in event.location
+    [group] = watchdog.report()
+    assert group['count'] == 1 and group['profiles'] == ['3']
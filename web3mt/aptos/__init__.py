@@ -1,2 +1,23 @@
-from .client import Client
-from .bluemove import BlueMove
+import importlib
+
+# Both pull in aptos_sdk, so they're imported on first access
+_LAZY = {
+    'Client': '.client',
+    'BlueMove': '.bluemove',
+}
+
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *_LAZY])
+
+
+__all__ = list(_LAZY)
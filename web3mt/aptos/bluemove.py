@@ -1,14 +1,21 @@
 from web3db import Profile
 
 from .client import Client
-from web3mt.utils import ProfileSession, logger, Z8
+from web3mt.utils import ProfileSession, TokenStore, logger, Z8
 
 
 class BlueMove(Client):
     BLUEMOVE_API_URL = 'https://aptos-mainnet-api.bluemove.net/api/'
 
-    def __init__(self, profile: Profile, encryption_password: str, node_url: str = Client.NODE_URL):
+    def __init__(
+            self,
+            profile: Profile,
+            encryption_password: str,
+            node_url: str = Client.NODE_URL,
+            token_store: TokenStore = None
+    ):
         super().__init__(profile, encryption_password=encryption_password, node_url=node_url)
+        self.token_store = token_store
         self.session = ProfileSession(
             profile, False, False,
             headers={'Origin': 'https://bluemove.net', 'Referer': 'https://bluemove.net/'}
@@ -30,6 +37,24 @@ class BlueMove(Client):
         return data['message']
 
     async def login(self):
+        if self.token_store:
+            token = await self.token_store.token(self.profile.id, 'bluemove', self.sign_in)
+        else:
+            token = await self.sign_in()
+        self.session.headers.update({'Authorization': f'Bearer {token}'})
+
+    async def authorized(self, method: str, url: str, **kwargs) -> tuple:
+        """A request with the bearer token; a stored token BlueMove rejects is dropped and signed in again once"""
+        if not self.token_store:
+            return await self.session.request(method, url, **kwargs)
+
+        async def request(token: str) -> tuple:
+            self.session.headers.update({'Authorization': f'Bearer {token}'})
+            return await self.session.request(method, url, **kwargs)
+
+        return await self.token_store.call(self.profile.id, 'bluemove', self.sign_in, request)
+
+    async def sign_in(self) -> str:
         message = (
             f"APTOS\naddress: {str(self.account_.address())}\napplication: bluemove.net\nchainId: 1\n"
             f"message: Click to sign in and accept the BlueMove Terms of Service. "
@@ -45,12 +70,11 @@ class BlueMove(Client):
                 'deviceToken': None
             }
         )
-        token = data['jwt']
-        self.session.headers.update({'Authorization': f'Bearer {token}'})
+        return data['jwt']
 
     async def get_listed_nfts(self) -> list[dict]:
-        response, data = await self.session.get(
-            url=self.BLUEMOVE_API_URL + 'market-items',
+        response, data = await self.authorized(
+            'GET', self.BLUEMOVE_API_URL + 'market-items',
             params={
                 'filters[listed_address][$eq]': str(self.account_.address()),
                 'filters[status][$eq]': 1,
@@ -63,8 +87,8 @@ class BlueMove(Client):
         return data['data']
 
     async def get_listing_info(self, item_id: int) -> dict:
-        response, data = await self.client.get(
-            url=self.BLUEMOVE_API_URL + f'market-items/{item_id}',
+        response, data = await self.authorized(
+            'GET', self.BLUEMOVE_API_URL + f'market-items/{item_id}',
             params={'populate': '*'}
         )
         return data['attributes']
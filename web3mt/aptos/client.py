@@ -4,7 +4,7 @@ from aptos_sdk.account import Account
 from aptos_sdk.async_client import RestClient
 from pathlib import Path
 
-from web3mt.utils import read_txt, ProfileSession, logger
+from web3mt.utils import read_txt, sessions, logger
 
 
 class Client(RestClient):
@@ -69,7 +69,7 @@ class Client(RestClient):
     async def v2_token_data(self, collection_id: str) -> list:
         query = read_txt(Path(__file__).parent / 'v2_token.graphql')
         variables = {'owner_address': str(self.account_.address()), 'collection_id': collection_id}
-        async with ProfileSession(self.profile, False, False) as session:
+        async with sessions.session(self.profile, sleep_echo=False, requests_echo=False) as session:
             response, data = await session.request(
                 method='POST',
                 url=self.GRAPHQL_URL,
@@ -80,7 +80,7 @@ class Client(RestClient):
     async def v1_token_data(self, token_data_id_hash: str, requests_echo: bool = True) -> list:
         query = read_txt(Path(__file__).parent / 'v1_token.graphql')
         variables = {'owner_address': str(self.account_.address()), 'token_data_id_hash': token_data_id_hash}
-        async with ProfileSession(self.profile, False, False) as session:
+        async with sessions.session(self.profile, sleep_echo=False, requests_echo=False) as session:
             response, data = await session.request(
                 method='POST',
                 url=self.GRAPHQL_URL,
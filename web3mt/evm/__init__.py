@@ -1,2 +1,39 @@
+import importlib
+from types import ModuleType
+
+from web3mt.evm import models as _models
 from web3mt.evm.models import *
-from web3mt.evm.client import Client
+
+# Client and friends pull in web3 and okx, so they're imported on first access
+_LAZY = {
+    'Client': 'web3mt.evm.client',
+    'LightClient': 'web3mt.evm.client',
+    'shared_web3': 'web3mt.evm.client',
+    'close_shared_web3': 'web3mt.evm.client',
+    'Scroll': 'web3mt.evm.scroll',
+    'RPCResponseCache': 'web3mt.evm.cache',
+    'RPCMetrics': 'web3mt.evm.metrics',
+    'PooledHTTPProvider': 'web3mt.evm.transport',
+    'SessionPool': 'web3mt.evm.transport',
+    'session_pool': 'web3mt.evm.transport',
+    'leaks': 'web3mt.evm.transport',
+}
+
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *_LAZY])
+
+
+__all__ = [
+    *(name for name, value in vars(_models).items() if not name.startswith('_') and not isinstance(value, ModuleType)),
+    *_LAZY,
+]
@@ -0,0 +1,200 @@
+import atexit
+import json
+import sqlite3
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+from web3mt.utils import logger
+from web3mt.utils.clock import monotonic
+
+ALWAYS_IMMUTABLE = {'eth_chainId', 'net_version'}
+BLOCK_TAGS = {'latest', 'pending', 'safe', 'finalized', 'earliest'}
+# method -> index of the block identifier param
+BLOCK_PINNED = {
+    'eth_call': 1,
+    'eth_getBalance': 1,
+    'eth_getCode': 1,
+    'eth_getTransactionCount': 1,
+    'eth_getStorageAt': 2,
+}
+
+
+def _hex_to_int(value: Any) -> Optional[int]:
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.startswith('0x') and len(value) < 66:
+        return int(value, 16)
+    return None
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, (bytes, bytearray)):
+        return '0x' + bytes(value).hex()
+    return str(value)
+
+
+class RPCResponseCache:
+    """
+    Size-bounded LRU of JSON-RPC responses that can never change: chain id, receipts and blocks below
+    `finality_depth`, and state reads pinned to such blocks. Optionally backed by an sqlite file shared between runs.
+    """
+
+    def __init__(
+            self,
+            maxsize: int = 10_000,
+            path: str | Path = None,
+            finality_depth: int = 64,
+            head_ttl: float = 12,
+            flush_every: int = 64
+    ):
+        self.maxsize = maxsize
+        self.finality_depth = finality_depth
+        self.head_ttl = head_ttl
+        self.flush_every = flush_every
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self._heads: dict[str, tuple[int, float]] = {}
+        self._pending: list[tuple[str, str]] = []
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('CREATE TABLE IF NOT EXISTS rpc_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+            atexit.register(self.close)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+            return value
+        if self._db:
+            row = self._db.execute('SELECT value FROM rpc_cache WHERE key = ?', (key,)).fetchone()
+            if row:
+                self._remember(key, row[0])
+                return row[0]
+        return None
+
+    def put(self, key: str, value: str) -> None:
+        self._remember(key, value)
+        if self._db:
+            self._pending.append((key, value))
+            if len(self._pending) >= self.flush_every:
+                self.flush()
+
+    def _remember(self, key: str, value: str) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def flush(self) -> None:
+        if not self._db or not self._pending:
+            return
+        with self._db:
+            self._db.executemany('INSERT OR REPLACE INTO rpc_cache (key, value) VALUES (?, ?)', self._pending)
+        self._pending.clear()
+
+    def close(self) -> None:
+        if not self._db:
+            return
+        self.flush()
+        self._db.close()
+        self._db = None
+        atexit.unregister(self.close)
+
+    def observe_head(self, namespace: str, number: int) -> None:
+        known, _ = self._heads.get(namespace, (0, 0))
+        self._heads[namespace] = (max(known, number), monotonic())
+
+    def is_final(self, namespace: str, number: Optional[int]) -> bool:
+        if number is None or namespace not in self._heads:
+            return False
+        head, _ = self._heads[namespace]
+        return number <= head - self.finality_depth
+
+    def head_is_stale(self, namespace: str) -> bool:
+        if namespace not in self._heads:
+            return True
+        return monotonic() - self._heads[namespace][1] > self.head_ttl
+
+    def _pinned_block(self, method: str, params: list) -> Optional[int | str]:
+        index = BLOCK_PINNED.get(method)
+        if index is None or len(params) <= index:
+            return None
+        block = params[index]
+        # EIP-1898 block objects ({'blockHash': ...}) aren't worth resolving, they're left uncached
+        if not isinstance(block, (str, int)):
+            return None
+        if block in BLOCK_TAGS:
+            return 0 if block == 'earliest' else None
+        return _hex_to_int(block)
+
+    def _finality_candidate(self, method: str, params: list, result: Any) -> Optional[int]:
+        """Block number that has to be final for `result` to be cacheable, -1 if it's cacheable right away"""
+        if result is None:
+            return None
+        if method in ALWAYS_IMMUTABLE:
+            return -1
+        if method in BLOCK_PINNED:
+            return self._pinned_block(method, params)
+        if method == 'eth_getBlockByNumber':
+            if params and params[0] == 'earliest':
+                return -1
+            return _hex_to_int(params[0]) if params else None
+        if method in ('eth_getBlockByHash', 'eth_getTransactionReceipt', 'eth_getTransactionByHash'):
+            return _hex_to_int(result.get('blockNumber') or result.get('number')) if isinstance(result, dict) else None
+        return None
+
+    def _track_head(self, namespace: str, method: str, params: list, result: Any) -> None:
+        if method == 'eth_blockNumber':
+            number = _hex_to_int(result)
+        elif method == 'eth_getBlockByNumber' and params and params[0] == 'latest' and isinstance(result, dict):
+            number = _hex_to_int(result.get('number'))
+        else:
+            return
+        if number is not None:
+            self.observe_head(namespace, number)
+
+    def middleware(self, namespace: str | int):
+        namespace = str(namespace)
+
+        async def cache_middleware(make_request, w3):
+            async def middleware(method, params):
+                params = list(params or [])
+                key = f'{namespace}:{method}:{json.dumps(params, sort_keys=True, default=_json_default)}'
+                cached = self.get(key)
+                if cached is not None:
+                    self.hits += 1
+                    return {'jsonrpc': '2.0', 'id': 0, 'result': json.loads(cached)}
+                self.misses += 1
+                response = await make_request(method, params)
+                if 'error' in response or 'result' not in response:
+                    return response
+                result = response['result']
+                self._track_head(namespace, method, params, result)
+                number = self._finality_candidate(method, params, result)
+                if number is None:
+                    return response
+                if number >= 0 and not self.is_final(namespace, number):
+                    if not self.head_is_stale(namespace):
+                        return response
+                    head_response = await make_request('eth_blockNumber', [])
+                    if 'result' not in head_response:
+                        return response
+                    self.observe_head(namespace, _hex_to_int(head_response['result']))
+                    if not self.is_final(namespace, number):
+                        return response
+                try:
+                    self.put(key, json.dumps(result, default=_json_default))
+                except (TypeError, ValueError) as e:
+                    logger.debug(f'Couldn\'t cache {method} response: {e}')
+                return response
+
+            return middleware
+
+        return cache_middleware
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import NamedTuple, Optional
 from hexbytes import HexBytes
 
 from web3 import AsyncWeb3, Web3
@@ -8,13 +8,17 @@ from web3.contract import AsyncContract
 from web3.middleware import async_geth_poa_middleware
 from web3.exceptions import ABIFunctionNotFound, ContractLogicError, TimeExhausted
 from eth_account import Account
+from eth_account.signers.local import LocalAccount
 from eth_account.messages import encode_defunct
-from okx.MarketData import MarketAPI
 from web3db.utils import decrypt
 from web3db.models import Profile
 
-from web3mt.utils import logger, sleep
+from web3mt.utils import logger, sleep, tracer, checkpoint_tx, proxy_manager, budget
+from web3mt.utils.budget import GWEI, RECEIPT
 from web3mt.evm.models import TokenAmount, Chain, Ethereum, DefaultABIs
+from web3mt.evm.cache import RPCResponseCache
+from web3mt.evm.metrics import RPCMetrics
+from web3mt.evm.transport import PooledHTTPProvider, leaks
 
 
 class Client:
@@ -36,15 +40,24 @@ class Client:
             okx_api_key: str = None,
             okx_api_secret: str = None,
             okx_passphrase: str = None,
+            rpc_cache: RPCResponseCache = None,
+            rpc_metrics: RPCMetrics = None,
     ):
         self.profile = profile
         self.account = Account.from_key(decrypt(profile.evm_private, encryption_password)) if profile else account
         self.network = network
+        self.rpc_cache = rpc_cache
+        middlewares = [async_geth_poa_middleware]
+        if self.rpc_cache is not None:
+            middlewares.append(self.rpc_cache.middleware(self.network.chain_id))
+        if rpc_metrics:
+            middlewares.append(rpc_metrics.middleware(self.network.rpc, self.profile.id if self.profile else None))
         self.w3 = Web3(
-            Web3.AsyncHTTPProvider(self.network.rpc, request_kwargs={
-                'proxy': self.profile.proxy.proxy_string if self.profile else proxy}),
+            PooledHTTPProvider(
+                self.network.rpc, proxy=proxy_manager.proxy_for(self.profile) if self.profile else proxy
+            ),
             modules={'eth': (AsyncEth,), 'net': (AsyncNet,)},
-            middlewares=[async_geth_poa_middleware]
+            middlewares=middlewares
         )
         self.delay_between_requests = delay_between_requests
         self.sleep_echo = sleep_echo
@@ -58,12 +71,47 @@ class Client:
         self.okx_api_key = okx_api_key
         self.okx_api_secret = okx_api_secret
         self.okx_passphrase = okx_passphrase
+        self.closed = False
+        leaks.track(self, f'Client {self.log_info or self.network.name}')
+
+    @classmethod
+    def for_address(
+            cls,
+            network: Chain,
+            address: str,
+            signer: LocalAccount = None,
+            proxy: str = None,
+            profile: Profile = None,
+            **kwargs
+    ) -> 'LightClient':
+        """A `LightClient` for read-only sweeps over many wallets, see `shared_web3` for `kwargs`"""
+        return LightClient(network, address, signer, shared_web3(network, proxy, **kwargs), profile)
 
     async def __aenter__(self):
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         logger.error(f'{self.log_info} | {exc_val}') if exc_type else logger.success(f'{self.log_info} | Tasks done')
+        await self.close()
+
+    async def close(self) -> None:
+        """
+        Gives the provider's HTTP session back to the pool. A request made afterwards takes a session again, so close
+        the client once more when done with it
+        """
+        self.closed = True
+        await self.w3.provider.disconnect()
+        leaks.untrack(self)
+
+    aclose = close  # for contextlib.aclosing
+
+    @property
+    def trace_attributes(self) -> dict:
+        return {
+            'profile_id': self.profile.id if self.profile else None,
+            'chain': self.network.name,
+            'address': self.account.address if self.account else None,
+        }
 
     def sign(self, text) -> str:
         return self.w3.eth.account.sign_message(
@@ -156,126 +204,143 @@ class Client:
             max_priority_fee_per_gas: Optional[int] = None,
             max_fee_per_gas: Optional[int] = None
     ) -> tuple[bool, Exception | HexBytes | str]:
-        if not from_:
-            from_ = self.account.address
-        if not increase_gas_limit:
-            increase_gas_limit = self.INCREASE_GAS_LIMIT
-
-        tx_params = {
-            'chainId': self.network.chain_id,
-            'nonce': await self.nonce(),
-            'from': self.w3.to_checksum_address(from_),
-            'to': self.w3.to_checksum_address(to),
-        }
-        await sleep(
-            self.delay_between_requests,
-            profile_id=self.profile.id if self.profile else None,
-            echo=self.sleep_echo
-        )
-        if data:
-            tx_params['data'] = data
-        if value:
-            tx_params['value'] = value
-
-        if self.network.max_gwei and self.wait_for_gwei:
-            while True:
-                gas_price = self.w3.from_wei(await self.w3.eth.gas_price, 'gwei')
-                if gas_price > self.network.max_gwei:
-                    logger.debug(
-                        f'{self.log_info} | Current GWEI: {gas_price} > {self.network.max_gwei}. Waiting for gwei...'
-                    )
-                    await sleep(15, profile_id=self.profile.id if self.profile else None, echo=self.sleep_echo)
-                else:
-                    break
-
-        if self.network.eip1559_tx:
-            last_block = await self.w3.eth.get_block('latest')
+        with tracer.span('send_transaction', **self.trace_attributes) as span:
+            if not from_:
+                from_ = self.account.address
+            if not increase_gas_limit:
+                increase_gas_limit = self.INCREASE_GAS_LIMIT
+
+            with tracer.span('nonce'):
+                tx_params = {
+                    'chainId': self.network.chain_id,
+                    'nonce': await self.nonce(),
+                    'from': self.w3.to_checksum_address(from_),
+                    'to': self.w3.to_checksum_address(to),
+                }
             await sleep(
                 self.delay_between_requests,
                 profile_id=self.profile.id if self.profile else None,
                 echo=self.sleep_echo
             )
-            if max_priority_fee_per_gas is None:
-                # max_priority_fee_per_gas = await Client.get_max_priority_fee_per_gas(w3=w3, block=last_block)
-                max_priority_fee_per_gas = await self.w3.eth.max_priority_fee
+            if data:
+                tx_params['data'] = data
+            if value:
+                tx_params['value'] = value
+
+            if self.network.max_gwei and self.wait_for_gwei:
+                with tracer.span('gas_wait'), budget.measure(GWEI, self.profile.id if self.profile else None):
+                    while True:
+                        gas_price = self.w3.from_wei(await self.w3.eth.gas_price, 'gwei')
+                        if gas_price > self.network.max_gwei:
+                            logger.debug(
+                                f'{self.log_info} | Current GWEI: {gas_price} > {self.network.max_gwei}. '
+                                f'Waiting for gwei...'
+                            )
+                            await sleep(15, profile_id=self.profile.id if self.profile else None, echo=self.sleep_echo)
+                        else:
+                            break
+
+            with tracer.span('fee'):
+                if self.network.eip1559_tx:
+                    last_block = await self.w3.eth.get_block('latest')
+                    await sleep(
+                        self.delay_between_requests,
+                        profile_id=self.profile.id if self.profile else None,
+                        echo=self.sleep_echo
+                    )
+                    if max_priority_fee_per_gas is None:
+                        # max_priority_fee_per_gas = await Client.get_max_priority_fee_per_gas(w3=w3, block=last_block)
+                        max_priority_fee_per_gas = await self.w3.eth.max_priority_fee
+                        await sleep(
+                            self.delay_between_requests,
+                            profile_id=self.profile.id if self.profile else None,
+                            echo=self.sleep_echo
+                        )
+                    tx_params['maxPriorityFeePerGas'] = max_priority_fee_per_gas
+                    tx_params['maxFeePerGas'] = (
+                            max_fee_per_gas or last_block['baseFeePerGas'] + max_priority_fee_per_gas
+                    )
+                    tx_params['maxFeePerGas'] = int(tx_params['maxFeePerGas'] * self.INCREASE_GWEI)
+
+                else:
+                    tx_params['gasPrice'] = await self.w3.eth.gas_price
+
+            try:
+                with tracer.span('estimate'):
+                    estimated_gas_limit = await self.w3.eth.estimate_gas(tx_params)
+                tx_params['gas'] = int(estimated_gas_limit * increase_gas_limit)
                 await sleep(
                     self.delay_between_requests,
                     profile_id=self.profile.id if self.profile else None,
                     echo=self.sleep_echo
                 )
-            tx_params['maxPriorityFeePerGas'] = max_priority_fee_per_gas
-            tx_params['maxFeePerGas'] = max_fee_per_gas or last_block['baseFeePerGas'] + max_priority_fee_per_gas
-            tx_params['maxFeePerGas'] = int(tx_params['maxFeePerGas'] * self.INCREASE_GWEI)
-
-        else:
-            tx_params['gasPrice'] = await self.w3.eth.gas_price
-
-        try:
-            estimated_gas_limit = await self.w3.eth.estimate_gas(tx_params)
-            tx_params['gas'] = int(estimated_gas_limit * increase_gas_limit)
-            await sleep(
-                self.delay_between_requests,
-                profile_id=self.profile.id if self.profile else None,
-                echo=self.sleep_echo
-            )
-        except (ContractLogicError, ValueError) as err:
-            logger.warning(f'{self.log_info} | Couldn\'t estimate gas. Transaction wasn\'t send - {err}')
-            return False, err
-        while True:
-            sign = self.w3.eth.account.sign_transaction(tx_params, self.account.key.hex())
+            except (ContractLogicError, ValueError) as err:
+                logger.warning(f'{self.log_info} | Couldn\'t estimate gas. Transaction wasn\'t send - {err}')
+                return False, err
+            while True:
+                with tracer.span('sign'):
+                    sign = self.w3.eth.account.sign_transaction(tx_params, self.account.key.hex())
 
-            try:
-                tx_hash = (await self.w3.eth.send_raw_transaction(sign.rawTransaction)).hex()
-                break
-            except ValueError as e:
-                if 'invalid nonce' in e.args[0]["message"] or 'nonce too low' in e.args[0]["message"]:
-                    old_nonce = tx_params["nonce"]
-                    tx_params["nonce"] = new_nonce = tx_params["nonce"] + 1
-                    logger.warning(
-                        f'{self.log_info} | {e.args[0]["message"]}. Increasing nonce from {old_nonce} to {new_nonce}'
-                    )
-                    continue
-                elif 'replacement transaction underpriced' in e.args[0]["message"]:
-                    old_priority_fee = tx_params['maxPriorityFeePerGas']
-                    tx_params['maxPriorityFeePerGas'] = new_priority_fee = (
-                        int(tx_params['maxPriorityFeePerGas'] * self.INCREASE_GWEI)
-                    )
-                    logger.warning(
-                        f'{self.log_info} | {e.args[0]["message"]}. '
-                        f'Increasing max priorty fee from {old_priority_fee} to {new_priority_fee}'
-                    )
-                    continue
-                logger.error(f'{self.log_info} | {e.args[0]["message"]}')
-                return False, e
-            except Exception as e:
-                logger.error(f'{self.log_info} | {e}')
-                return False, e
-        logger.info(f'{self.log_info} | Transaction {self.network.explorer}/tx/{tx_hash} sent')
-        return True, tx_hash
+                try:
+                    with tracer.span('broadcast', nonce=tx_params['nonce']) as broadcast_span:
+                        tx_hash = (await self.w3.eth.send_raw_transaction(sign.rawTransaction)).hex()
+                        broadcast_span.set(tx_hash=tx_hash)
+                    break
+                except ValueError as e:
+                    if 'invalid nonce' in e.args[0]["message"] or 'nonce too low' in e.args[0]["message"]:
+                        old_nonce = tx_params["nonce"]
+                        tx_params["nonce"] = new_nonce = tx_params["nonce"] + 1
+                        logger.warning(
+                            f'{self.log_info} | {e.args[0]["message"]}. '
+                            f'Increasing nonce from {old_nonce} to {new_nonce}'
+                        )
+                        continue
+                    elif 'replacement transaction underpriced' in e.args[0]["message"]:
+                        old_priority_fee = tx_params['maxPriorityFeePerGas']
+                        tx_params['maxPriorityFeePerGas'] = new_priority_fee = (
+                            int(tx_params['maxPriorityFeePerGas'] * self.INCREASE_GWEI)
+                        )
+                        logger.warning(
+                            f'{self.log_info} | {e.args[0]["message"]}. '
+                            f'Increasing max priorty fee from {old_priority_fee} to {new_priority_fee}'
+                        )
+                        continue
+                    logger.error(f'{self.log_info} | {e.args[0]["message"]}')
+                    return False, e
+                except Exception as e:
+                    logger.error(f'{self.log_info} | {e}')
+                    return False, e
+            span.set(tx_hash=tx_hash)
+            checkpoint_tx(tx_hash)
+            logger.info(f'{self.log_info} | Transaction {self.network.explorer}/tx/{tx_hash} sent')
+            return True, tx_hash
 
     async def verify_transaction(self, tx_hash: str, tx_name: str) -> bool:
         explorer_link = f'{self.network.explorer}/tx/{tx_hash}'
-        while True:
-            try:
-                data = await self.w3.eth.wait_for_transaction_receipt(tx_hash)
-                if 'status' in data and data['status'] == 1:
-                    logger.info(
-                        f'{self.log_info} | Transaction {tx_name} ({explorer_link}) was successful'
-                    )
-                    return True
-                else:
-                    logger.error(
-                        f'{self.log_info} | Transaction {tx_name} ({explorer_link}) failed: '
-                        f'{data["transactionHash"].hex()}'
-                    )
-                    return False
-            except TimeExhausted as e:
-                logger.warning(f'{self.log_info} | Transaction {tx_name} ({explorer_link}) failed: {e}')
-                if not self.do_no_matter_what:
+        with tracer.span('verify_transaction', **self.trace_attributes, tx_hash=str(tx_hash), tx_name=tx_name) as span:
+            while True:
+                try:
+                    with tracer.span('inclusion'), budget.measure(RECEIPT, self.profile.id if self.profile else None):
+                        data = await self.w3.eth.wait_for_transaction_receipt(tx_hash)
+                    span.set(status=data.get('status'), block_number=data.get('blockNumber'))
+                    if 'status' in data and data['status'] == 1:
+                        logger.info(
+                            f'{self.log_info} | Transaction {tx_name} ({explorer_link}) was successful'
+                        )
+                        return True
+                    else:
+                        logger.error(
+                            f'{self.log_info} | Transaction {tx_name} ({explorer_link}) failed: '
+                            f'{data["transactionHash"].hex()}'
+                        )
+                        return False
+                except TimeExhausted as e:
+                    logger.warning(f'{self.log_info} | Transaction {tx_name} ({explorer_link}) failed: {e}')
+                    if not self.do_no_matter_what:
+                        return False
+                except Exception as err:
+                    logger.warning(f'{self.log_info} | Transaction {tx_name} ({tx_hash}) failed: {err}')
                     return False
-            except Exception as err:
-                logger.warning(f'{self.log_info} | Transaction {tx_name} ({tx_hash}) failed: {err}')
-                return False
 
     async def tx(
             self,
@@ -295,30 +360,33 @@ class Client:
         if isinstance(value, int):
             value = TokenAmount(value, wei=True)
         to = self.w3.to_checksum_address(to)
-        if check_existing:
-            if (await self.balance_of(token_address=to)).Ether > 0:
-                logger.success(f'{self.log_info} | {name} already minted')
-                return True
+        with tracer.span('tx', **self.trace_attributes, tx_name=name) as span:
+            if check_existing:
+                if (await self.balance_of(token_address=to)).Ether > 0:
+                    logger.success(f'{self.log_info} | {name} already minted')
+                    return True
+                await sleep(
+                    self.delay_between_requests,
+                    profile_id=self.profile.id if self.profile else None,
+                    echo=self.sleep_echo
+                )
+            ok, tx_hash_or_err = await self.send_transaction(
+                to=to, data=data, value=value.Wei,
+                max_priority_fee_per_gas=max_priority_fee_per_gas,
+                max_fee_per_gas=max_fee_per_gas,
+                increase_gas_limit=increase_gas_limit,
+            )
+            if ok:
+                span.set(tx_hash=tx_hash_or_err)
             await sleep(
                 self.delay_between_requests,
                 profile_id=self.profile.id if self.profile else None,
                 echo=self.sleep_echo
             )
-        ok, tx_hash_or_err = await self.send_transaction(
-            to=to, data=data, value=value.Wei,
-            max_priority_fee_per_gas=max_priority_fee_per_gas,
-            max_fee_per_gas=max_fee_per_gas,
-            increase_gas_limit=increase_gas_limit,
-        )
-        await sleep(
-            self.delay_between_requests,
-            profile_id=self.profile.id if self.profile else None,
-            echo=self.sleep_echo
-        )
-        res = await self.verify_transaction(tx_hash_or_err, name)
-        if res:
-            logger.success(f'{self.log_info} | {name} done')
-        return res
+            res = await self.verify_transaction(tx_hash_or_err, name)
+            if res:
+                logger.success(f'{self.log_info} | {name} done')
+            return res
 
     async def approve(
             self, spender: str, contract: AsyncContract = None, token_address: str = None,
@@ -399,6 +467,8 @@ class Client:
             return False, ''
 
     async def get_token_price(self, token='ETH') -> float:
+        from okx.MarketData import MarketAPI
+
         ticker = token.upper()
         okx_market = MarketAPI(
             api_key=self.okx_api_key,
@@ -428,3 +498,87 @@ class Client:
                 f'{f" {(Client.NATIVE_PRICE * float(balance.Ether)):2f}$" if get_usd_price else ""}',
             )
         return balance
+
+
+_shared_web3: dict[tuple, Web3] = {}
+
+
+def shared_web3(
+        network: Chain,
+        proxy: str = None,
+        rpc_cache: RPCResponseCache = None,
+        rpc_metrics: RPCMetrics = None
+) -> Web3:
+    """One async `Web3` (provider, middlewares, connection pool) per chain, proxy, cache and metrics"""
+    key = (network.rpc, network.chain_id, proxy, id(rpc_cache), id(rpc_metrics))
+    w3 = _shared_web3.get(key)
+    if w3 is None:
+        middlewares = [async_geth_poa_middleware]
+        if rpc_cache is not None:
+            middlewares.append(rpc_cache.middleware(network.chain_id))
+        if rpc_metrics:
+            middlewares.append(rpc_metrics.middleware(network.rpc))
+        w3 = _shared_web3[key] = Web3(
+            PooledHTTPProvider(network.rpc, proxy=proxy),
+            modules={'eth': (AsyncEth,), 'net': (AsyncNet,)},
+            middlewares=middlewares
+        )
+    return w3
+
+
+async def close_shared_web3() -> None:
+    """Releases the sessions of every shared `Web3`, for the end of a sweep"""
+    w3s = list(_shared_web3.values())
+    _shared_web3.clear()
+    for w3 in w3s:
+        await w3.provider.disconnect()
+
+
+class Address(NamedTuple):
+    """Stands in for an account when there's no signer, reads only need `.address`"""
+    address: str
+
+
+class LightClient:
+    """
+    Read-only view of a wallet for sweeps over 10k+ addresses: an address, an optional signer and a `Web3` shared with
+    every other wallet on the same chain and proxy (see `Client.for_address`). Balance, allowance and decimals reads
+    are `Client`'s own; use a full `Client` to send transactions.
+    """
+    __slots__ = ('network', 'account', 'w3', 'profile')
+
+    delay_between_requests = 0
+    sleep_echo = False
+    okx_api_key = okx_api_secret = okx_passphrase = None
+
+    def __init__(
+            self, network: Chain, address: str, signer: LocalAccount = None, w3: Web3 = None, profile: Profile = None
+    ):
+        self.network = network
+        self.account = signer or Address(Web3.to_checksum_address(address))
+        self.w3 = w3 or shared_web3(network)
+        self.profile = profile
+
+    @property
+    def address(self) -> str:
+        return self.account.address
+
+    @property
+    def log_info(self) -> str:
+        log_info = f'{self.account.address} ({self.network.name})'
+        return f'{self.profile.id} | {log_info}' if self.profile else log_info
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    trace_attributes = Client.trace_attributes
+    sign = Client.sign
+    nonce = Client.nonce
+    get_decimals = Client.get_decimals
+    balance_of = Client.balance_of
+    get_allowance = Client.get_allowance
+    get_token_price = Client.get_token_price
+    get_native_balance = Client.get_native_balance
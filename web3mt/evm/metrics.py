@@ -0,0 +1,169 @@
+import json
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _size(value) -> int:
+    return len(json.dumps(value, separators=(',', ':'), default=str))
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        total = 0
+        result = []
+        for bound, count in zip([*map(str, self.buckets), '+Inf'], self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        for bound, (_, total) in zip(self.buckets, self.cumulative()):
+            if total >= rank:
+                return bound
+        return self.buckets[-1]
+
+
+class RPCSeries:
+    def __init__(self, buckets: tuple[float, ...]):
+        self.calls = 0
+        self.errors = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.latency = Histogram(buckets)
+
+
+class RPCMetrics:
+    """
+    Per JSON-RPC method, endpoint and profile counters of calls, errors and payload bytes with latency histograms.
+    Put it into Client with `rpc_metrics=` and export with `to_prometheus()` or `snapshot()`/`dump()`.
+    Payload bytes are the JSON-encoded size of params and response, not the bytes on the wire.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS, measure_bytes: bool = True):
+        self.buckets = tuple(sorted(buckets))
+        self.measure_bytes = measure_bytes
+        self.series: dict[tuple[str, str, str], RPCSeries] = {}
+
+    def _series(self, method: str, endpoint: str, profile: str) -> RPCSeries:
+        key = (method, endpoint, profile)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = RPCSeries(self.buckets)
+        return series
+
+    def observe(
+            self, method: str, endpoint: str, profile: str, duration: float,
+            error: bool = False, request_bytes: int = 0, response_bytes: int = 0
+    ) -> None:
+        series = self._series(method, endpoint, profile)
+        series.calls += 1
+        series.errors += error
+        series.request_bytes += request_bytes
+        series.response_bytes += response_bytes
+        series.latency.observe(duration)
+
+    def middleware(self, endpoint: str, profile: str | int = None):
+        profile = '' if profile is None else str(profile)
+
+        async def metrics_middleware(make_request, w3):
+            async def middleware(method, params):
+                request_bytes = _size(params) if self.measure_bytes else 0
+                start = time.perf_counter()
+                try:
+                    response = await make_request(method, params)
+                except Exception:
+                    self.observe(method, endpoint, profile, time.perf_counter() - start, True, request_bytes)
+                    raise
+                self.observe(
+                    method, endpoint, profile, time.perf_counter() - start, 'error' in response,
+                    request_bytes, _size(response) if self.measure_bytes else 0
+                )
+                return response
+
+            return middleware
+
+        return metrics_middleware
+
+    def totals(self, by: str = 'method') -> dict[str, dict]:
+        index = ('method', 'endpoint', 'profile').index(by)
+        totals = {}
+        for key, series in self.series.items():
+            total = totals.setdefault(key[index], {'calls': 0, 'errors': 0, 'request_bytes': 0, 'response_bytes': 0})
+            total['calls'] += series.calls
+            total['errors'] += series.errors
+            total['request_bytes'] += series.request_bytes
+            total['response_bytes'] += series.response_bytes
+        return totals
+
+    def snapshot(self) -> dict:
+        return {
+            'series': [
+                {
+                    'method': method,
+                    'endpoint': endpoint,
+                    'profile': profile,
+                    'calls': series.calls,
+                    'errors': series.errors,
+                    'request_bytes': series.request_bytes,
+                    'response_bytes': series.response_bytes,
+                    'latency': {
+                        'sum': series.latency.sum,
+                        'count': series.latency.count,
+                        'p50': series.latency.quantile(0.5),
+                        'p99': series.latency.quantile(0.99),
+                        'buckets': dict(series.latency.cumulative()),
+                    },
+                } for (method, endpoint, profile), series in self.series.items()
+            ],
+            'by_method': self.totals('method'),
+        }
+
+    def dump(self, path: str | Path) -> None:
+        Path(path).write_text(json.dumps(self.snapshot(), indent=2))
+
+    def to_prometheus(self, prefix: str = 'web3mt_rpc') -> str:
+        lines = []
+        counters = (
+            ('calls_total', 'JSON-RPC requests sent', 'calls'),
+            ('errors_total', 'JSON-RPC requests that failed or returned an error', 'errors'),
+            ('request_bytes_total', 'JSON-encoded size of request params', 'request_bytes'),
+            ('response_bytes_total', 'JSON-encoded size of responses', 'response_bytes'),
+        )
+        for name, help_text, attribute in counters:
+            lines += [f'# HELP {prefix}_{name} {help_text}', f'# TYPE {prefix}_{name} counter']
+            for key, series in self.series.items():
+                lines.append(f'{prefix}_{name}{{{self._labels(*key)}}} {getattr(series, attribute)}')
+        name = f'{prefix}_latency_seconds'
+        lines += [f'# HELP {name} JSON-RPC request latency', f'# TYPE {name} histogram']
+        for key, series in self.series.items():
+            labels = self._labels(*key)
+            for bound, total in series.latency.cumulative():
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {total}')
+            lines.append(f'{name}_sum{{{labels}}} {series.latency.sum}')
+            lines.append(f'{name}_count{{{labels}}} {series.latency.count}')
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _labels(method: str, endpoint: str, profile: str) -> str:
+        return f'method="{_escape(method)}",endpoint="{_escape(endpoint)}",profile="{_escape(profile)}"'
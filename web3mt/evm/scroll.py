@@ -0,0 +1,81 @@
+from web3db import Profile
+
+from web3mt.evm.models import Chain, TokenAmount
+from web3mt.evm.client import Client
+
+
+class Scroll(Chain, Client):
+    def __init__(self, profile: Profile, encryption_password: str):
+        Chain.__init__(
+            self,
+            name='Scroll',
+            rpc='https://scroll.drpc.org',
+            chain_id=534352,
+            eip1559_tx=True,
+            coin_symbol='ETH',
+            explorer='https://scrollscan.com/'
+        )
+        Client.__init__(self, self, profile, encryption_password=encryption_password)
+
+    async def withdraw(self, amount: TokenAmount = None) -> bool:
+        contract = self.w3.eth.contract(
+            self.w3.to_checksum_address('0x781e90f1c8fc4611c9b7497c3b47f99ef6969cbc'),
+            abi=[
+                {"inputs": [
+                    {
+                        "internalType": "address",
+                        "name": "_to",
+                        "type": "address"
+                    },
+                    {
+                        "internalType": "uint256",
+                        "name": "_value",
+                        "type": "uint256"
+                    },
+                    {
+                        "internalType": "bytes",
+                        "name": "_message",
+                        "type": "bytes"
+                    },
+                    {
+                        "internalType": "uint256",
+                        "name": "_gasLimit",
+                        "type": "uint256"
+                    }
+                ],
+                    "name": "sendMessage",
+                    "outputs": [],
+                    "stateMutability": "payable",
+                    "type": "function"}
+            ]
+        )
+        tx_params = {
+            'from': self.account.address,
+            'value': int((await self.get_native_balance()).Wei * 0.9),
+            'nonce': await self.nonce(),
+            'gasPrice': await self.w3.eth.gas_price,
+        }
+        tx_params['gas'] = await self.w3.eth.estimate_gas(
+            {
+                **tx_params,
+                'to': contract.address,
+                'data': contract.encodeABI('sendMessage', args=[
+                    self.account.address,
+                    int((await self.get_native_balance()).Wei * 0.9),
+                    b'',
+                    0
+                ])
+            }
+        )
+        tx = await contract.functions.sendMessage(
+            self.account.address,
+            int((await self.get_native_balance()).Wei * 0.9),
+            b'',
+            0
+        ).build_transaction(tx_params)
+        return tx
+        # return await self.tx(
+        #     '0x781e90f1c8fc4611c9b7497c3b47f99ef6969cbc', 'Bridge to Ethereum',
+        #     contract.encodeABI('sendMessage', args=[self.account.address, (amount.Wei)]),
+        #     full_balance=bool(amount)
+        # )
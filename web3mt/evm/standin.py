@@ -0,0 +1,566 @@
+import asyncio
+import json
+import socket
+import threading
+from typing import Any, Callable, Optional
+
+import rlp
+from aiohttp import web
+from eth_abi import decode, encode
+from eth_account import Account
+from eth_account.signers.local import LocalAccount
+from eth_utils import function_signature_to_4byte_selector, keccak, to_checksum_address
+
+from web3mt.evm.models import Chain, TokenAmount
+
+ZERO_ADDRESS = '0x0000000000000000000000000000000000000000'
+ZERO_HASH = '0x' + '00' * 32
+EMPTY_BLOOM = '0x' + '00' * 256
+TRANSFER_TOPIC = '0x' + keccak(text='Transfer(address,address,uint256)').hex()
+APPROVAL_TOPIC = '0x' + keccak(text='Approval(address,address,uint256)').hex()
+INTRINSIC_GAS = 21_000
+CONTRACT_CALL_GAS = 30_000
+
+
+class Revert(Exception):
+    pass
+
+
+class RPCError(Exception):
+    def __init__(self, message: str, code: int = -32000):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+
+
+def _int(value: bytes | str | None) -> int:
+    if not value:
+        return 0
+    if isinstance(value, str):
+        return int(value, 16)
+    return int.from_bytes(value, 'big')
+
+
+def _hex(value: int) -> str:
+    return hex(value)
+
+
+def _data(value: str | None) -> bytes:
+    if not value:
+        return b''
+    return bytes.fromhex(value[2:] if value.startswith('0x') else value)
+
+
+def _address(value: bytes | str | None) -> Optional[str]:
+    if not value:
+        return None
+    return to_checksum_address(value)
+
+
+def _topic(address: str) -> str:
+    return '0x' + '00' * 12 + address[2:].lower()
+
+
+def _selector(signature: str) -> bytes:
+    return function_signature_to_4byte_selector(signature)
+
+
+class StandInContract:
+    ABI: dict[str, tuple[list[str], list[str]]] = {}
+    PAYABLE: set[str] = set()
+
+    def __init__(self, address: str, name: str, symbol: str):
+        self.address = address
+        self.token_name = name
+        self.token_symbol = symbol
+        self.code = '0x' + keccak(text=f'{type(self).__name__}:{address}').hex()
+        self._selectors = {_selector(signature): signature for signature in self.ABI}
+
+    def execute(self, sender: str, value: int, data: bytes, commit: bool) -> tuple[bytes, list[dict]]:
+        signature = self._selectors.get(data[:4])
+        if not signature:
+            raise Revert('function selector was not recognized')
+        if value and signature not in self.PAYABLE:
+            raise Revert('non-payable function')
+        inputs, outputs = self.ABI[signature]
+        try:
+            args = decode(inputs, data[4:])
+        except Exception:
+            raise Revert('invalid calldata')
+        handler = getattr(self, signature.split('(')[0])
+        result, logs = handler(sender, value, commit, *args)
+        return encode(outputs, result), logs
+
+    def log(self, topic: str, *topics: str, data: bytes = b'') -> dict:
+        return {'address': self.address, 'topics': [topic, *topics], 'data': '0x' + data.hex()}
+
+
+class StandInERC20(StandInContract):
+    ABI = {
+        'name()': ([], ['string']),
+        'symbol()': ([], ['string']),
+        'decimals()': ([], ['uint8']),
+        'totalSupply()': ([], ['uint256']),
+        'balanceOf(address)': (['address'], ['uint256']),
+        'allowance(address,address)': (['address', 'address'], ['uint256']),
+        'approve(address,uint256)': (['address', 'uint256'], ['bool']),
+        'transfer(address,uint256)': (['address', 'uint256'], ['bool']),
+        'transferFrom(address,address,uint256)': (['address', 'address', 'uint256'], ['bool']),
+    }
+
+    def __init__(self, address: str, name: str, symbol: str, decimals: int = 18):
+        super().__init__(address, name, symbol)
+        self.decimals_ = decimals
+        self.balances: dict[str, int] = {}
+        self.allowances: dict[tuple[str, str], int] = {}
+
+    def mint_to(self, address: str, amount: int) -> None:
+        self.balances[address] = self.balances.get(address, 0) + amount
+
+    def name(self, sender, value, commit):
+        return [self.token_name], []
+
+    def symbol(self, sender, value, commit):
+        return [self.token_symbol], []
+
+    def decimals(self, sender, value, commit):
+        return [self.decimals_], []
+
+    def totalSupply(self, sender, value, commit):
+        return [sum(self.balances.values())], []
+
+    def balanceOf(self, sender, value, commit, owner):
+        return [self.balances.get(to_checksum_address(owner), 0)], []
+
+    def allowance(self, sender, value, commit, owner, spender):
+        return [self.allowances.get((to_checksum_address(owner), to_checksum_address(spender)), 0)], []
+
+    def approve(self, sender, value, commit, spender, amount):
+        spender = to_checksum_address(spender)
+        if commit:
+            self.allowances[(sender, spender)] = amount
+        return [True], [self.log(APPROVAL_TOPIC, _topic(sender), _topic(spender), data=encode(['uint256'], [amount]))]
+
+    def _move(self, from_: str, to: str, amount: int, commit: bool) -> list[dict]:
+        if self.balances.get(from_, 0) < amount:
+            raise Revert('ERC20: transfer amount exceeds balance')
+        if commit:
+            self.balances[from_] -= amount
+            self.balances[to] = self.balances.get(to, 0) + amount
+        return [self.log(TRANSFER_TOPIC, _topic(from_), _topic(to), data=encode(['uint256'], [amount]))]
+
+    def transfer(self, sender, value, commit, to, amount):
+        return [True], self._move(sender, to_checksum_address(to), amount, commit)
+
+    def transferFrom(self, sender, value, commit, from_, to, amount):
+        from_ = to_checksum_address(from_)
+        allowed = self.allowances.get((from_, sender), 0)
+        if allowed < amount:
+            raise Revert('ERC20: insufficient allowance')
+        logs = self._move(from_, to_checksum_address(to), amount, commit)
+        if commit:
+            self.allowances[(from_, sender)] = allowed - amount
+        return [True], logs
+
+
+class StandInERC721(StandInContract):
+    ABI = {
+        'name()': ([], ['string']),
+        'symbol()': ([], ['string']),
+        'totalSupply()': ([], ['uint256']),
+        'balanceOf(address)': (['address'], ['uint256']),
+        'ownerOf(uint256)': (['uint256'], ['address']),
+        'mint()': ([], []),
+        'transferFrom(address,address,uint256)': (['address', 'address', 'uint256'], []),
+    }
+    PAYABLE = {'mint()'}
+
+    def __init__(self, address: str, name: str, symbol: str, price: int = 0):
+        super().__init__(address, name, symbol)
+        self.price = price
+        self.owners: dict[int, str] = {}
+
+    def name(self, sender, value, commit):
+        return [self.token_name], []
+
+    def symbol(self, sender, value, commit):
+        return [self.token_symbol], []
+
+    def totalSupply(self, sender, value, commit):
+        return [len(self.owners)], []
+
+    def balanceOf(self, sender, value, commit, owner):
+        owner = to_checksum_address(owner)
+        return [sum(1 for token_owner in self.owners.values() if token_owner == owner)], []
+
+    def ownerOf(self, sender, value, commit, token_id):
+        if token_id not in self.owners:
+            raise Revert('ERC721: invalid token ID')
+        return [self.owners[token_id]], []
+
+    def mint(self, sender, value, commit):
+        if value < self.price:
+            raise Revert('Insufficient payment')
+        token_id = len(self.owners) + 1
+        if commit:
+            self.owners[token_id] = sender
+        return [], [self.log(TRANSFER_TOPIC, _topic(ZERO_ADDRESS), _topic(sender), '0x' + f'{token_id:064x}')]
+
+    def transferFrom(self, sender, value, commit, from_, to, token_id):
+        from_ = to_checksum_address(from_)
+        if self.owners.get(token_id) != from_ or sender != from_:
+            raise Revert('ERC721: caller is not token owner')
+        if commit:
+            self.owners[token_id] = to_checksum_address(to)
+        return [], [self.log(TRANSFER_TOPIC, _topic(from_), _topic(to_checksum_address(to)), '0x' + f'{token_id:064x}')]
+
+
+class StandInChain:
+    """
+    Deterministic in-memory chain that answers the JSON-RPC methods Client uses. Every accepted transaction is mined
+    into its own block right away, ERC-20/721 contracts are modelled natively instead of running EVM bytecode.
+    """
+
+    def __init__(
+            self,
+            chain_id: int = 1337,
+            base_fee: int = 10 ** 9,
+            priority_fee: int = 10 ** 8,
+            genesis_timestamp: int = 1_700_000_000,
+            block_time: int = 2
+    ):
+        self.chain_id = chain_id
+        self.base_fee = base_fee
+        self.priority_fee = priority_fee
+        self.genesis_timestamp = genesis_timestamp
+        self.block_time = block_time
+        self.balances: dict[str, int] = {}
+        self.nonces: dict[str, int] = {}
+        self.contracts: dict[str, StandInContract] = {}
+        self.blocks: list[dict] = []
+        self.blocks_by_hash: dict[str, dict] = {}
+        self.transactions: dict[str, dict] = {}
+        self.receipts: dict[str, dict] = {}
+        self.calls: dict[str, int] = {}
+        self._mine([], 0)
+
+    def fund(self, address: str, amount: int) -> None:
+        address = to_checksum_address(address)
+        self.balances[address] = self.balances.get(address, 0) + amount
+
+    def deploy(self, contract: StandInContract) -> StandInContract:
+        self.contracts[contract.address] = contract
+        return contract
+
+    def _mine(self, transaction_hashes: list[str], gas_used: int) -> dict:
+        number = len(self.blocks)
+        parent_hash = self.blocks[-1]['hash'] if self.blocks else ZERO_HASH
+        block = {
+            'number': _hex(number),
+            'hash': '0x' + keccak(_data(parent_hash) + number.to_bytes(32, 'big')).hex(),
+            'parentHash': parent_hash,
+            'nonce': '0x0000000000000000',
+            'sha3Uncles': ZERO_HASH,
+            'logsBloom': EMPTY_BLOOM,
+            'transactionsRoot': ZERO_HASH,
+            'stateRoot': ZERO_HASH,
+            'receiptsRoot': ZERO_HASH,
+            'miner': ZERO_ADDRESS,
+            'difficulty': '0x0',
+            'totalDifficulty': '0x0',
+            'extraData': '0x',
+            'size': '0x220',
+            'gasLimit': _hex(30_000_000),
+            'gasUsed': _hex(gas_used),
+            'timestamp': _hex(self.genesis_timestamp + number * self.block_time),
+            'transactions': transaction_hashes,
+            'uncles': [],
+            'baseFeePerGas': _hex(self.base_fee),
+            'mixHash': ZERO_HASH,
+        }
+        self.blocks.append(block)
+        self.blocks_by_hash[block['hash']] = block
+        return block
+
+    def _block(self, identifier: str) -> Optional[dict]:
+        if identifier in ('latest', 'pending', 'safe', 'finalized'):
+            return self.blocks[-1]
+        if identifier == 'earliest':
+            return self.blocks[0]
+        number = _int(identifier)
+        return self.blocks[number] if number < len(self.blocks) else None
+
+    @staticmethod
+    def _gas(data: bytes, is_contract: bool) -> int:
+        gas = INTRINSIC_GAS + sum(16 if byte else 4 for byte in data)
+        return gas + CONTRACT_CALL_GAS if is_contract else gas
+
+    def _execute(self, sender: str, to: Optional[str], value: int, data: bytes, commit: bool) -> tuple[bytes, list]:
+        contract = self.contracts.get(to) if to else None
+        if contract and data:
+            output, logs = contract.execute(sender, value, data, commit)
+        elif contract and value:
+            raise Revert('no fallback function')
+        else:
+            output, logs = b'', []
+        if value and commit:
+            if self.balances.get(sender, 0) < value:
+                raise Revert('insufficient balance for transfer')
+            self.balances[sender] -= value
+            self.balances[to] = self.balances.get(to, 0) + value
+        return output, logs
+
+    def eth_chainId(self):
+        return _hex(self.chain_id)
+
+    def net_version(self):
+        return str(self.chain_id)
+
+    def eth_blockNumber(self):
+        return _hex(len(self.blocks) - 1)
+
+    def eth_gasPrice(self):
+        return _hex(self.base_fee + self.priority_fee)
+
+    def eth_maxPriorityFeePerGas(self):
+        return _hex(self.priority_fee)
+
+    def eth_feeHistory(self, block_count, newest_block='latest', reward_percentiles=None):
+        count = min(_int(block_count) if isinstance(block_count, str) else block_count, len(self.blocks))
+        newest = _int(self._block(newest_block)['number'])
+        return {
+            'oldestBlock': _hex(newest - count + 1),
+            'baseFeePerGas': [_hex(self.base_fee)] * (count + 1),
+            'gasUsedRatio': [0.5] * count,
+            'reward': [[_hex(self.priority_fee)] * len(reward_percentiles or [])] * count,
+        }
+
+    def eth_getBlockByNumber(self, identifier, full_transactions=False):
+        block = self._block(identifier)
+        if block and full_transactions:
+            return {**block, 'transactions': [self.transactions[tx_hash] for tx_hash in block['transactions']]}
+        return block
+
+    def eth_getBlockByHash(self, block_hash, full_transactions=False):
+        block = self.blocks_by_hash.get(block_hash)
+        return self.eth_getBlockByNumber(block['number'], full_transactions) if block else None
+
+    def eth_getBalance(self, address, block='latest'):
+        return _hex(self.balances.get(to_checksum_address(address), 0))
+
+    def eth_getTransactionCount(self, address, block='latest'):
+        return _hex(self.nonces.get(to_checksum_address(address), 0))
+
+    def eth_getCode(self, address, block='latest'):
+        contract = self.contracts.get(to_checksum_address(address))
+        return contract.code if contract else '0x'
+
+    def eth_call(self, transaction, block='latest'):
+        sender = _address(transaction.get('from')) or ZERO_ADDRESS
+        data = _data(transaction.get('data') or transaction.get('input'))
+        try:
+            output, _ = self._execute(sender, _address(transaction.get('to')), 0, data, commit=False)
+        except Revert as e:
+            raise RPCError(f'execution reverted: {e}', 3)
+        return '0x' + output.hex()
+
+    def eth_estimateGas(self, transaction, block='latest'):
+        sender = _address(transaction.get('from')) or ZERO_ADDRESS
+        to = _address(transaction.get('to'))
+        value = _int(transaction.get('value'))
+        data = _data(transaction.get('data') or transaction.get('input'))
+        if self.balances.get(sender, 0) < value:
+            raise RPCError('insufficient funds for transfer')
+        try:
+            self._execute(sender, to, value, data, commit=False)
+        except Revert as e:
+            raise RPCError(f'execution reverted: {e}', 3)
+        return _hex(self._gas(data, to in self.contracts))
+
+    def eth_sendRawTransaction(self, raw_transaction):
+        raw = _data(raw_transaction)
+        tx_hash = '0x' + keccak(raw).hex()
+        if tx_hash in self.transactions:
+            raise RPCError('already known')
+        if raw[0] == 2:
+            chain_id, nonce, tip, max_fee, gas, to, value, data = rlp.decode(raw[1:])[:8]
+            chain_id, tip, max_fee = _int(chain_id), _int(tip), _int(max_fee)
+            if max_fee < self.base_fee:
+                raise RPCError('max fee per gas less than block base fee')
+            gas_price = min(max_fee, self.base_fee + tip)
+            extra = {'type': '0x2', 'maxFeePerGas': _hex(max_fee), 'maxPriorityFeePerGas': _hex(tip)}
+        elif raw[0] == 1:
+            chain_id, nonce, gas_price, gas, to, value, data = rlp.decode(raw[1:])[:7]
+            chain_id, gas_price = _int(chain_id), _int(gas_price)
+            extra = {'type': '0x1'}
+        else:
+            nonce, gas_price, gas, to, value, data, v = rlp.decode(raw)[:7]
+            gas_price, v = _int(gas_price), _int(v)
+            chain_id = (v - 35) // 2 if v >= 35 else self.chain_id
+            extra = {'type': '0x0'}
+        if chain_id != self.chain_id:
+            raise RPCError('invalid chain id')
+        if gas_price < self.base_fee:
+            raise RPCError('transaction underpriced')
+        sender = to_checksum_address(Account.recover_transaction(raw))
+        nonce, gas, value, to = _int(nonce), _int(gas), _int(value), _address(to)
+        expected_nonce = self.nonces.get(sender, 0)
+        if nonce < expected_nonce:
+            raise RPCError(f'nonce too low: next nonce {expected_nonce}, tx nonce {nonce}')
+        if nonce > expected_nonce:
+            raise RPCError(f'invalid nonce: next nonce {expected_nonce}, tx nonce {nonce}')
+        if self.balances.get(sender, 0) < value + gas * gas_price:
+            raise RPCError('insufficient funds for gas * price + value')
+        gas_used = self._gas(data, to in self.contracts)
+        if gas < gas_used:
+            raise RPCError('intrinsic gas too low')
+        self.nonces[sender] = nonce + 1
+        self.balances[sender] -= gas_used * gas_price
+        try:
+            _, logs = self._execute(sender, to, value, data, commit=True)
+            status = 1
+        except Revert:
+            logs, status = [], 0
+        block = self._mine([tx_hash], gas_used)
+        location = {'blockHash': block['hash'], 'blockNumber': block['number'], 'transactionIndex': '0x0'}
+        self.transactions[tx_hash] = {
+            'hash': tx_hash, **location, 'from': sender, 'to': to, 'nonce': _hex(nonce), 'value': _hex(value),
+            'gas': _hex(gas), 'gasPrice': _hex(gas_price), 'input': '0x' + data.hex(), 'chainId': _hex(chain_id),
+            'v': '0x0', 'r': ZERO_HASH, 's': ZERO_HASH, **extra
+        }
+        self.receipts[tx_hash] = {
+            'transactionHash': tx_hash, **location, 'from': sender, 'to': to, 'contractAddress': None,
+            'cumulativeGasUsed': _hex(gas_used), 'gasUsed': _hex(gas_used), 'effectiveGasPrice': _hex(gas_price),
+            'logs': [
+                {**log, **location, 'transactionHash': tx_hash, 'logIndex': _hex(i), 'removed': False}
+                for i, log in enumerate(logs)
+            ],
+            'logsBloom': EMPTY_BLOOM, 'status': _hex(status), 'type': extra['type']
+        }
+        return tx_hash
+
+    def eth_getTransactionByHash(self, tx_hash):
+        return self.transactions.get(tx_hash)
+
+    def eth_getTransactionReceipt(self, tx_hash):
+        return self.receipts.get(tx_hash)
+
+    def handle(self, request: dict) -> dict:
+        method = request.get('method', '')
+        self.calls[method] = self.calls.get(method, 0) + 1
+        response = {'jsonrpc': '2.0', 'id': request.get('id')}
+        handler: Optional[Callable] = getattr(self, method, None) if method[:4] in ('eth_', 'net_') else None
+        if not handler:
+            response['error'] = {'code': -32601, 'message': f'the method {method} does not exist/is not available'}
+            return response
+        try:
+            response['result'] = handler(*request.get('params', []))
+        except RPCError as e:
+            response['error'] = {'code': e.code, 'message': e.message, 'data': None}
+        except Exception as e:
+            response['error'] = {'code': -32603, 'message': f'{type(e).__name__}: {e}'}
+        return response
+
+
+class StandInNode:
+    """
+    Serves a StandInChain over HTTP from a background thread, so Client talks to it through its regular provider.
+    Preloads funded deterministic accounts, an ERC-20 token and an ERC-721 collection.
+    """
+
+    def __init__(
+            self,
+            accounts: int = 100,
+            balance: TokenAmount = TokenAmount(100),
+            token_balance: TokenAmount = TokenAmount(1_000_000),
+            chain: StandInChain = None,
+            host: str = '127.0.0.1'
+    ):
+        self.host = host
+        self.port: Optional[int] = None
+        self.chain = chain or StandInChain()
+        self.accounts: list[LocalAccount] = [
+            Account.from_key(keccak(text=f'web3mt-standin-{i}')) for i in range(accounts)
+        ]
+        self.token = self.chain.deploy(StandInERC20(self._address('erc20'), 'StandIn Token', 'SIT'))
+        self.nft = self.chain.deploy(StandInERC721(self._address('erc721'), 'StandIn NFT', 'SIN'))
+        for account in self.accounts:
+            self.chain.fund(account.address, balance.Wei)
+            self.token.mint_to(account.address, token_balance.Wei)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._ready = threading.Event()
+
+    @staticmethod
+    def _address(label: str) -> str:
+        return to_checksum_address(keccak(text=f'web3mt-standin-{label}')[-20:])
+
+    @property
+    def url(self) -> str:
+        return f'http://{self.host}:{self.port}'
+
+    @property
+    def network(self) -> Chain:
+        return Chain(
+            name='StandIn',
+            rpc=self.url,
+            chain_id=self.chain.chain_id,
+            eip1559_tx=True,
+            coin_symbol='ETH',
+            explorer=self.url,
+        )
+
+    def client(self, index: int, **kwargs):
+        from web3mt.evm.client import Client
+        return Client(network=self.network, account=self.accounts[index], **kwargs)
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        try:
+            body = await request.json(loads=json.loads)
+        except ValueError:
+            return web.json_response({'jsonrpc': '2.0', 'id': None, 'error': {'code': -32700, 'message': 'Parse error'}})
+        if isinstance(body, list):
+            return web.json_response([self.chain.handle(item) for item in body])
+        return web.json_response(self.chain.handle(body))
+
+    def _serve(self, sock: socket.socket) -> None:
+        self._loop = asyncio.new_event_loop()
+        app = web.Application()
+        app.router.add_post('/', self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        self._loop.run_until_complete(self._runner.setup())
+        self._loop.run_until_complete(web.SockSite(self._runner, sock).start())
+        self._ready.set()
+        self._loop.run_forever()
+        self._loop.run_until_complete(self._runner.cleanup())
+        self._loop.close()
+
+    def start(self) -> 'StandInNode':
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind((self.host, 0))
+        self.port = sock.getsockname()[1]
+        self._thread = threading.Thread(target=self._serve, args=(sock,), name='standin-node', daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def stop(self) -> None:
+        if not self._thread:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._thread = None
+        self._ready.clear()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    async def __aenter__(self):
+        return self.start()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await asyncio.to_thread(self.stop)
@@ -0,0 +1,189 @@
+import asyncio
+import atexit
+import os
+import traceback
+import weakref
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Optional
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+from web3 import AsyncHTTPProvider
+from web3.types import RPCEndpoint, RPCResponse
+
+from web3mt.utils import logger
+
+DEFAULT_TIMEOUT = 10  # same as web3's own sessions
+
+
+class _PooledSession:
+    __slots__ = ('session', 'users')
+
+    def __init__(self, session: ClientSession):
+        self.session = session
+        self.users = 0
+
+
+class SessionPool:
+    """
+    aiohttp sessions per RPC endpoint and proxy, shared by every provider using them. Sessions in use stay open;
+    once their last user releases them they're kept for reuse, at most `max_idle` of them, least recently used ones
+    are closed first. Whatever is left is closed when its event loop shuts down.
+    """
+
+    def __init__(self, max_idle: int = 32, limit_per_host: int = 100):
+        self.max_idle = max_idle
+        self.limit_per_host = limit_per_host
+        self.entries: OrderedDict[tuple[str, Optional[str]], _PooledSession] = OrderedDict()
+        self._parked: dict[asyncio.AbstractEventLoop, AsyncIterator[None]] = {}
+
+    def acquire(self, endpoint: str, proxy: str = None) -> ClientSession:
+        """Must be called from a running loop"""
+        key = (endpoint, proxy)
+        entry = self.entries.get(key)
+        if entry is not None and (entry.session.closed or entry.session._loop is not asyncio.get_running_loop()):
+            self._close(self.entries.pop(key).session)
+            entry = None
+        if entry is None:
+            session = ClientSession(
+                connector=TCPConnector(limit_per_host=self.limit_per_host),
+                timeout=ClientTimeout(DEFAULT_TIMEOUT),
+                raise_for_status=True
+            )
+            entry = self.entries[key] = _PooledSession(session)
+            self._close_at_shutdown(session._loop)
+            leaks.track(session, f'aiohttp session {endpoint}{f" via {proxy}" if proxy else ""}')
+        entry.users += 1
+        self.entries.move_to_end(key)
+        return entry.session
+
+    def release(self, endpoint: str, proxy: str = None) -> None:
+        entry = self.entries.get((endpoint, proxy))
+        if entry is None:
+            return
+        entry.users = max(entry.users - 1, 0)
+        if not entry.users:
+            self._trim()
+
+    def _trim(self) -> None:
+        idle = [key for key, entry in self.entries.items() if not entry.users]
+        for key in idle[:max(len(idle) - self.max_idle, 0)]:
+            self._close(self.entries.pop(key).session)
+
+    @staticmethod
+    def _close(session: ClientSession) -> None:
+        leaks.untrack(session)
+        if session.closed:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if session._loop is running:
+            running.create_task(session.close())
+        elif running is None and not session._loop.is_closed():
+            session._loop.run_until_complete(session.close())
+
+    def _close_at_shutdown(self, loop: asyncio.AbstractEventLoop) -> None:
+        """
+        Parks an async generator at its first `yield` on `loop`: `loop.shutdown_asyncgens()`, which `asyncio.run`
+        calls before closing the loop, finalizes it and so closes the loop's sessions
+        """
+        if loop in self._parked:
+            return
+
+        async def parked() -> AsyncIterator[None]:
+            try:
+                yield
+            finally:
+                self._parked.pop(loop, None)
+                await self.close_all(loop)
+
+        generator = self._parked[loop] = parked()
+        try:
+            generator.__anext__().send(None)
+        except StopIteration:
+            pass
+
+    async def close_all(self, loop: asyncio.AbstractEventLoop = None) -> None:
+        """Closes every session, or only those of `loop`"""
+        keys = [key for key, entry in self.entries.items() if loop is None or entry.session._loop is loop]
+        for key in keys:
+            session = self.entries.pop(key).session
+            if not session.closed:
+                await session.close()
+            leaks.untrack(session)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+session_pool = SessionPool()
+
+
+class PooledHTTPProvider(AsyncHTTPProvider):
+    """
+    `AsyncHTTPProvider` that takes its session from a `SessionPool` (keyed by endpoint and proxy) instead of web3's
+    process-wide cache, and gives it back on `disconnect`
+    """
+
+    def __init__(self, endpoint_uri: str, proxy: str = None, pool: SessionPool = None):
+        super().__init__(endpoint_uri, request_kwargs={'proxy': proxy} if proxy else None)
+        self.proxy = proxy
+        self.pool = session_pool if pool is None else pool
+        self._session: Optional[ClientSession] = None
+
+    async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        if self._session is None or self._session.closed or self._session._loop is not asyncio.get_running_loop():
+            if self._session is not None:
+                self.pool.release(self.endpoint_uri, self.proxy)
+            self._session = self.pool.acquire(self.endpoint_uri, self.proxy)
+        request_data = self.encode_rpc_request(method, params)
+        async with self._session.post(self.endpoint_uri, data=request_data, **self.get_request_kwargs()) as response:
+            raw_response = await response.read()
+        return self.decode_rpc_response(raw_response)
+
+    async def disconnect(self) -> None:
+        if self._session is not None:
+            self._session = None
+            self.pool.release(self.endpoint_uri, self.proxy)
+
+
+class LeakTracker:
+    """
+    Debug mode (`WEB3MT_DEBUG_LEAKS=1` or `enable`): remembers where every `Client` and pooled session was created and
+    reports the ones collected without being closed and, at exit, the ones still open
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.open: dict[int, tuple[str, str]] = {}
+        self.leaked = 0
+        atexit.register(self.report)
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def track(self, obj: Any, label: str) -> None:
+        if not self.enabled:
+            return
+        self.open[id(obj)] = (label, ''.join(traceback.format_stack(limit=8)[:-2]))
+        weakref.finalize(obj, self._collected, id(obj))
+
+    def untrack(self, obj: Any) -> None:
+        self.open.pop(id(obj), None)
+
+    def _collected(self, key: int) -> None:
+        entry = self.open.pop(key, None)
+        if entry is not None:
+            self.leaked += 1
+            logger.warning(f'{entry[0]} was garbage collected without being closed, created at:\n{entry[1]}')
+
+    def report(self) -> None:
+        if not self.enabled or not (self.open or self.leaked):
+            return
+        logger.warning(f'{len(self.open)} clients/sessions still open at exit, {self.leaked} collected unclosed')
+        for label, stack in self.open.values():
+            logger.warning(f'Unclosed {label}, created at:\n{stack}')
+
+
+leaks = LeakTracker(bool(os.getenv('WEB3MT_DEBUG_LEAKS')))
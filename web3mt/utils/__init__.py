@@ -1,8 +1,71 @@
-from .logger import logger
-from .profile_session import ProfileSession
+import importlib
+
+from .logger import logger, configure_logging
+from .clock import Clock, VirtualClock, get_clock, set_clock
+from .pacing import Pacing, NoPacing, MinInterval, TokenBucket, pacing, set_pacing
+from .http_cache import HTTPCache, http_cache
+from .sessions import SessionRegistry, sessions
 from .reader import read_json, read_txt
 from .sleeping import sleep
-from .windows import set_windows_event_loop_policy
+from .tracing import tracer, enable_tracing, disable_tracing
+from .jobs import JobQueue, JobState, checkpoint_tx
+from .planner import DelayPlanner, Schedule, pause
+from .budget import WaitBudget, budget
+from .watchdog import LoopWatchdog
+from .profiler import SamplingProfiler
+from .windows import set_windows_event_loop_policy, set_uvloop_event_loop_policy
 
 Z8 = 10 ** 8
 Z18 = 10 ** 18
+
+# Exports below pull in curl_cffi, better_proxy, web3db or pycryptodome, so they're imported on first access
+_LAZY = {
+    'RetryPolicy': '.retry',
+    'CircuitBreaker': '.retry',
+    'breakers': '.retry',
+    'decode': '.decoding',
+    'register_decoder': '.decoding',
+    'ProxyManager': '.proxies',
+    'proxy_manager': '.proxies',
+    'ProfileSession': '.profile_session',
+    'TokenStore': '.token_store',
+    'jwt_expiry': '.token_store',
+    'Fleet': '.fleet',
+    'run_fleet': '.fleet',
+    'run_sharded': '.sharding',
+    'shared_rate': '.sharding',
+    'own': '.sharding',
+}
+
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *_LAZY])
+
+
+__all__ = [
+    'logger', 'configure_logging',
+    'Clock', 'VirtualClock', 'get_clock', 'set_clock',
+    'Pacing', 'NoPacing', 'MinInterval', 'TokenBucket', 'pacing', 'set_pacing',
+    'HTTPCache', 'http_cache',
+    'SessionRegistry', 'sessions',
+    'read_json', 'read_txt',
+    'sleep',
+    'tracer', 'enable_tracing', 'disable_tracing',
+    'JobQueue', 'JobState', 'checkpoint_tx',
+    'DelayPlanner', 'Schedule', 'pause',
+    'WaitBudget', 'budget',
+    'LoopWatchdog',
+    'SamplingProfiler',
+    'set_windows_event_loop_policy', 'set_uvloop_event_loop_policy',
+    'Z8', 'Z18',
+    *_LAZY,
+]
@@ -0,0 +1,137 @@
+import json
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from .clock import get_clock
+
+SLEEP = 'sleep'
+PACING = 'pacing'
+BACKOFF = 'backoff'
+HTTP = 'http'
+GWEI = 'gwei'
+RECEIPT = 'receipt'
+KINDS = (SLEEP, PACING, BACKOFF, HTTP, GWEI, RECEIPT)
+OTHER = 'other'
+NO_TASK = '-'
+
+_scope: ContextVar[tuple[Any, Optional[str]]] = ContextVar('web3mt_budget_scope', default=(None, None))
+_measuring: ContextVar[bool] = ContextVar('web3mt_budget_measuring', default=False)
+
+
+class WaitBudget:
+    """
+    Where a campaign's time goes, per profile and task: deliberate sleeps, pacing, retry backoff, HTTP requests, gwei
+    and receipt waits. `Fleet` and `JobQueue.run` also record how long each profile and task took, and whatever
+    that wall time isn't explained by a tracked wait is reported as `other` (RPC calls and CPU). Nested measurements
+    count once, for the outermost kind: the sleeps of a gwei loop are gwei time.
+    """
+
+    def __init__(self):
+        self.waits: dict[tuple[Any, str, str], float] = defaultdict(float)
+        self.walls: dict[tuple[Any, str], float] = defaultdict(float)
+        self.profile_walls: dict[Any, float] = defaultdict(float)
+
+    def add(self, kind: str, seconds: float, profile_id: Any = None) -> None:
+        scope_profile, task = _scope.get()
+        if profile_id is None:
+            profile_id = scope_profile
+        elif profile_id != scope_profile:
+            task = None
+        self.waits[(profile_id, task or NO_TASK, kind)] += seconds
+
+    @contextmanager
+    def measure(self, kind: str, profile_id: Any = None) -> Iterator[None]:
+        if _measuring.get():
+            yield
+            return
+        token = _measuring.set(True)
+        start = get_clock().time()
+        try:
+            yield
+        finally:
+            _measuring.reset(token)
+            self.add(kind, get_clock().time() - start, profile_id)
+
+    @contextmanager
+    def profile(self, profile_id: Any) -> Iterator[None]:
+        token = _scope.set((profile_id, None))
+        start = get_clock().time()
+        try:
+            yield
+        finally:
+            _scope.reset(token)
+            self.profile_walls[profile_id] += get_clock().time() - start
+
+    @contextmanager
+    def task(self, profile_id: Any, task: str) -> Iterator[None]:
+        token = _scope.set((profile_id, task))
+        start = get_clock().time()
+        try:
+            yield
+        finally:
+            _scope.reset(token)
+            self.walls[(profile_id, task)] += get_clock().time() - start
+
+    def _walls(self) -> dict[tuple[Any, str], float]:
+        walls = dict(self.walls)
+        for profile_id, total in self.profile_walls.items():
+            in_tasks = sum(wall for (profile, _), wall in self.walls.items() if profile == profile_id)
+            walls[(profile_id, NO_TASK)] = max(total - in_tasks, 0.0)
+        return walls
+
+    def breakdown(self, by: str = 'task') -> list[dict[str, Any]]:
+        """Rows of wall time, time per kind and `other`, grouped `by` task or profile, largest wall time first"""
+        index = 1 if by == 'task' else 0
+        rows: dict[Any, dict[str, Any]] = {}
+
+        def row(key: tuple) -> dict[str, Any]:
+            name = key[index]
+            if name not in rows:
+                rows[name] = {by: name, 'wall': 0.0, **dict.fromkeys(KINDS, 0.0)}
+            return rows[name]
+
+        for key, wall in self._walls().items():
+            row(key)['wall'] += wall
+        for (profile_id, task, kind), seconds in self.waits.items():
+            row((profile_id, task))[kind] = row((profile_id, task)).get(kind, 0.0) + seconds
+        for values in rows.values():
+            waited = sum(seconds for kind, seconds in values.items() if kind not in (by, 'wall'))
+            values[OTHER] = max(values['wall'] - waited, 0.0)
+        return sorted(rows.values(), key=lambda values: values['wall'], reverse=True)
+
+    def table(self, by: str = 'task', limit: int = 30) -> str:
+        rows = self.breakdown(by)
+        columns = ['wall', *KINDS, OTHER]
+        lines = [f'{by:<24}' + ''.join(f'{column:>12}' for column in columns)]
+        total = {column: sum(row[column] for row in rows) for column in columns}
+        for values in [*rows[:limit], {by: 'total', **total}]:
+            wall = values['wall']
+            cells = [f'{wall:>11.0f}s'] + [
+                f'{values[column] / wall:>12.1%}' if wall else f'{values[column]:>11.0f}s' for column in columns[1:]
+            ]
+            lines.append(f'{str(values[by])[:24]:<24}' + ''.join(cells))
+        return '\n'.join(lines)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'by_task': self.breakdown('task'),
+            'by_profile': self.breakdown('profile'),
+            'waits': [
+                {'profile': profile_id, 'task': task, 'kind': kind, 'seconds': seconds}
+                for (profile_id, task, kind), seconds in self.waits.items()
+            ],
+        }
+
+    def export(self, path: str | Path = 'wait_budget.json') -> None:
+        Path(path).write_text(json.dumps(self.to_dict(), indent=2, default=str))
+
+    def reset(self) -> None:
+        self.waits.clear()
+        self.walls.clear()
+        self.profile_walls.clear()
+
+
+budget = WaitBudget()
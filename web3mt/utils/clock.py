@@ -0,0 +1,123 @@
+import asyncio
+import heapq
+import selectors
+import time
+from typing import Any, Coroutine, TypeVar
+
+T = TypeVar('T')
+
+
+class Clock:
+    """Real time: `time.monotonic` and `asyncio.sleep`"""
+
+    def time(self) -> float:
+        return time.monotonic()
+
+    async def sleep(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+
+
+class _VirtualSelector(selectors.DefaultSelector):
+    def __init__(self, clock: 'VirtualClock'):
+        super().__init__()
+        self.clock = clock
+        self.loop: asyncio.BaseEventLoop = None
+
+    def select(self, timeout: float = None):
+        if timeout == 0 or not self.clock.sleeps:
+            return super().select(timeout)
+        scheduled = self.loop._scheduled
+        settle = 0 if scheduled and id(scheduled[0]) in self.clock.sleeps else self.clock.settle
+        events = super().select(settle if timeout is None else min(settle, timeout))
+        if events or timeout is not None and timeout <= settle:
+            return events
+        self.clock.skip(self.loop)
+        return []
+
+
+class _VirtualEventLoop(asyncio.SelectorEventLoop):
+    def __init__(self, clock: 'VirtualClock'):
+        selector = _VirtualSelector(clock)
+        super().__init__(selector)
+        selector.loop = self
+        self.clock = clock
+
+    def time(self) -> float:
+        return self.clock.time()
+
+
+class VirtualClock(Clock):
+    """
+    Accelerated time for simulations and tests. `run` drives a coroutine on an event loop that jumps straight to the
+    next `sleep` made through this clock once the loop has been idle for `settle` real seconds (at once if that
+    sleep is the next timer anyway), so sleeps end in the order they would in real time. Other timers (request
+    timeouts, keep-alives, `asyncio.sleep`) are pushed back by every jump: they only count real work time, and an
+    in-flight request never times out because somebody else's 600 s sleep was skipped.
+    """
+
+    def __init__(self, settle: float = 0.005):
+        self.settle = settle
+        self.offset = 0.0
+        self.started = time.monotonic()
+        self.sleeps: dict[int, asyncio.TimerHandle] = {}
+
+    def time(self) -> float:
+        return time.monotonic() + self.offset
+
+    @property
+    def elapsed(self) -> float:
+        """Virtual seconds since the clock was created"""
+        return self.time() - self.started
+
+    def skip(self, loop: asyncio.BaseEventLoop) -> None:
+        delta = min(handle.when() for handle in self.sleeps.values()) - self.time()
+        if delta <= 0:
+            return
+        self.offset += delta
+        # Relies on asyncio internals: the loop's timer heap and TimerHandle._when
+        for handle in loop._scheduled:
+            if id(handle) not in self.sleeps:
+                handle._when += delta
+        heapq.heapify(loop._scheduled)
+
+    async def sleep(self, delay: float) -> None:
+        loop = asyncio.get_running_loop()
+        if not isinstance(loop, _VirtualEventLoop) or delay <= 0:
+            return await asyncio.sleep(delay)
+        future = loop.create_future()
+        handle = loop.call_later(delay, lambda: future.done() or future.set_result(None))
+        self.sleeps[id(handle)] = handle
+        try:
+            await future
+        finally:
+            self.sleeps.pop(id(handle), None)
+            handle.cancel()
+
+    def new_event_loop(self) -> asyncio.AbstractEventLoop:
+        return _VirtualEventLoop(self)
+
+    def run(self, main: Coroutine[Any, Any, T]) -> T:
+        previous = set_clock(self)
+        try:
+            with asyncio.Runner(loop_factory=self.new_event_loop) as runner:
+                return runner.run(main)
+        finally:
+            set_clock(previous)
+
+
+_clock = Clock()
+
+
+def get_clock() -> Clock:
+    return _clock
+
+
+def set_clock(clock: Clock) -> Clock:
+    """Makes `clock` the one `sleep`, pacing, circuit breakers and proxy quarantine use and returns the previous one"""
+    global _clock
+    previous, _clock = _clock, clock
+    return previous
+
+
+def monotonic() -> float:
+    return _clock.time()
@@ -0,0 +1,62 @@
+import json
+from typing import Any, Callable
+
+from curl_cffi.requests import Response
+
+try:
+    import orjson
+
+    loads: Callable[[bytes | str], Any] = orjson.loads
+    JSONDecodeError = (orjson.JSONDecodeError, UnicodeDecodeError)
+except ImportError:
+    loads = json.loads
+    JSONDecodeError = (json.JSONDecodeError, UnicodeDecodeError)
+
+_DECODED = '_web3mt_data'
+
+decoders: dict[str, Callable[[Response], Any]] = {}
+
+
+def register_decoder(content_type: str, decoder: Callable[[Response], Any]) -> None:
+    """`content_type` is a media type (`application/json`) or a structured syntax suffix (`+json`)"""
+    decoders[content_type.lower()] = decoder
+
+
+def decode_json(response: Response) -> Any:
+    try:
+        return loads(response.content)
+    except JSONDecodeError:
+        return response.text
+
+
+def decode_text(response: Response) -> str:
+    return response.text
+
+
+def _sniff(response: Response) -> Any:
+    content = response.content.lstrip()[:1]
+    return decode_json(response) if content in (b'{', b'[') else response.text
+
+
+register_decoder('application/json', decode_json)
+register_decoder('+json', decode_json)
+
+
+def decode(response: Response) -> Any:
+    """
+    Decodes the body by `Content-Type`: JSON with orjson if it's installed, text otherwise.
+    Plenty of APIs send JSON as `text/*`, so those are tried as JSON first, falling back to text. Bodies without a
+    known content type are parsed as JSON only if they look like it. The result is memoized on the
+    response, so decoding later (see `ProfileSession.request(decode=False)`) costs nothing extra.
+    """
+    if hasattr(response, _DECODED):
+        return getattr(response, _DECODED)
+    content_type = (response.headers.get('Content-Type') or '').split(';')[0].strip().lower()
+    decoder = decoders.get(content_type)
+    if decoder is None and '+' in content_type:
+        decoder = decoders.get('+' + content_type.rsplit('+', 1)[1])
+    if decoder is None and content_type.startswith('text/'):
+        decoder = decode_json
+    data = (decoder or _sniff)(response)
+    setattr(response, _DECODED, data)
+    return data
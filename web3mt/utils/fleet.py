@@ -0,0 +1,214 @@
+import asyncio
+import os
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from web3db.models import Profile
+
+from .budget import budget
+from .clock import get_clock
+from .logger import logger
+from .planner import Schedule, _current_schedule
+from .profiler import SamplingProfiler, log_top, profile_path
+from .sessions import sessions
+
+Selector = Callable[[Profile], Any] | Any
+
+
+def _select(selector: Selector, profile: Profile) -> Any:
+    return selector(profile) if callable(selector) else selector
+
+
+def proxy_of(profile: Profile) -> Optional[str]:
+    proxy = getattr(profile, 'proxy', None)
+    return getattr(proxy, 'proxy_string', None) if proxy else None
+
+
+class Job:
+    __slots__ = ('index', 'profile', 'priority', 'keys', 'group')
+
+    def __init__(self, index: int, profile: Profile, priority: int, keys: dict[str, Any]):
+        self.index = index
+        self.profile = profile
+        self.priority = priority
+        self.keys = keys
+        self.group = keys.get('proxy') or getattr(profile, 'id', index)
+
+
+class Fleet:
+    """
+    Runs a coroutine per profile with a global concurrency cap and optional caps per chain, RPC endpoint and proxy.
+    Profiles are pulled lazily from the iterable into a window a few times larger than `concurrency`, so memory and
+    sockets stay flat for any fleet size. Inside the window higher `priority` goes first, and equal priorities are
+    served round-robin across proxies so one busy proxy doesn't hold everyone else up.
+    With `profile` (a directory, `WEB3MT_PROFILE` by default) every run is sampled by `SamplingProfiler` and writes
+    its folded stacks and CPU attribution there.
+    """
+
+    def __init__(
+            self,
+            concurrency: int = 50,
+            per_chain: int = None,
+            per_endpoint: int = None,
+            per_proxy: int = None,
+            window: int = None,
+            profile: str | Path = None
+    ):
+        self.concurrency = concurrency
+        self.profile = profile or os.getenv('WEB3MT_PROFILE')
+        self.limits = {'chain': per_chain, 'endpoint': per_endpoint, 'proxy': per_proxy}
+        self.window = window or concurrency * 4
+        self.active: dict[tuple[str, Any], int] = defaultdict(int)
+        self.served: dict[Any, int] = defaultdict(int)
+        # Jobs per group in the window or running, a group's served count is dropped once it has none left
+        self.queued: dict[Any, int] = defaultdict(int)
+
+    def _eligible(self, job: Job) -> bool:
+        for kind, key in job.keys.items():
+            limit = self.limits.get(kind)
+            if limit is not None and key is not None and self.active.get((kind, key), 0) >= limit:
+                return False
+        return True
+
+    def _acquire(self, job: Job) -> None:
+        for kind, key in job.keys.items():
+            self.active[(kind, key)] += 1
+        self.served[job.group] += 1
+
+    def _release(self, job: Job) -> None:
+        for kind, key in job.keys.items():
+            self.active[(kind, key)] -= 1
+            if not self.active[(kind, key)]:
+                del self.active[(kind, key)]
+        self.queued[job.group] -= 1
+        if not self.queued[job.group]:
+            del self.queued[job.group]
+            self.served.pop(job.group, None)
+
+    async def _run_job(self, job: Job, func: Callable[[Profile], Awaitable], schedule: Schedule = None) -> Any:
+        _current_schedule.set(schedule)
+        profile_id = getattr(job.profile, 'id', job.index)
+        try:
+            with budget.profile(profile_id):
+                return await func(job.profile)
+        except Exception as e:
+            logger.error(f'{profile_id} | {type(e).__name__}: {e}')
+            return e
+        finally:
+            if len(sessions):
+                await sessions.close_profile(getattr(job.profile, 'id', id(job.profile)))
+
+    async def run(
+            self,
+            profiles: Iterable[Profile],
+            func: Callable[[Profile], Awaitable],
+            chain: Selector = None,
+            endpoint: Selector = None,
+            priority: Selector = 0,
+            schedule: Schedule = None
+    ) -> list:
+        """
+        `chain`, `endpoint` and `priority` are either constants or callables of the profile. With a `schedule` (see
+        `DelayPlanner`) a profile doesn't start before its planned offset from the start of the run.
+        Returns results in input order; exceptions are logged and returned in place of results.
+        """
+        if not self.profile:
+            return await self._run(profiles, func, chain, endpoint, priority, schedule)
+        profiler = SamplingProfiler().start()
+        try:
+            return await self._run(profiles, func, chain, endpoint, priority, schedule)
+        finally:
+            profiler.stop()
+            path = profiler.write(profile_path(self.profile))
+            log_top(profiler)
+            logger.info(f'Profile saved to {path}')
+
+    async def _run(
+            self,
+            profiles: Iterable[Profile],
+            func: Callable[[Profile], Awaitable],
+            chain: Selector,
+            endpoint: Selector,
+            priority: Selector,
+            schedule: Optional[Schedule]
+    ) -> list:
+        clock = get_clock()
+        started = clock.time()
+        profiles = iter(profiles)
+        exhausted = False
+        pending: list[Job] = []
+        running: dict[asyncio.Task, Job] = {}
+        results: dict[int, Any] = {}
+        index = 0
+        while True:
+            while not exhausted and len(pending) < self.window:
+                try:
+                    profile = next(profiles)
+                except StopIteration:
+                    exhausted = True
+                    break
+                keys = {
+                    'chain': _select(chain, profile),
+                    'endpoint': _select(endpoint, profile),
+                    'proxy': proxy_of(profile)
+                }
+                job = Job(index, profile, _select(priority, profile), keys)
+                pending.append(job)
+                self.queued[job.group] += 1
+                index += 1
+            if not pending and not running:
+                break
+            now = clock.time() - started
+            next_start = None
+            if pending and len(running) < self.concurrency:
+                pending.sort(key=lambda job: (-job.priority, self.served[job.group], job.index))
+                waiting = []
+                for job in pending:
+                    start = schedule.start_of(job.profile) if schedule else 0
+                    if start > now:
+                        next_start = start if next_start is None else min(next_start, start)
+                        waiting.append(job)
+                    elif len(running) < self.concurrency and self._eligible(job):
+                        self._acquire(job)
+                        task = asyncio.create_task(
+                            self._run_job(job, func, schedule), name=f'profile:{getattr(job.profile, "id", job.index)}'
+                        )
+                        running[task] = job
+                    else:
+                        waiting.append(job)
+                pending = waiting
+            if not running and next_start is None:
+                raise RuntimeError('Fleet limits leave no job eligible to run')
+            # Wakes the loop up when the next scheduled profile is due
+            timer = asyncio.create_task(clock.sleep(next_start - now)) if next_start is not None else None
+            try:
+                done, _ = await asyncio.wait(
+                    [*running, *([timer] if timer else [])], return_when=asyncio.FIRST_COMPLETED
+                )
+            except asyncio.CancelledError:
+                for task in running:
+                    task.cancel()
+                await asyncio.gather(*running, return_exceptions=True)
+                raise
+            finally:
+                if timer:
+                    timer.cancel()
+            done.discard(timer)
+            for task in done:
+                job = running.pop(task)
+                self._release(job)
+                results[job.index] = task.result()
+        return [results[i] for i in range(index)]
+
+
+async def run_fleet(
+        profiles: Iterable[Profile],
+        func: Callable[[Profile], Awaitable],
+        concurrency: int = 50,
+        **kwargs
+) -> list:
+    limits = {
+        key: kwargs.pop(key) for key in ('per_chain', 'per_endpoint', 'per_proxy', 'window', 'profile') if key in kwargs
+    }
+    return await Fleet(concurrency, **limits).run(profiles, func, **kwargs)
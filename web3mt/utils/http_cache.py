@@ -0,0 +1,72 @@
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, NamedTuple, Optional
+from urllib.parse import urlencode
+
+if TYPE_CHECKING:
+    from curl_cffi.requests import Response
+
+PROFILE = 'profile'
+SHARED = 'shared'
+
+
+class CachedResponse(NamedTuple):
+    response: 'Response'
+    data: Any
+    etag: Optional[str]
+    last_modified: Optional[str]
+
+
+class HTTPCache:
+    """
+    GET responses with validators (`ETag`/`Last-Modified`) for conditional requests: a cached entry is revalidated
+    with `If-None-Match`/`If-Modified-Since` and a 304 is answered from the cache. `profile` scope keys entries by
+    profile too, `shared` scope is for responses that aren't personalized and serves every profile from one entry.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.entries: OrderedDict[tuple, CachedResponse] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(url: str, params: dict = None, scope: str = PROFILE, profile_id: int = None) -> tuple:
+        query = urlencode(sorted(params.items()), doseq=True) if params else ''
+        return (profile_id if scope == PROFILE else None), url, query
+
+    def get(self, key: tuple) -> Optional[CachedResponse]:
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def validators(self, entry: Optional[CachedResponse]) -> dict[str, str]:
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def store(self, key: tuple, response: 'Response', data: Any) -> None:
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        cache_control = (response.headers.get('Cache-Control') or '').lower()
+        if not (etag or last_modified) or 'no-store' in cache_control:
+            self.entries.pop(key, None)
+            return
+        self.entries[key] = CachedResponse(response, data, etag, last_modified)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self, profile_id: int = None) -> None:
+        if profile_id is None:
+            self.entries.clear()
+            return
+        for key in [key for key in self.entries if key[0] == profile_id]:
+            del self.entries[key]
+
+
+http_cache = HTTPCache()
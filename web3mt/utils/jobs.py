@@ -0,0 +1,163 @@
+import json
+import sqlite3
+import time
+from contextvars import ContextVar
+from enum import Enum
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+from .budget import budget
+from .logger import logger
+
+_current_job: ContextVar[Optional[tuple['JobQueue', str]]] = ContextVar('web3mt_current_job', default=None)
+
+
+class JobState(str, Enum):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    SENT = 'sent'
+    CONFIRMED = 'confirmed'
+    FAILED = 'failed'
+
+
+class JobQueue:
+    """
+    Persistent (profile, task) units of a campaign with crash-safe states. A unit's idempotency key is
+    `campaign:profile_id:task`; transactions broadcast while a unit runs are checkpointed to it (see `checkpoint_tx`),
+    so after a restart confirmed units are skipped and sent-but-unconfirmed ones are reattached instead of re-sent.
+    """
+
+    def __init__(self, path: str | Path = 'jobs.db', campaign: str = 'default'):
+        self.campaign = campaign
+        self._db = sqlite3.connect(path)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(
+            '''CREATE TABLE IF NOT EXISTS jobs (
+                key TEXT PRIMARY KEY,
+                campaign TEXT NOT NULL,
+                profile_id INT NOT NULL,
+                task TEXT NOT NULL,
+                state TEXT NOT NULL,
+                tx_hashes TEXT NOT NULL DEFAULT '[]',
+                attempts INT NOT NULL DEFAULT 0,
+                error TEXT,
+                updated_at REAL NOT NULL
+            )'''
+        )
+        self._db.commit()
+        self.resume()
+
+    def close(self) -> None:
+        self._db.close()
+
+    def key(self, profile_id: int, task: str) -> str:
+        return f'{self.campaign}:{profile_id}:{task}'
+
+    def _update(self, key: str, **fields) -> None:
+        columns = ', '.join(f'{column} = ?' for column in fields)
+        with self._db:
+            self._db.execute(
+                f'UPDATE jobs SET {columns}, updated_at = ? WHERE key = ?', (*fields.values(), time.time(), key)
+            )
+
+    def resume(self) -> int:
+        """Units left `running` by a crash go back to `pending`. Returns how many"""
+        with self._db:
+            return self._db.execute(
+                'UPDATE jobs SET state = ?, updated_at = ? WHERE campaign = ? AND state = ?',
+                (JobState.PENDING, time.time(), self.campaign, JobState.RUNNING)
+            ).rowcount
+
+    def add(self, profile_id: int, task: str) -> str:
+        key = self.key(profile_id, task)
+        with self._db:
+            self._db.execute(
+                'INSERT OR IGNORE INTO jobs (key, campaign, profile_id, task, state, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (key, self.campaign, profile_id, task, JobState.PENDING, time.time())
+            )
+        return key
+
+    def get(self, profile_id: int, task: str) -> Optional[dict[str, Any]]:
+        row = self._db.execute(
+            'SELECT state, tx_hashes, attempts, error FROM jobs WHERE key = ?', (self.key(profile_id, task),)
+        ).fetchone()
+        if not row:
+            return None
+        return {'state': JobState(row[0]), 'tx_hashes': json.loads(row[1]), 'attempts': row[2], 'error': row[3]}
+
+    def state(self, profile_id: int, task: str) -> Optional[JobState]:
+        job = self.get(profile_id, task)
+        return job['state'] if job else None
+
+    def mark(self, profile_id: int, task: str, state: JobState, error: str = None) -> None:
+        self._update(self.key(profile_id, task), state=state, error=error)
+
+    def record_tx(self, key: str, tx_hash: str) -> None:
+        row = self._db.execute('SELECT tx_hashes FROM jobs WHERE key = ?', (key,)).fetchone()
+        tx_hashes = json.loads(row[0]) if row else []
+        tx_hashes.append(tx_hash)
+        self._update(key, state=JobState.SENT, tx_hashes=json.dumps(tx_hashes))
+
+    def counts(self) -> dict[str, int]:
+        return dict(self._db.execute(
+            'SELECT state, COUNT(*) FROM jobs WHERE campaign = ? GROUP BY state', (self.campaign,)
+        ).fetchall())
+
+    async def run(
+            self,
+            profile_id: int,
+            task: str,
+            func: Callable[[], Awaitable[Any]],
+            verify: Callable[[str], Awaitable[bool]] = None,
+            resumable: bool = False
+    ) -> Any:
+        """
+        Runs `func` for the unit unless it's already confirmed. A truthy result of `func` confirms the unit once
+        `verify(tx_hash)` passes for every transaction it broadcast, a falsy one, a failed transaction or an exception
+        fails it; a unit interrupted after broadcasting stays `sent`.
+        A `sent` unit is reattached to its transactions through `verify` instead of being re-sent: if they all
+        succeeded it's confirmed without running `func`. Multi-step tasks (approve, then swap) pass `resumable=True`
+        to be re-run once their transactions landed, `func` has to skip the steps already done itself.
+        """
+        key = self.add(profile_id, task)
+        job = self.get(profile_id, task)
+        if job['state'] == JobState.CONFIRMED:
+            logger.success(f'{profile_id} | {task} already done')
+            return True
+        if job['state'] == JobState.SENT and job['tx_hashes'] and verify:
+            logger.info(f'{profile_id} | Reattaching {task} to {len(job["tx_hashes"])} sent transactions')
+            verified = [await verify(tx_hash) for tx_hash in job['tx_hashes']]
+            if all(verified) and not resumable:
+                self._update(key, state=JobState.CONFIRMED, error=None)
+                return True
+        self._update(key, state=JobState.RUNNING, attempts=job['attempts'] + 1, error=None)
+        token = _current_job.set((self, key))
+        try:
+            with budget.task(profile_id, task):
+                result = await func()
+                if result and verify:
+                    for tx_hash in self.get(profile_id, task)['tx_hashes'][len(job['tx_hashes']):]:
+                        if not await verify(tx_hash):
+                            self._update(key, state=JobState.FAILED, error=f'Transaction {tx_hash} failed')
+                            return False
+        except BaseException as e:
+            if self.get(profile_id, task)['tx_hashes'] != job['tx_hashes']:
+                state = JobState.SENT
+            else:
+                state = JobState.FAILED if isinstance(e, Exception) else JobState.PENDING
+            self._update(key, state=state, error=f'{type(e).__name__}: {e}')
+            raise
+        finally:
+            _current_job.reset(token)
+        self._update(key, state=JobState.CONFIRMED if result else JobState.FAILED)
+        return result
+
+
+def checkpoint_tx(tx_hash: str) -> None:
+    """Records a broadcast transaction against the job unit running in the current context, if any"""
+    current = _current_job.get()
+    if current:
+        queue, key = current
+        queue.record_tx(key, tx_hash)
@@ -1,8 +1,14 @@
+import random
 import sys
+import threading
 from loguru import logger
 from pathlib import Path
+from queue import Empty, SimpleQueue
+from typing import Optional, TextIO
 
 MAIN_DIR = Path(__file__).parent.parent.parent
+# Every sink filters the same record, the sampling decision is kept on it so they all agree
+_SAMPLED = '_web3mt_sampled'
 
 
 def error_filter(record):
@@ -13,13 +19,128 @@ def not_error_filter(record):
     return record["level"].name not in ["ERROR", "CRITICAL"]
 
 
-logger.remove()
+def _is_level(name: str) -> bool:
+    try:
+        logger.level(name)
+        return True
+    except ValueError:
+        return False
+
+
+class Sampler:
+    """
+    Keeps a `rate` share of records per rule. Rule keys are level names (`'DEBUG'`) or message prefixes
+    (`'💤 Sleeping for'`); a prefix rule wins over a level rule. Warnings and errors are never sampled out.
+    """
+
+    def __init__(self, rules: dict[str, float]):
+        self.levels = {key: rate for key, rate in rules.items() if _is_level(key)}
+        self.prefixes = tuple((key, rate) for key, rate in rules.items() if key not in self.levels)
+
+    def __call__(self, record) -> bool:
+        keep = record["extra"].get(_SAMPLED)
+        if keep is None:
+            keep = record["extra"][_SAMPLED] = self._keep(record)
+        return keep
+
+    def _keep(self, record) -> bool:
+        if record["level"].no >= 30:
+            return True
+        message = record["message"]
+        for prefix, rate in self.prefixes:
+            if message.startswith(prefix) or message.partition(' | ')[2].startswith(prefix):
+                return random.random() < rate
+        rate = self.levels.get(record["level"].name)
+        return rate is None or random.random() < rate
+
+
+class BatchWriter:
+    """
+    Stream for loguru sinks that queues formatted records and writes them from a background thread in batches of up
+    to `batch_size` records or every `interval` seconds, so logging never blocks the event loop on I/O
+    """
+
+    def __init__(self, target: str | Path | TextIO, batch_size: int = 512, interval: float = 0.5):
+        self._path = target if isinstance(target, (str, Path)) else None
+        self._file: Optional[TextIO] = None
+        self._stream = target if self._path is None else None
+        self.batch_size = batch_size
+        self.interval = interval
+        self._queue: SimpleQueue = SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name='web3mt-log-writer', daemon=True)
+        self._thread.start()
+
+    def isatty(self) -> bool:
+        return hasattr(self._stream, 'isatty') and self._stream.isatty()
+
+    def write(self, message: str) -> None:
+        self._queue.put(message)
+
+    def _run(self) -> None:
+        while True:
+            try:
+                batch = [self._queue.get(timeout=self.interval)]
+            except Empty:
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except Empty:
+                    break
+            stop = batch[-1] is None
+            text = ''.join(message for message in batch if message is not None)
+            if text:
+                if self._stream is None:
+                    self._file = self._stream = open(self._path, 'a', encoding='utf-8')
+                self._stream.write(text)
+                self._stream.flush()
+            if stop:
+                return
+
+    def stop(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+        if self._file:
+            self._file.close()
+
+
 format_string = (
     "<white>{time:YYYY-MM-DD HH:mm:ss}</white> | <level>{level: <8}</level> | "
     "<cyan>{name}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
 )
-logger.add(sys.stderr, format=format_string)
-logger.add(MAIN_DIR / "general.log", filter=not_error_filter, format=format_string)
-logger.add(MAIN_DIR / "errors.log", filter=error_filter, format=format_string)
 
-__all__ = ["logger"]
+
+def configure_logging(
+        batched: bool = False,
+        serialize: bool = False,
+        sampling: dict[str, float] = None,
+        log_dir: str | Path = MAIN_DIR,
+        level: str = "DEBUG"
+) -> None:
+    """
+    Default mode writes every record synchronously. `batched` queues records to background writer threads that
+    flush in batches, `serialize` writes JSON lines to the log files and `sampling` drops a share of chatty
+    records (see `Sampler`). Batched records are flushed by `logger.remove()`, which loguru also runs at exit.
+    """
+    sampler = Sampler(sampling) if sampling else None
+
+    def with_sampling(base_filter=None):
+        if sampler is None:
+            return base_filter
+        return lambda record: (base_filter is None or base_filter(record)) and sampler(record)
+
+    log_dir = Path(log_dir)
+    logger.remove()
+    stderr = BatchWriter(sys.stderr) if batched else sys.stderr
+    logger.add(stderr, format=format_string, filter=with_sampling(), colorize=stderr.isatty(), level=level)
+    for file_name, base_filter in (("general.log", not_error_filter), ("errors.log", error_filter)):
+        logger.add(
+            BatchWriter(log_dir / file_name) if batched else log_dir / file_name,
+            filter=with_sampling(base_filter), format=format_string, serialize=serialize, level=level,
+            **({} if batched else {'delay': True})
+        )
+
+
+configure_logging()
+
+__all__ = ["logger", "configure_logging"]
@@ -0,0 +1,130 @@
+import asyncio
+import random
+from typing import Callable, Optional
+from urllib.parse import urlsplit
+
+from .clock import get_clock, monotonic
+
+
+class Pacing:
+    """Decides how long a request to an upstream has to wait. Instances are shared by every session using them"""
+
+    # Sustained requests per second the policy allows, None if unlimited
+    rate: Optional[float] = None
+
+    def reserve(self) -> float:
+        return 0.0
+
+    async def wait(self) -> float:
+        delay = self.reserve()
+        if delay > 0:
+            await get_clock().sleep(delay)
+        return delay
+
+
+class NoPacing(Pacing):
+    pass
+
+
+class MinInterval(Pacing):
+    """At least `interval` (+ up to `jitter`) seconds between consecutive requests"""
+
+    def __init__(self, interval: float, jitter: float = 0):
+        self.interval = interval
+        self.jitter = jitter
+        self._next = 0.0
+        self.rate = 1 / (interval + jitter / 2) if interval or jitter else None
+
+    def reserve(self) -> float:
+        now = monotonic()
+        slot = max(now, self._next)
+        self._next = slot + self.interval + random.uniform(0, self.jitter)
+        return slot - now
+
+
+class TokenBucket(Pacing):
+    """`rate` requests per second on average with bursts of up to `burst` requests"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = monotonic()
+
+    def reserve(self) -> float:
+        now = monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate) - 1
+        self._updated = now
+        return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+
+class SharedPacing(Pacing):
+    """
+    Paces like `policy`'s rate, but through a token bucket shared with other processes (see `run_sharded`):
+    `acquire(key, rate, burst)` reserves a token and returns the wait. It's a blocking IPC call, so it runs in the
+    loop's executor.
+    """
+
+    def __init__(self, key: str, policy: Pacing, acquire: Callable[[str, float, int], float]):
+        self.key = key
+        self.policy = policy
+        self.rate = policy.rate
+        self.burst = getattr(policy, 'burst', 1)
+        self.acquire = acquire
+
+    async def wait(self) -> float:
+        delay = await asyncio.get_running_loop().run_in_executor(None, self.acquire, self.key, self.rate, self.burst)
+        if delay > 0:
+            await get_clock().sleep(delay)
+        return delay
+
+
+NO_PACING = NoPacing()
+
+
+class PacingRegistry:
+    """
+    Pacing per host. A policy set for `example.com` also applies to its subdomains unless they have their own.
+    Hosts without a policy aren't paced.
+    """
+
+    def __init__(self, default: Pacing = NO_PACING):
+        self.default = default
+        self.policies: dict[str, Pacing] = {}
+        self.acquire: Optional[Callable[[str, float, int], float]] = None
+        self._shared: dict[str, SharedPacing] = {}
+
+    def share(self, acquire: Callable[[str, float, int], float]) -> None:
+        """Paces every policy with a rate through `acquire`, a token bucket per host shared with other processes"""
+        self.acquire = acquire
+        self._shared.clear()
+
+    def _policy(self, host: str) -> Pacing:
+        policy = self.policies[host]
+        if self.acquire is None or policy.rate is None:
+            return policy
+        shared = self._shared.get(host)
+        if shared is None or shared.policy is not policy:
+            shared = self._shared[host] = SharedPacing(f'pacing:{host}', policy, self.acquire)
+        return shared
+
+    def set(self, host: str, policy: Pacing) -> None:
+        self.policies[host.lower()] = policy
+
+    def remove(self, host: str) -> None:
+        self.policies.pop(host.lower(), None)
+
+    def get(self, url_or_host: str) -> Pacing:
+        host = (urlsplit(url_or_host).hostname if '//' in url_or_host else url_or_host).lower()
+        while host:
+            if host in self.policies:
+                return self._policy(host)
+            host = host.partition('.')[2]
+        return self.default
+
+
+pacing = PacingRegistry()
+
+
+def set_pacing(host: str, policy: Pacing) -> None:
+    pacing.set(host, policy)
@@ -0,0 +1,102 @@
+import random
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, Optional, Sequence
+
+from .logger import logger
+from .pacing import pacing
+from .sleeping import sleep
+
+if TYPE_CHECKING:
+    from web3db.models import Profile
+
+_current_schedule: ContextVar[Optional['Schedule']] = ContextVar('web3mt_current_schedule', default=None)
+
+
+class Schedule:
+    """Start offsets (seconds from the start of the run) per profile id and the spacing between a profile's tasks"""
+
+    def __init__(self, starts: dict[Any, float], interval: float, spacing: float, jitter: float, duration: float):
+        self.starts = starts
+        self.interval = interval
+        self.spacing = spacing
+        self.jitter = jitter
+        self.duration = duration
+
+    def start_of(self, profile: 'Profile') -> float:
+        return self.starts.get(getattr(profile, 'id', None), 0.0)
+
+    def gap(self) -> float:
+        return self.spacing * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def __repr__(self) -> str:
+        return (
+            f'Schedule({len(self.starts)} profiles, start every {self.interval:.1f} s, '
+            f'{self.spacing:.1f} s between tasks, ~{self.duration / 3600:.1f} h)'
+        )
+
+
+class DelayPlanner:
+    """
+    Plans a whole run up front instead of letting every profile start at once and sleep random delays. Profiles
+    start one every `interval` seconds and space their tasks `spacing` seconds apart (both jittered by `jitter`),
+    chosen so the fleet's combined request rate to each upstream stays at `headroom` of its limit. Limits come from
+    `rates` or, for hosts, from their pacing policy (see `set_pacing`).
+    """
+
+    def __init__(
+            self,
+            rates: dict[str, float] = None,
+            headroom: float = 0.8,
+            jitter: float = 0.25,
+            min_spacing: float = 30
+    ):
+        self.rates = rates or {}
+        self.headroom = headroom
+        self.jitter = jitter
+        self.min_spacing = min_spacing
+
+    def rate_of(self, upstream: str) -> Optional[float]:
+        return self.rates.get(upstream) or pacing.get(upstream).rate
+
+    def plan(
+            self,
+            profiles: Sequence['Profile'],
+            tasks: int,
+            requests: dict[str, float],
+            concurrency: int = 50
+    ) -> Schedule:
+        """
+        `tasks` is the number of tasks a profile runs and `requests` the requests a task makes to each upstream on
+        average. Profiles start in the given order.
+        """
+        concurrency = max(min(concurrency, len(profiles)), 1)
+        # In the steady state profiles arrive every `interval` seconds and each makes `tasks * requests` requests,
+        # so an upstream sees `tasks * requests / interval` requests per second however they're spaced out
+        intervals = [tasks * self.min_spacing / concurrency]
+        for upstream, count in requests.items():
+            rate = self.rate_of(upstream)
+            if rate is None:
+                logger.warning(f'No rate limit known for {upstream}, it\'s not taken into account')
+                continue
+            intervals.append(tasks * count / (rate * self.headroom))
+        interval = max(intervals)
+        # Spread each profile's tasks so that `concurrency` profiles are in flight at any time
+        spacing = max(concurrency * interval / tasks, self.min_spacing) if tasks else 0
+        starts = {}
+        for i, profile in enumerate(profiles):
+            offset = interval * (i + random.uniform(-self.jitter, self.jitter) / 2)
+            starts[getattr(profile, 'id', i)] = max(offset, 0.0)
+        schedule = Schedule(
+            starts, interval, spacing, self.jitter, interval * max(len(profiles) - 1, 0) + tasks * spacing
+        )
+        logger.info(f'Planned {schedule}')
+        return schedule
+
+
+async def pause(a: float, b: float = None, profile_id: int = None, echo: bool = True) -> None:
+    """Sleeps the planned spacing between tasks when run under a `Schedule` (see `Fleet.run`), `a`-`b` otherwise"""
+    schedule = _current_schedule.get()
+    if schedule is None:
+        await sleep(a, b, profile_id=profile_id, echo=echo)
+    else:
+        await sleep(schedule.gap(), profile_id=profile_id, echo=echo)
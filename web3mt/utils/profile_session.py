@@ -1,14 +1,19 @@
-import random
+import time
 from functools import partialmethod
-from json import JSONDecodeError
 from typing import Callable, Any
 
 import curl_cffi.requests
-from curl_cffi.requests import AsyncSession, RequestsError
+from curl_cffi.requests import AsyncSession, RequestsError, Response
 from better_proxy import Proxy
 from web3db.models import Profile
 
+from .budget import BACKOFF, HTTP, PACING, budget
+from .decoding import decode
+from .http_cache import HTTPCache, PROFILE
 from .logger import logger
+from .pacing import Pacing, pacing
+from .proxies import proxy_manager
+from .retry import DEFAULT_RETRY_POLICY, ErrorKind, RetryPolicy, breakers
 from .sleeping import sleep
 from .windows import set_windows_event_loop_policy
 
@@ -31,15 +36,32 @@ class ProfileSession(AsyncSession):
         "connection": "keep-alive",
     }
 
-    def __init__(self, profile: Profile, sleep_echo: bool = True, requests_echo: bool = True, **kwargs) -> None:
+    def __init__(
+            self,
+            profile: Profile,
+            sleep_echo: bool = True,
+            requests_echo: bool = True,
+            pacing: Pacing = None,
+            retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+            http_cache: HTTPCache = None,
+            cache_scope: str = PROFILE,
+            decoder: Callable[[Response], Any] = decode,
+            **kwargs
+    ) -> None:
         self.profile = profile
+        self.pacing = pacing
+        self.retry_policy = retry_policy
+        self.http_cache = http_cache
+        self.cache_scope = cache_scope
+        self.decoder = decoder
         self.sleep_echo = sleep_echo
         self.request_echo = requests_echo
         headers = {**self.DEFAULT_HEADERS, **kwargs.pop('headers', {})}
         impersonate = kwargs.pop('impersonate', curl_cffi.requests.BrowserType.chrome120)
         self.log_info = f'{self.profile.id}'
+        self.proxy_string = proxy_manager.proxy_for(profile)
         super().__init__(
-            proxy=Proxy.from_str(proxy=profile.proxy.proxy_string).as_url,
+            proxy=Proxy.from_str(proxy=self.proxy_string).as_url if self.proxy_string else None,
             headers=headers,
             impersonate=impersonate,
             **kwargs
@@ -54,36 +76,58 @@ class ProfileSession(AsyncSession):
     def retry(func: Callable) -> Callable:
         async def wrapper(self, *args, **kwargs) -> Any:
             method = kwargs.get('method', None) or args[0]
-            url = kwargs.get('url', 'unknown url')
-            retry_delay = kwargs.pop('retry_delay', random.uniform(5, 10))
-            retry_count = kwargs.pop('retry_count', RETRY_COUNT)
+            url = kwargs.get('url') or (args[1] if len(args) > 1 else 'unknown url')
+            retry_delay = kwargs.pop('retry_delay', None)
+            retry_count = kwargs.pop('retry_count', self.retry_policy.attempts)
             if self.request_echo:
                 logger.info(f'{self.profile.id} | {method} {url}')
-            data = None
+            policy = self.pacing or pacing.get(url)
+            breaker = breakers.get(url)
             for i in range(retry_count):
+                data = None
+                with budget.measure(BACKOFF, self.profile.id):
+                    await breaker.wait()
+                with budget.measure(PACING, self.profile.id):
+                    delay = await policy.wait()
+                if delay and self.sleep_echo:
+                    logger.info(f'{self.profile.id} | 💤 Paced {url} for {delay:.2f} s.')
                 try:
-                    response, data = await func(self, *args, **kwargs)
-                    if not kwargs.get('follow_redirects'):
-                        response.raise_for_status()
-                    await sleep(random.uniform(5, 10), profile_id=self.profile.id, echo=self.sleep_echo)
+                    start = time.perf_counter()
+                    with budget.measure(HTTP, self.profile.id):
+                        async with proxy_manager.slot(self.proxy_string):
+                            response, data = await func(self, *args, **kwargs)
+                    proxy_manager.record(self.proxy_string, True, time.perf_counter() - start)
+                    if not kwargs.get('follow_redirects') and not response.ok:
+                        raise RequestsError(f'HTTP Error {response.status_code}: {response.reason}', 0, response)
+                    breaker.success()
                     return response, data
                 except RequestsError as e:
                     s = f'{self.profile.id} | {url} {e} {data if data is not None else ""}'
-                    if e.code in (28, 35, 52, 56):
-                        logger.warning(f'{s} Retrying {i + 1} after {retry_delay} seconds')
-                        await sleep(retry_delay, profile_id=self.profile.id, echo=self.sleep_echo)
-                        continue
-                    elif response.status_code in [400, 401, 403, 404, 500]:
+                    kind = self.retry_policy.classify(e)
+                    if e.response is None:
+                        proxy_manager.record(self.proxy_string, False)
+                    if kind == ErrorKind.FATAL:
+                        if e.response is not None:
+                            breaker.success()
+                        else:
+                            breaker.failure()
                         logger.warning(s)
                         raise e
+                    retry_after = self.retry_policy.retry_after(e)
+                    if kind == ErrorKind.RATE_LIMITED and retry_after:
+                        breaker.throttle(retry_after)
                     else:
-                        logger.warning(f'{s} Retrying {i + 1} after {retry_delay} seconds')
-                        await sleep(retry_delay, profile_id=self.profile.id, echo=self.sleep_echo)
-                        continue
-            else:
-                if self.request_echo:
-                    logger.info(f'{self.profile.id} | Tried to retry {RETRY_COUNT} times. Nothing can do anymore :(')
-                return None
+                        breaker.failure()
+                    if i + 1 == retry_count:
+                        logger.warning(f'{s} Gave up after {retry_count} attempts')
+                        raise e
+                    delay = retry_delay if retry_delay is not None else self.retry_policy.delay(i, e)
+                    logger.warning(f'{s} Retrying {i + 1} after {delay:.1f} seconds')
+                    with budget.measure(BACKOFF, self.profile.id):
+                        await sleep(delay, profile_id=self.profile.id, echo=self.sleep_echo)
+                except BaseException:
+                    breaker.abandon()
+                    raise
 
         return wrapper
 
@@ -99,8 +143,15 @@ class ProfileSession(AsyncSession):
             follow_redirects: bool = False,
             verify: bool = False,
             retry_count: int = RETRY_COUNT,
-            timeout: int = 30
+            timeout: int = 30,
+            cache: str | bool = None,
+            decode: bool = True
     ):
+        cache_key = entry = None
+        if self.http_cache and method == 'GET' and cache is not False:
+            cache_key = self.http_cache.key(url, params, cache or self.cache_scope, self.profile.id)
+            entry = self.http_cache.get(cache_key)
+            headers = {**(headers or {}), **self.http_cache.validators(entry)}
         response = await super().request(
             method=method,
             url=url,
@@ -112,10 +163,14 @@ class ProfileSession(AsyncSession):
             verify=verify,
             timeout=timeout
         )
-        try:
-            data = response.json()
-        except JSONDecodeError:
-            data = response.text
+        if entry is not None and response.status_code == 304:
+            self.http_cache.hits += 1
+            return entry.response, entry.data
+        data = self.decoder(response) if decode or cache_key is not None else None
+        if cache_key is not None:
+            self.http_cache.misses += 1
+            if response.status_code == 200:
+                self.http_cache.store(cache_key, response, data)
         return response, data
 
     head = partialmethod(request, "HEAD")
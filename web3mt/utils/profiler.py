@@ -0,0 +1,146 @@
+import asyncio
+import json
+import os
+import re
+import signal
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from types import FrameType
+from typing import Optional
+
+from .logger import logger
+
+IDLE = '<idle>'
+# Frames up to here are the event loop's own machinery, the same for every sample
+_LOOP_RUN = 'asyncio.events:Handle._run'
+_TASK_ID = re.compile(r'\d+')
+
+
+def _frame_name(frame: FrameType) -> str:
+    return f'{frame.f_globals.get("__name__", "?")}:{frame.f_code.co_qualname}'
+
+
+class SamplingProfiler:
+    """
+    Samples the event loop's stack every `interval` seconds of process CPU time (`SIGPROF`, so only when the loop runs
+    in the main thread on POSIX; CPU burnt by other threads lands on whatever the loop is doing). Elsewhere a thread
+    samples wall time, which is biased towards the points where the loop releases the GIL and counts samples taken
+    while it waits for I/O as idle. Stacks are rooted at the running
+    task's name with ids folded (`task:profile:N`), so coroutines of the same kind merge in the flamegraph. `write`
+    saves folded stacks (flamegraph.pl, speedscope, ...) and a JSON summary attributing CPU time to `package`
+    functions, both inclusive and self.
+    """
+
+    def __init__(self, interval: float = 0.005, package: str = 'web3mt'):
+        self.interval = interval
+        self.package = package
+        self.stacks: Counter[tuple[str, ...]] = Counter()
+        self.inclusive: Counter[str] = Counter()
+        self.self_samples: Counter[str] = Counter()
+        self.samples = 0
+        self.idle = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._previous_handler = None
+
+    def _sample(self, frame: Optional[FrameType]) -> None:
+        if frame is None:
+            return
+        self.samples += 1
+        names = []
+        while frame is not None:
+            names.append(_frame_name(frame))
+            frame = frame.f_back
+        names.reverse()
+        if names[-1].startswith('selectors:') or names[-1].endswith('.select'):
+            self.idle += 1
+            self.stacks[(IDLE,)] += 1
+            return
+        if _LOOP_RUN in names:
+            names = names[names.index(_LOOP_RUN) + 1:]
+        task = asyncio.current_task(self._loop)
+        root = f'task:{_TASK_ID.sub("N", task.get_name())}' if task else 'callback'
+        self.stacks[(root, *names)] += 1
+        own = [name for name in names if name.startswith(self.package)]
+        for name in set(own):
+            self.inclusive[name] += 1
+        if own:
+            self.self_samples[own[-1]] += 1
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self._sample(sys._current_frames().get(self._loop_thread))
+
+    def _on_signal(self, signum: int, frame: Optional[FrameType]) -> None:
+        self._sample(frame)
+
+    def start(self) -> 'SamplingProfiler':
+        """Must be called from the loop to profile"""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        if hasattr(signal, 'setitimer') and threading.current_thread() is threading.main_thread():
+            self._previous_handler = signal.signal(signal.SIGPROF, self._on_signal)
+            signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+            return self
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name='web3mt-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._previous_handler is not None:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            signal.signal(signal.SIGPROF, self._previous_handler)
+            self._previous_handler = None
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    async def __aenter__(self) -> 'SamplingProfiler':
+        return self.start()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    def top(self, limit: int = 20) -> list[dict]:
+        """`package` functions by inclusive CPU time"""
+        return [
+            {
+                'function': name,
+                'cpu_s': count * self.interval,
+                'self_s': self.self_samples[name] * self.interval,
+                'share': count / max(self.samples - self.idle, 1),
+            } for name, count in self.inclusive.most_common(limit)
+        ]
+
+    def write(self, path: str | Path) -> Path:
+        """Writes `<path>.folded` and `<path>.json`, returns the folded stacks file"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        folded = path.with_suffix('.folded')
+        folded.write_text(''.join(f'{";".join(stack)} {count}\n' for stack, count in self.stacks.most_common()))
+        path.with_suffix('.json').write_text(json.dumps({
+            'interval': self.interval,
+            'samples': self.samples,
+            'idle_samples': self.idle,
+            'cpu_s': (self.samples - self.idle) * self.interval,
+            'functions': self.top(limit=None),
+        }, indent=2))
+        return folded
+
+
+def profile_path(directory: str | Path, name: str = 'fleet') -> Path:
+    """A per-run file name, unique across the processes of a sharded run"""
+    return Path(directory) / f'{name}-{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}'
+
+
+def log_top(profiler: SamplingProfiler, limit: int = 10) -> None:
+    lines = [f'{row["cpu_s"]:>9.2f}s {row["share"]:>6.1%} {row["function"]}' for row in profiler.top(limit)]
+    busy = (profiler.samples - profiler.idle) * profiler.interval
+    logger.info(f'CPU {busy:.1f} s sampled, top {profiler.package} functions:\n' + '\n'.join(lines))
@@ -0,0 +1,216 @@
+import asyncio
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Iterable, Optional
+
+from better_proxy import Proxy
+from curl_cffi.requests import AsyncSession
+from web3db.models import Profile
+
+from .clock import get_clock, monotonic
+from .logger import logger
+
+
+def proxy_string_of(profile: Profile) -> Optional[str]:
+    proxy = getattr(profile, 'proxy', None)
+    return getattr(proxy, 'proxy_string', None) if proxy else None
+
+
+class ProxyStats:
+    __slots__ = ('proxy', 'latency', 'successes', 'failures', 'consecutive_failures', 'quarantined_until', 'checked_at')
+
+    def __init__(self, proxy: str):
+        self.proxy = proxy
+        self.latency: Optional[float] = None
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.quarantined_until = 0.0
+        self.checked_at = 0.0
+
+    @property
+    def error_rate(self) -> float:
+        total = self.successes + self.failures
+        return self.failures / total if total else 0.0
+
+    @property
+    def quarantined(self) -> bool:
+        return self.quarantined_until > monotonic()
+
+    @property
+    def score(self) -> float:
+        """Lower is better: latency penalized by error rate, unknown latency ranks after measured ones"""
+        return (self.latency if self.latency is not None else 60.0) * (1 + 10 * self.error_rate)
+
+
+class ProxyManager:
+    """
+    Health and latency of the proxies profiles use. Proxies are checked with `check_all` (at startup) and `start`
+    (in the background), and sessions report their outcomes through `record`. After `quarantine_after` consecutive
+    failures a proxy is quarantined for `quarantine_time` seconds: `proxy_for` then hands the profile the best
+    healthy spare from the pool and keeps it (sticky) until its own proxy recovers. `slot` caps concurrent requests
+    per proxy at `max_per_proxy`.
+    """
+
+    def __init__(
+            self,
+            check_url: str = 'https://api.ipify.org?format=json',
+            timeout: float = 10,
+            max_per_proxy: int = None,
+            quarantine_after: int = 3,
+            quarantine_time: float = 600,
+            latency_smoothing: float = 0.3
+    ):
+        self.check_url = check_url
+        self.timeout = timeout
+        self.max_per_proxy = max_per_proxy
+        self.quarantine_after = quarantine_after
+        self.quarantine_time = quarantine_time
+        self.latency_smoothing = latency_smoothing
+        self.stats: dict[str, ProxyStats] = {}
+        self.spares: list[str] = []
+        self.users: dict[str, set[int]] = defaultdict(set)
+        self.replacements: dict[int, str] = {}
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def _stats(self, proxy: str) -> ProxyStats:
+        stats = self.stats.get(proxy)
+        if stats is None:
+            stats = self.stats[proxy] = ProxyStats(proxy)
+        return stats
+
+    def add(self, profiles: Iterable[Profile] = (), spares: Iterable[str] = ()) -> None:
+        for profile in profiles:
+            proxy = proxy_string_of(profile)
+            if proxy:
+                self._stats(proxy)
+                self.users[proxy].add(profile.id)
+        for proxy in spares:
+            self._stats(proxy)
+            if proxy not in self.spares:
+                self.spares.append(proxy)
+
+    def record(self, proxy: str, ok: bool, latency: float = None) -> None:
+        if not proxy:
+            return
+        stats = self._stats(proxy)
+        if ok:
+            stats.successes += 1
+            stats.consecutive_failures = 0
+            stats.quarantined_until = 0.0
+            if latency is not None:
+                stats.latency = latency if stats.latency is None else (
+                        self.latency_smoothing * latency + (1 - self.latency_smoothing) * stats.latency
+                )
+            return
+        stats.failures += 1
+        stats.consecutive_failures += 1
+        if stats.consecutive_failures >= self.quarantine_after and not stats.quarantined:
+            self.quarantine(proxy, f'{stats.consecutive_failures} failures')
+
+    def quarantine(self, proxy: str, reason: str) -> None:
+        self._stats(proxy).quarantined_until = monotonic() + self.quarantine_time
+        logger.warning(
+            f'Proxy {Proxy.from_str(proxy).host} quarantined ({reason}), '
+            f'affects profiles: {sorted(self.users.get(proxy, ())) or "-"}'
+        )
+
+    def healthy(self, proxy: str) -> bool:
+        stats = self.stats.get(proxy)
+        return stats is None or not stats.quarantined
+
+    def best(self, exclude: Iterable[str] = ()) -> Optional[str]:
+        exclude = set(exclude)
+        candidates = [
+            self.stats[proxy] for proxy in self.spares if proxy not in exclude and not self.stats[proxy].quarantined
+        ]
+        return min(candidates, key=lambda stats: stats.score).proxy if candidates else None
+
+    def proxy_for(self, profile: Profile) -> Optional[str]:
+        """The profile's own proxy while it's healthy, otherwise its sticky replacement from the spares"""
+        own = proxy_string_of(profile)
+        if own is None or self.healthy(own):
+            self.replacements.pop(profile.id, None)
+            return own
+        replacement = self.replacements.get(profile.id)
+        if replacement is None or not self.healthy(replacement):
+            replacement = self.best(exclude=[own])
+            if replacement is None:
+                return own
+            self.replacements[profile.id] = replacement
+            logger.info(
+                f'{profile.id} | Proxy {Proxy.from_str(own).host} is down, using {Proxy.from_str(replacement).host}'
+            )
+        return replacement
+
+    @asynccontextmanager
+    async def slot(self, proxy: Optional[str]) -> AsyncIterator[None]:
+        if not proxy or not self.max_per_proxy:
+            yield
+            return
+        semaphore = self._semaphores.get(proxy)
+        if semaphore is None:
+            semaphore = self._semaphores[proxy] = asyncio.Semaphore(self.max_per_proxy)
+        async with semaphore:
+            yield
+
+    async def check(self, proxy: str) -> bool:
+        stats = self._stats(proxy)
+        start = time.perf_counter()
+        try:
+            async with AsyncSession(proxy=Proxy.from_str(proxy).as_url, timeout=self.timeout) as session:
+                response = await session.get(self.check_url)
+            ok = response.ok
+        except Exception:
+            ok = False
+        stats.checked_at = monotonic()
+        self.record(proxy, ok, time.perf_counter() - start if ok else None)
+        if not ok and not stats.quarantined:
+            self.quarantine(proxy, 'health check failed')
+        return ok
+
+    async def check_all(self, profiles: Iterable[Profile] = (), concurrency: int = 50) -> dict[str, list[int]]:
+        """Checks every known proxy and returns the dead ones with the profiles that use them"""
+        self.add(profiles)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def check(proxy: str) -> bool:
+            async with semaphore:
+                return await self.check(proxy)
+
+        proxies = list(self.stats)
+        results = await asyncio.gather(*[check(proxy) for proxy in proxies])
+        dead = {proxy: sorted(self.users.get(proxy, ())) for proxy, ok in zip(proxies, results) if not ok}
+        logger.info(f'{len(proxies) - len(dead)}/{len(proxies)} proxies alive')
+        return dead
+
+    def report(self) -> list[dict]:
+        return [
+            {
+                'proxy': Proxy.from_str(stats.proxy).host,
+                'latency': stats.latency,
+                'error_rate': stats.error_rate,
+                'quarantined': stats.quarantined,
+                'profiles': sorted(self.users.get(stats.proxy, ())),
+            } for stats in sorted(self.stats.values(), key=lambda stats: stats.score)
+        ]
+
+    def start(self, interval: float = 300) -> asyncio.Task:
+        async def loop():
+            while True:
+                await get_clock().sleep(interval)
+                await self.check_all()
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(loop(), name='proxy-health-check')
+        return self._task
+
+    def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+
+proxy_manager = ProxyManager()
@@ -0,0 +1,169 @@
+import random
+import time
+from email.utils import parsedate_to_datetime
+from enum import Enum
+from typing import Optional
+from urllib.parse import urlsplit
+
+from curl_cffi.requests import RequestsError
+
+from .clock import get_clock, monotonic
+from .logger import logger
+
+RETRY_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504, 520, 521, 522, 524})
+RETRY_CURL_CODES = frozenset({5, 6, 7, 16, 18, 28, 35, 52, 55, 56, 92})
+
+
+class ErrorKind(str, Enum):
+    TRANSIENT = 'transient'
+    RATE_LIMITED = 'rate_limited'
+    FATAL = 'fatal'
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a `Retry-After` header given either as delta-seconds or as an HTTP date"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class RetryPolicy:
+    """Exponential backoff with jitter, capped by `max_delay`; `Retry-After` of the response wins if present"""
+
+    def __init__(
+            self,
+            attempts: int = 5,
+            base_delay: float = 1,
+            factor: float = 2,
+            max_delay: float = 300,
+            retry_statuses: frozenset[int] = RETRY_STATUSES,
+            retry_curl_codes: frozenset[int] = RETRY_CURL_CODES
+    ):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.factor = factor
+        self.max_delay = max_delay
+        self.retry_statuses = retry_statuses
+        self.retry_curl_codes = retry_curl_codes
+
+    def classify(self, error: RequestsError) -> ErrorKind:
+        response = getattr(error, 'response', None)
+        if response is not None and response.status_code:
+            if response.status_code == 429:
+                return ErrorKind.RATE_LIMITED
+            return ErrorKind.TRANSIENT if response.status_code in self.retry_statuses else ErrorKind.FATAL
+        return ErrorKind.TRANSIENT if error.code in self.retry_curl_codes else ErrorKind.FATAL
+
+    def backoff(self, attempt: int) -> float:
+        cap = min(self.max_delay, self.base_delay * self.factor ** attempt)
+        return cap / 2 + random.uniform(0, cap / 2)
+
+    @staticmethod
+    def retry_after(error: RequestsError) -> Optional[float]:
+        response = getattr(error, 'response', None)
+        return parse_retry_after(response.headers.get('Retry-After')) if response is not None else None
+
+    def delay(self, attempt: int, error: RequestsError) -> float:
+        retry_after = self.retry_after(error)
+        return self.backoff(attempt) if retry_after is None else min(retry_after, self.max_delay)
+
+
+class CircuitState(str, Enum):
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive upstream failures and holds every request to the host until
+    `reset_timeout` passes. Then a single probe goes through: success closes the circuit, failure reopens it with
+    the timeout doubled up to `max_reset_timeout`.
+    """
+
+    def __init__(
+            self, host: str, failure_threshold: int = 5, reset_timeout: float = 30, max_reset_timeout: float = 600
+    ):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.base_reset_timeout = reset_timeout
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.opened_until = 0.0
+        self._probing = False
+
+    async def wait(self) -> None:
+        while True:
+            if self.state == CircuitState.CLOSED:
+                return
+            now = monotonic()
+            if self.state == CircuitState.OPEN and now >= self.opened_until:
+                self.state = CircuitState.HALF_OPEN
+            if self.state == CircuitState.HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            await get_clock().sleep(max(self.opened_until - now, 0.5))
+
+    def open(self, delay: float = None) -> None:
+        delay = self.reset_timeout if delay is None else max(delay, self.reset_timeout)
+        if self.state != CircuitState.OPEN:
+            logger.warning(f'{self.host} | Circuit opened for {delay:.0f} s after {self.failures} failures')
+        self.state = CircuitState.OPEN
+        self.opened_until = max(self.opened_until, monotonic() + delay)
+        self._probing = False
+
+    def throttle(self, delay: float) -> None:
+        """The upstream asked to hold off for `delay` seconds (429 with `Retry-After`), so everyone does"""
+        self.failures += 1
+        self.state = CircuitState.OPEN
+        self.opened_until = max(self.opened_until, monotonic() + delay)
+        self._probing = False
+
+    def abandon(self) -> None:
+        """Lets another request probe if ours ended without an answer from the upstream"""
+        self._probing = False
+
+    def success(self) -> None:
+        if self.state != CircuitState.CLOSED:
+            logger.info(f'{self.host} | Circuit closed')
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.reset_timeout = self.base_reset_timeout
+        self._probing = False
+
+    def failure(self, retry_after: float = None) -> None:
+        self.failures += 1
+        if self.state == CircuitState.HALF_OPEN:
+            self.reset_timeout = min(self.reset_timeout * 2, self.max_reset_timeout)
+            self.open(retry_after)
+        elif self.failures >= self.failure_threshold:
+            self.open(retry_after)
+
+
+class CircuitBreakers:
+    """One `CircuitBreaker` per host, shared by every session"""
+
+    def __init__(self, **breaker_kwargs):
+        self.breaker_kwargs = breaker_kwargs
+        self.breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, url: str) -> CircuitBreaker:
+        host = (urlsplit(url).hostname or url).lower()
+        breaker = self.breakers.get(host)
+        if breaker is None:
+            breaker = self.breakers[host] = CircuitBreaker(host, **self.breaker_kwargs)
+        return breaker
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+breakers = CircuitBreakers()
@@ -0,0 +1,77 @@
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any, AsyncIterator, Hashable
+
+from .logger import logger
+
+if TYPE_CHECKING:
+    from web3db.models import Profile
+
+    from .profile_session import ProfileSession
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return tuple(sorted((str(key).lower(), _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(item) for item in value)
+    return value if isinstance(value, Hashable) else repr(value)
+
+
+class SessionRegistry:
+    """
+    Long-lived `ProfileSession`s keyed by profile and session arguments (headers set, echo flags, ...), so repeated
+    calls to the same origin reuse one keep-alive connection through the proxy instead of a new handshake each time.
+    Borrowers are reference counted; sessions stay open between borrows until `close_profile` or `close_all`,
+    which `Fleet` calls when a profile's job ends.
+    """
+
+    def __init__(self):
+        self.sessions: dict[tuple, 'ProfileSession'] = {}
+        self.refs: dict[tuple, int] = {}
+
+    @staticmethod
+    def key(profile: 'Profile', **kwargs) -> tuple:
+        return getattr(profile, 'id', id(profile)), _freeze(kwargs)
+
+    def acquire(self, profile: 'Profile', **kwargs) -> 'ProfileSession':
+        key = self.key(profile, **kwargs)
+        session = self.sessions.get(key)
+        if session is None:
+            from .profile_session import ProfileSession
+            session = self.sessions[key] = ProfileSession(profile, **kwargs)
+        self.refs[key] = self.refs.get(key, 0) + 1
+        return session
+
+    def release(self, profile: 'Profile', **kwargs) -> None:
+        key = self.key(profile, **kwargs)
+        if key in self.refs:
+            self.refs[key] = max(self.refs[key] - 1, 0)
+
+    @asynccontextmanager
+    async def session(self, profile: 'Profile', **kwargs) -> AsyncIterator['ProfileSession']:
+        session = self.acquire(profile, **kwargs)
+        try:
+            yield session
+        finally:
+            self.release(profile, **kwargs)
+
+    async def _close(self, key: tuple) -> None:
+        session = self.sessions.pop(key)
+        refs = self.refs.pop(key, 0)
+        if refs:
+            logger.warning(f'{key[0]} | Closing a session still used by {refs} borrowers')
+        await session.close()
+
+    async def close_profile(self, profile_id: int) -> None:
+        for key in [key for key in self.sessions if key[0] == profile_id]:
+            await self._close(key)
+
+    async def close_all(self) -> None:
+        for key in list(self.sessions):
+            await self._close(key)
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+
+sessions = SessionRegistry()
@@ -0,0 +1,198 @@
+import asyncio
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from multiprocessing import get_context
+from multiprocessing.managers import BaseManager
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Optional
+
+from web3db.models import Profile
+
+from .fleet import Fleet, proxy_of
+from .logger import logger
+from .pacing import Pacing, pacing
+from .windows import set_windows_event_loop_policy
+
+_FLEET_KEYS = ('concurrency', 'per_chain', 'per_endpoint', 'per_proxy', 'window', 'profile')
+
+
+class Coordinator:
+    """
+    Token buckets and resource ownership shared by the worker processes of a sharded run. Lives in the manager
+    process when sharded, in-process otherwise, so `shared_rate` and `own` work the same in both cases.
+    """
+
+    def __init__(self):
+        self.buckets: dict[str, list[float]] = {}
+        self.owners: dict[str, str] = {}
+
+    def acquire(self, key: str, rate: float, burst: int = 1) -> float:
+        """Reserves a token of the `rate` per second bucket `key` and returns how long to wait before using it"""
+        now = time.monotonic()
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = [float(burst), now]
+        tokens = min(burst, bucket[0] + (now - bucket[1]) * rate) - 1
+        bucket[0], bucket[1] = tokens, now
+        return -tokens / rate if tokens < 0 else 0.0
+
+    def claim(self, resource: str, owner: str) -> bool:
+        current = self.owners.setdefault(resource, owner)
+        return current == owner
+
+    def release(self, resource: str, owner: str) -> None:
+        if self.owners.get(resource) == owner:
+            del self.owners[resource]
+
+    def owned(self) -> dict[str, str]:
+        return dict(self.owners)
+
+
+class CoordinatorManager(BaseManager):
+    pass
+
+
+CoordinatorManager.register('Coordinator', Coordinator)
+
+_coordinator: Coordinator = Coordinator()
+
+
+def coordinator() -> Coordinator:
+    return _coordinator
+
+
+async def _call(method: Callable, *args) -> Any:
+    """In a worker the coordinator is a manager proxy, whose calls block on IPC, so they're made off the loop"""
+    if isinstance(_coordinator, Coordinator):
+        return method(*args)
+    return await asyncio.get_running_loop().run_in_executor(None, method, *args)
+
+
+async def shared_rate(key: str, rate: float, burst: int = 1) -> None:
+    """Waits for a token of the `key` budget, shared by all processes of a sharded run"""
+    delay = await _call(_coordinator.acquire, key, rate, burst)
+    if delay:
+        await asyncio.sleep(delay)
+
+
+@asynccontextmanager
+async def own(resource: str, owner: str = None, poll: float = 0.5) -> AsyncIterator[None]:
+    """
+    Holds `resource` (e.g. an address whose nonce we're about to use) exclusively across processes,
+    waiting while another owner has it.
+    """
+    owner = owner or f'{os.getpid()}:{id(asyncio.current_task())}'
+    while not await _call(_coordinator.claim, resource, owner):
+        await asyncio.sleep(poll)
+    try:
+        yield
+    finally:
+        await _call(_coordinator.release, resource, owner)
+
+
+def address_of(profile: Profile) -> Optional[str]:
+    return getattr(profile, 'evm_address', None)
+
+
+def _init_worker(proxy: Coordinator, policies: dict[str, Pacing]) -> None:
+    global _coordinator
+    _coordinator = proxy
+    # Per-host pacing set up by the parent applies to the whole run, not to each worker
+    for host, policy in policies.items():
+        pacing.set(host, policy)
+    pacing.share(proxy.acquire)
+    set_windows_event_loop_policy()
+
+
+async def _run_owned(profile: Profile, func: Callable[[Profile], Awaitable], owner_key: Callable) -> Any:
+    resource = owner_key(profile)
+    if not resource:
+        return await func(profile)
+    async with own(str(resource).lower(), f'{os.getpid()}:{getattr(profile, "id", id(profile))}'):
+        return await func(profile)
+
+
+def _run_shard(
+        shard: int,
+        profiles: list[Profile],
+        func: Callable[[Profile], Awaitable],
+        owner_key: Callable,
+        fleet_kwargs: dict,
+        run_kwargs: dict
+) -> tuple[list, float]:
+    start = time.perf_counter()
+    fleet = Fleet(**fleet_kwargs)
+    results = asyncio.run(fleet.run(profiles, lambda profile: _run_owned(profile, func, owner_key), **run_kwargs))
+    elapsed = time.perf_counter() - start
+    errors = sum(isinstance(result, BaseException) for result in results)
+    logger.info(f'Shard {shard} | {len(profiles)} profiles | {errors} errors | {elapsed:.1f} s')
+    return [_picklable(result) for result in results], elapsed
+
+
+def _picklable(result: Any) -> Any:
+    if isinstance(result, BaseException):
+        try:
+            pickle.dumps(result)
+        except Exception:
+            return RuntimeError(f'{type(result).__name__}: {result}')
+    return result
+
+
+def _split(profiles: list[Profile], processes: int, shard_key: Callable) -> list[list[int]]:
+    """Keeps profiles with the same shard key (proxy by default) in one process and balances shard sizes"""
+    groups: dict[Any, list[int]] = {}
+    for index, profile in enumerate(profiles):
+        groups.setdefault(shard_key(profile) or index, []).append(index)
+    shards: list[list[int]] = [[] for _ in range(processes)]
+    for group in sorted(groups.values(), key=len, reverse=True):
+        min(shards, key=len).extend(group)
+    return [sorted(shard) for shard in shards if shard]
+
+
+async def run_sharded(
+        profiles: Iterable[Profile],
+        func: Callable[[Profile], Awaitable],
+        processes: int = None,
+        shard_key: Callable[[Profile], Any] = proxy_of,
+        owner_key: Callable[[Profile], Optional[str]] = address_of,
+        **kwargs
+) -> list:
+    """
+    Splits `profiles` across `processes` worker processes, each running its own event loop with a `Fleet` built
+    from `kwargs` (`concurrency`, `per_proxy`, ... apply per process; `chain`, `endpoint`, `priority` go to
+    `Fleet.run`), and merges results back in input order. Profiles, results and callables must be picklable,
+    so `func` and selectors have to be module-level functions.
+    Within a run an address is only worked on by one profile at a time (`owner_key`), and workers share rate
+    budgets: per-host pacing (`set_pacing` in the parent) is one token bucket for all of them, and `shared_rate`
+    takes from a named one.
+    """
+    fleet_kwargs = {key: kwargs.pop(key) for key in _FLEET_KEYS if key in kwargs}
+    profiles = list(profiles)
+    processes = min(processes or os.cpu_count() or 1, len(profiles)) or 1
+    shards = _split(profiles, processes, shard_key)
+    if not shards:
+        return []
+    context = get_context('spawn')
+    with CoordinatorManager(ctx=context) as manager:
+        proxy = manager.Coordinator()
+        with ProcessPoolExecutor(len(shards), context, _init_worker, (proxy, dict(pacing.policies))) as executor:
+            loop = asyncio.get_running_loop()
+            futures = [
+                loop.run_in_executor(
+                    executor, _run_shard, i, [profiles[index] for index in shard], func, owner_key, fleet_kwargs,
+                    kwargs
+                ) for i, shard in enumerate(shards)
+            ]
+            outputs = await asyncio.gather(*futures)
+    results: list = [None] * len(profiles)
+    for shard, (shard_results, _) in zip(shards, outputs):
+        for index, result in zip(shard, shard_results):
+            results[index] = result
+    errors = sum(isinstance(result, BaseException) for result in results)
+    logger.success(
+        f'{len(profiles)} profiles in {len(shards)} processes | {errors} errors | '
+        f'slowest shard {max(elapsed for _, elapsed in outputs):.1f} s'
+    )
+    return results
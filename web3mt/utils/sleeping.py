@@ -1,6 +1,7 @@
-import asyncio
 import random
 
+from .budget import SLEEP, budget
+from .clock import get_clock
 from .logger import logger
 
 
@@ -9,4 +10,5 @@ async def sleep(a: float, b: float = None, profile_id: int = None, echo: bool =
 
     if echo:
         logger.info(f"{f'{profile_id} | ' if profile_id else ''}💤 Sleeping for {delay} s.")
-    await asyncio.sleep(delay)
+    with budget.measure(SLEEP, profile_id):
+        await get_clock().sleep(delay)
@@ -0,0 +1,147 @@
+import base64
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, NamedTuple, Optional
+
+from Crypto.Cipher import AES
+from Crypto.Protocol.KDF import scrypt
+from curl_cffi.requests import RequestsError
+
+from .logger import logger
+
+REJECTED_STATUSES = (401, 403)
+
+
+def jwt_expiry(token: str) -> Optional[float]:
+    """`exp` claim of a JWT without verifying it, None if the token isn't a JWT or has no expiry"""
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload)).get('exp')
+        return float(exp) if exp else None
+    except (IndexError, ValueError, AttributeError, TypeError):
+        return None
+
+
+class StoredToken(NamedTuple):
+    token: str
+    cookies: dict[str, str]
+    expires_at: Optional[float]
+
+
+# A sign-in flow returns the token alone, `(token, cookies)` or a `StoredToken` with its own expiry
+Login = Callable[[], Awaitable[str | tuple[str, dict[str, str]] | StoredToken]]
+
+
+class TokenStore:
+    """
+    Auth tokens and cookies per (profile, service), encrypted with a key derived from `password`, so sign-in flows
+    run once and are reused across runs until the token expires or the service rejects it.
+    """
+
+    def __init__(self, password: str, path: str | Path = 'tokens.db', leeway: float = 60):
+        self.leeway = leeway
+        self._db = sqlite3.connect(path)
+        with self._db:
+            self._db.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value BLOB NOT NULL)')
+            self._db.execute(
+                '''CREATE TABLE IF NOT EXISTS tokens (
+                    profile_id INT NOT NULL,
+                    service TEXT NOT NULL,
+                    data BLOB NOT NULL,
+                    expires_at REAL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (profile_id, service)
+                )'''
+            )
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'salt'").fetchone()
+            if row:
+                salt = row[0]
+            else:
+                salt = os.urandom(16)
+                self._db.execute("INSERT INTO meta VALUES ('salt', ?)", (salt,))
+        self._key = scrypt(password.encode(), salt, 32, N=2 ** 14, r=8, p=1)
+
+    def close(self) -> None:
+        self._db.close()
+
+    def _encrypt(self, value: dict) -> bytes:
+        cipher = AES.new(self._key, AES.MODE_GCM)
+        ciphertext, tag = cipher.encrypt_and_digest(json.dumps(value).encode())
+        return cipher.nonce + tag + ciphertext
+
+    def _decrypt(self, blob: bytes) -> dict:
+        cipher = AES.new(self._key, AES.MODE_GCM, nonce=blob[:16])
+        return json.loads(cipher.decrypt_and_verify(blob[32:], blob[16:32]))
+
+    def get(self, profile_id: int, service: str) -> Optional[StoredToken]:
+        """The stored token unless it's missing, expires within `leeway` seconds or can't be decrypted"""
+        row = self._db.execute(
+            'SELECT data, expires_at FROM tokens WHERE profile_id = ? AND service = ?', (profile_id, service)
+        ).fetchone()
+        if not row:
+            return None
+        data, expires_at = row
+        if expires_at and expires_at - self.leeway <= time.time():
+            return None
+        try:
+            value = self._decrypt(data)
+        except ValueError:
+            logger.warning(f'{profile_id} | Can\'t decrypt {service} token, wrong password?')
+            return None
+        return StoredToken(value['token'], value.get('cookies') or {}, expires_at)
+
+    def set(
+            self, profile_id: int, service: str, token: str, cookies: dict[str, str] = None, expires_at: float = None
+    ) -> StoredToken:
+        """Stores a token; `expires_at` defaults to the JWT `exp` claim if the token is a JWT"""
+        expires_at = expires_at or jwt_expiry(token)
+        cookies = dict(cookies or {})
+        with self._db:
+            self._db.execute(
+                'INSERT OR REPLACE INTO tokens VALUES (?, ?, ?, ?, ?)',
+                (profile_id, service, self._encrypt({'token': token, 'cookies': cookies}), expires_at, time.time())
+            )
+        return StoredToken(token, cookies, expires_at)
+
+    def invalidate(self, profile_id: int, service: str) -> None:
+        with self._db:
+            self._db.execute('DELETE FROM tokens WHERE profile_id = ? AND service = ?', (profile_id, service))
+
+    async def credentials(self, profile_id: int, service: str, login: Login, refresh: bool = False) -> StoredToken:
+        """Stored token and cookies, or fresh ones from `login` if there are none, they expired or `refresh`"""
+        if not refresh:
+            stored = self.get(profile_id, service)
+            if stored:
+                return stored
+        result = await login()
+        if isinstance(result, StoredToken):
+            return self.set(profile_id, service, result.token, result.cookies, result.expires_at)
+        if isinstance(result, tuple):
+            return self.set(profile_id, service, *result)
+        return self.set(profile_id, service, result)
+
+    async def token(self, profile_id: int, service: str, login: Login, refresh: bool = False) -> str:
+        return (await self.credentials(profile_id, service, login, refresh)).token
+
+    async def call(
+            self,
+            profile_id: int,
+            service: str,
+            login: Login,
+            func: Callable[[str], Awaitable[Any]]
+    ) -> Any:
+        """Runs `func(token)`, logging in again once if the service rejects the stored token"""
+        token = await self.token(profile_id, service, login)
+        try:
+            return await func(token)
+        except RequestsError as e:
+            response = getattr(e, 'response', None)
+            if response is None or response.status_code not in REJECTED_STATUSES:
+                raise
+            logger.info(f'{profile_id} | {service} rejected the stored token, logging in again')
+        self.invalidate(profile_id, service)
+        return await func(await self.token(profile_id, service, login, refresh=True))
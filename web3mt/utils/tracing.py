@@ -0,0 +1,122 @@
+import atexit
+import json
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+_current_span: ContextVar[Optional['Span']] = ContextVar('web3mt_current_span', default=None)
+
+
+class Span:
+    __slots__ = ('name', 'trace_id', 'span_id', 'parent_id', 'start', 'end', 'attributes', 'error')
+
+    def __init__(self, name: str, parent: Optional['Span'] = None, **attributes):
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = {**(parent.attributes if parent else {}), **attributes}
+        self.start = time.time()
+        self.end: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    @property
+    def duration(self) -> float:
+        return (self.end or time.time()) - self.start
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'name': self.name,
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start': self.start,
+            'end': self.end,
+            'duration': self.duration,
+            'attributes': self.attributes,
+            'error': self.error,
+        }
+
+
+class NoopSpan:
+    def set(self, **attributes) -> None:
+        pass
+
+
+NOOP_SPAN = NoopSpan()
+
+
+class FileSpanExporter:
+    """Appends finished spans to a file as JSON lines, `batch_size` spans per write"""
+
+    def __init__(self, path: str | Path, batch_size: int = 256):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self._buffer: list[str] = []
+        atexit.register(self.flush)
+
+    def export(self, span: Span) -> None:
+        self._buffer.append(json.dumps(span.to_dict(), default=str))
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.write('\n'.join(self._buffer) + '\n')
+        self._buffer.clear()
+
+    def close(self) -> None:
+        self.flush()
+        atexit.unregister(self.flush)
+
+
+class Tracer:
+    def __init__(self, exporter: FileSpanExporter = None):
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Span | NoopSpan]:
+        if not self.exporter:
+            yield NOOP_SPAN
+            return
+        span = Span(name, _current_span.get(), **attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f'{type(e).__name__}: {e}'
+            raise
+        finally:
+            span.end = time.time()
+            _current_span.reset(token)
+            # Tracing may have been disabled while the span was open
+            if self.exporter is not None:
+                self.exporter.export(span)
+
+
+tracer = Tracer()
+
+
+def enable_tracing(path: str | Path = 'spans.jsonl', batch_size: int = 256) -> Tracer:
+    if tracer.exporter is not None:
+        tracer.exporter.close()
+    tracer.exporter = FileSpanExporter(path, batch_size)
+    return tracer
+
+
+def disable_tracing() -> None:
+    if tracer.exporter is not None:
+        tracer.exporter.close()
+    tracer.exporter = None
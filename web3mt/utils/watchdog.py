@@ -0,0 +1,125 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Optional
+
+from .logger import logger
+
+
+class LagEvent:
+    __slots__ = ('lag', 'task', 'profile_id', 'stack', 'at')
+
+    def __init__(self, lag: float, task: Optional[str], stack: list[str]):
+        self.lag = lag
+        self.task = task
+        self.profile_id = task.partition(':')[2] if task and task.startswith('profile:') else None
+        self.stack = stack
+        self.at = time.time()
+
+    @property
+    def location(self) -> str:
+        """The innermost frame, which is where the loop was stuck"""
+        return self.stack[-1].strip().splitlines()[0] if self.stack else 'unknown'
+
+    def to_dict(self) -> dict:
+        return {
+            'lag': self.lag, 'task': self.task, 'profile_id': self.profile_id, 'at': self.at, 'stack': self.stack
+        }
+
+
+class LoopWatchdog:
+    """
+    Opt-in monitor of event loop lag. A heartbeat on the loop ticks every `interval` seconds and a thread watches it;
+    when a tick is more than `threshold` seconds late, the thread captures the loop thread's stack (the blocking
+    call) and the running task, which `Fleet` names `profile:<id>`. The stall is logged once it's over with its
+    full duration and kept in `events`; `report` groups them by where the loop was stuck.
+    """
+
+    def __init__(self, threshold: float = 0.1, interval: float = 0.02, max_events: int = 1000, depth: int = 12):
+        self.threshold = threshold
+        self.interval = interval
+        self.depth = depth
+        self.events: deque[LagEvent] = deque(maxlen=max_events)
+        self._beat = time.perf_counter()
+        self._pending: Optional[LagEvent] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    async def _tick(self) -> None:
+        while True:
+            self._beat = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = time.perf_counter() - self._beat - self.interval
+            event, self._pending = self._pending, None
+            if event is not None:
+                event.lag = lag
+                self.events.append(event)
+                logger.warning(
+                    f'{f"{event.profile_id} | " if event.profile_id else ""}Event loop blocked for {lag:.3f} s '
+                    f'in {event.task or "loop callback"} at {event.location}\n{"".join(event.stack)}'
+                )
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.interval):
+            if self._pending is not None:
+                continue
+            lag = time.perf_counter() - self._beat - self.interval
+            if lag < self.threshold:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            stack = traceback.format_stack(frame)[-self.depth:]
+            task = asyncio.current_task(self._loop)
+            # The heartbeat may have caught up while the stack was captured
+            if time.perf_counter() - self._beat - self.interval >= self.threshold:
+                self._pending = LagEvent(lag, task.get_name() if task else None, stack)
+
+    def start(self) -> 'LoopWatchdog':
+        """Must be called from the loop to watch"""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._stopped.clear()
+        self._beat = time.perf_counter()
+        self._heartbeat = asyncio.create_task(self._tick(), name='loop-watchdog')
+        self._thread = threading.Thread(target=self._watch, name='web3mt-loop-watchdog', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._heartbeat:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    async def __aenter__(self) -> 'LoopWatchdog':
+        return self.start()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    def report(self) -> list[dict]:
+        """Stalls grouped by blocking location, worst total first"""
+        groups: dict[str, dict] = {}
+        for event in self.events:
+            group = groups.setdefault(
+                event.location, {'location': event.location, 'count': 0, 'total': 0.0, 'max': 0.0, 'profiles': set()}
+            )
+            group['count'] += 1
+            group['total'] += event.lag
+            group['max'] = max(group['max'], event.lag)
+            if event.profile_id:
+                group['profiles'].add(event.profile_id)
+        return [
+            {**group, 'profiles': sorted(group['profiles'])}
+            for group in sorted(groups.values(), key=lambda group: group['total'], reverse=True)
+        ]
@@ -5,3 +5,19 @@ import sys
 def set_windows_event_loop_policy():
     if sys.version_info >= (3, 8) and sys.platform.lower().startswith("win"):
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+
+def set_uvloop_event_loop_policy() -> bool:
+    """
+    Installs uvloop's event loop policy if uvloop is installed (`web3mt[fast]`, not available on Windows). Falls back
+    to the default policy (the selector one on Windows) otherwise. Returns whether uvloop is in use.
+    """
+    if sys.platform.lower().startswith("win"):
+        set_windows_event_loop_policy()
+        return False
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True